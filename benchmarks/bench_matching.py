@@ -0,0 +1,80 @@
+"""Бенчмарк подбора резюме к вакансии на синтетических данных.
+
+    python -m benchmarks.bench_matching --resumes 200000 --queries 50
+
+Строит матрицу ResumeMatrix во временном каталоге, затем замеряет
+время оценки всех резюме и выбора top-K для случайных вакансий.
+Базы данных не требуется.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+from src.utils.matching import ResumeMatrix
+
+SPECIALTIES = ["python", "java", "golang", "frontend", "devops", "analyst", "qa", "designer",
+               "accountant", "manager", "sales", "lawyer", "driver", "teacher", "doctor"]
+
+
+def make_vocabulary(size: int) -> list[str]:
+    rnd = random.Random(42)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    return SPECIALTIES + ["".join(rnd.choices(alphabet, k=rnd.randint(4, 10))) for _ in range(size)]
+
+
+def make_text(rnd: random.Random, vocabulary: list[str], weights: np.ndarray, words: int) -> str:
+    # распределение слов близко к закону Ципфа, как в реальных текстах
+    return " ".join(rnd.choices(vocabulary, cum_weights=weights, k=words))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=2 ** 18)
+    parser.add_argument("--nnz", type=int, default=64)
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    vocabulary = make_vocabulary(args.vocabulary)
+    weights = np.cumsum(1 / np.arange(1, len(vocabulary) + 1))
+
+    with tempfile.TemporaryDirectory() as path:
+        matrix = ResumeMatrix(path, dim=args.dim, nnz=args.nnz)
+
+        started = time.perf_counter()
+        matrix.upsert_many((uuid.uuid4(), make_text(rnd, vocabulary, weights, rnd.randint(30, 150)))
+                           for _ in range(args.resumes))
+        matrix.flush()
+        build = time.perf_counter() - started
+        size_mb = (matrix.indices.nbytes + matrix.values.nbytes + matrix.ids.nbytes) / 2 ** 20
+        print(f"build: {args.resumes} резюме за {build:.1f} c "
+              f"({args.resumes / build:.0f} строк/с), матрица {size_mb:.1f} MiB")
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            matrix.upsert(uuid.uuid4(), make_text(rnd, vocabulary, weights, 80))
+        print(f"incremental upsert: {(time.perf_counter() - started) / 1000 * 1e6:.0f} мкс/резюме")
+
+        latencies = []
+        for _ in range(args.queries):
+            query = make_text(rnd, vocabulary, weights, 60)
+            started = time.perf_counter()
+            matrix.top_k(query, args.top_k, args.chunk_rows)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"top-{args.top_k}: p50 {statistics.median(latencies) * 1000:.1f} мс, "
+              f"p95 {p95 * 1000:.1f} мс на {len(matrix)} резюме")
+
+
+if __name__ == "__main__":
+    main()
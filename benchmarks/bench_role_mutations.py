@@ -0,0 +1,146 @@
+"""Бенчмарк изменений ролей: число обращений к базе и задержка на операцию.
+
+    python -m benchmarks.bench_role_mutations --repeat 200
+
+Нужна база из настроек приложения (DB_*) с примененными миграциями.
+Для create, update и delete сравнивает прежнюю последовательность запросов
+(проверка существования, изменение, событие outbox отдельным INSERT, повторное
+чтение после update) с одним запросом RoleDAL. Обращения считаются событиями
+движка: каждый запрос, BEGIN и COMMIT - отдельный обмен с сервером. Печатает
+обращения на операцию, медиану и p95 задержки и удаляет созданные роли.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, event, func, select, update
+
+from src.crud.outbox import add_event
+from src.crud.role import RoleDAL
+from src.database.models import OutboxEvent, Role
+from src.database.session import db_helper
+
+PREFIX = "bench-role-"
+round_trips = 0
+created_ids: list[uuid.UUID] = []
+
+
+def count_round_trip(*_) -> None:
+    global round_trips
+    round_trips += 1
+
+
+# прежняя реализация RoleService + RoleDAL
+
+async def legacy_create(name: str) -> uuid.UUID:
+    async with db_helper.async_session() as session:
+        async with session.begin():
+            exists = (await session.execute(select(Role).where(Role.name == name))).fetchone()
+            assert exists is None
+            role = Role(name=name, permissions=0)
+            session.add(role)
+            await session.flush()
+            add_event(session, "role", "created", role.id, {"name": name, "permissions": 0})
+    return role.id
+
+
+async def legacy_update(role_id: uuid.UUID, name: str) -> None:
+    async with db_helper.async_session() as session:
+        async with session.begin():
+            assert await session.get(Role, role_id) is not None
+            res = await session.execute(update(Role).where(Role.id == role_id).values(
+                name=name, version=Role.version + 1, updated_at=func.now()).returning(Role.id, Role.version))
+            row = res.fetchone()
+            add_event(session, "role", "updated", row.id, {"version": row.version, "fields": ["name"]})
+        # read_role после фиксации
+        (await session.execute(select(Role).where(Role.id == role_id))).fetchone()
+
+
+async def legacy_delete(role_id: uuid.UUID) -> None:
+    async with db_helper.async_session() as session:
+        async with session.begin():
+            role = await session.get(Role, role_id)
+            assert role is not None
+            await session.delete(role)
+            add_event(session, "role", "deleted", role.id)
+
+
+async def single_create(name: str) -> uuid.UUID:
+    async with db_helper.async_session() as session:
+        async with session.begin():
+            role = await RoleDAL(session).create(name=name)
+    return role.id
+
+
+async def single_update(role_id: uuid.UUID, name: str) -> None:
+    async with db_helper.async_session() as session:
+        async with session.begin():
+            assert await RoleDAL(session).update(role_id, name=name) is not None
+
+
+async def single_delete(role_id: uuid.UUID) -> None:
+    async with db_helper.async_session() as session:
+        async with session.begin():
+            assert await RoleDAL(session).delete(id=role_id) is not None
+
+
+async def measure(name: str, operation, args: list[tuple]) -> None:
+    global round_trips
+    timings = []
+    round_trips = 0
+    for call_args in args:
+        started = time.perf_counter()
+        await operation(*call_args)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:>14}: {round_trips / len(args):4.1f} обращений, "
+          f"median {statistics.median(timings):7.2f} ms, p95 {p95:7.2f} ms")
+
+
+async def run(flow: str, create, update_, delete_, repeat: int) -> None:
+    names = [f"{PREFIX}{flow}-{uuid.uuid4()}" for _ in range(repeat)]
+    ids = []
+
+    async def create_and_keep(name: str) -> None:
+        ids.append(await create(name))
+        created_ids.append(ids[-1])
+
+    await measure(f"{flow} create", create_and_keep, [(name,) for name in names])
+    await measure(f"{flow} update", update_, [(role_id, f"{name}-renamed") for role_id, name in zip(ids, names)])
+    await measure(f"{flow} delete", delete_, [(role_id,) for role_id in ids])
+
+
+async def cleanup() -> None:
+    async with db_helper.async_session() as session:
+        await session.execute(delete(Role).where(Role.name.startswith(PREFIX)))
+        await session.execute(delete(OutboxEvent).where(
+            OutboxEvent.topic == "role", OutboxEvent.aggregate_id.in_(created_ids)))
+        await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    sync_engine = db_helper.engine.sync_engine
+    for name in ("before_cursor_execute", "begin", "commit"):
+        event.listen(sync_engine, name, count_round_trip)
+    try:
+        # прогрев: соединения пула, кэш подготовленных запросов asyncpg
+        await run("warmup", single_create, single_update, single_delete, 5)
+        print("---")
+        await run("legacy", legacy_create, legacy_update, legacy_delete, args.repeat)
+        await run("single", single_create, single_update, single_delete, args.repeat)
+    finally:
+        for name in ("before_cursor_execute", "begin", "commit"):
+            event.remove(sync_engine, name, count_round_trip)
+        await cleanup()
+        await db_helper.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
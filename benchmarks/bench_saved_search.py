@@ -0,0 +1,125 @@
+"""Бенчмарк сопоставления новых вакансий с сохраненными поисками на синтетических данных.
+
+    python -m benchmarks.bench_saved_search --searches 100000 --vacansies 1000
+
+Генерирует сохраненные поиски (VacansyFilter) и пачку новых вакансий и замеряет
+шаг задачи saved_search в памяти, без базы:
+
+  grouped  - PredicateIndex: одинаковые фильтры схлопнуты в один предикат,
+             предикаты разложены по place_of_work / required_specialt;
+  naive    - каждый сохраненный поиск проверяется против каждой вакансии
+             (на первых --naive-vacansies вакансиях, результат пересчитывается на пачку).
+
+Совпадения обоих способов сверяются на общей части пачки.
+"""
+import argparse
+import random
+import time
+import uuid
+from collections import defaultdict
+from itertools import accumulate
+from types import SimpleNamespace
+
+from src.utils.filter import VacansyFilter
+from src.utils.saved_search import Predicate, PredicateIndex, canonical_filters, predicate_key
+
+CITIES = [f"city-{n}" for n in range(300)]
+SPECIALTIES = ["python", "java", "golang", "frontend", "devops", "analyst", "qa", "designer",
+               "accountant", "manager", "sales", "lawyer", "driver", "teacher", "doctor"]
+EXPERIENCE = ["без опыта", "от 1 года", "от 3 лет", "более 6 лет"]
+CURRENCIES = ["RUB", "USD", "EUR"]
+ZIPF = {size: list(accumulate(1 / rank for rank in range(1, size + 1))) for size in (len(CITIES), len(SPECIALTIES))}
+
+
+def popular(rnd: random.Random, values: list[str]) -> str:
+    # популярные города и специальности выбирают чаще (закон Ципфа), как в настоящих поисках
+    return rnd.choices(values, cum_weights=ZIPF[len(values)])[0]
+
+
+def make_filter(rnd: random.Random) -> VacansyFilter:
+    fields = {}
+    roll = rnd.random()
+    if roll < 0.6:
+        fields["place_of_work"] = popular(rnd, CITIES)
+    elif roll < 0.75:
+        fields["place_of_work__in"] = list({popular(rnd, CITIES) for _ in range(rnd.randint(2, 4))})
+    if rnd.random() < 0.7:
+        fields["required_specialt__in"] = list({popular(rnd, SPECIALTIES) for _ in range(rnd.randint(1, 3))})
+    if rnd.random() < 0.2:
+        fields["required_experience__ilike"] = rnd.choice(["%опыт%", "%3 лет%", "от 1%"])
+    if rnd.random() < 0.5:
+        fields["salary__gte"] = rnd.choice(range(50_000, 300_001, 25_000))
+    if rnd.random() < 0.2:
+        fields["salary__lte"] = rnd.choice(range(150_000, 500_001, 50_000))
+    if rnd.random() < 0.3:
+        fields["currency"] = rnd.choice(CURRENCIES)
+    return VacansyFilter(**fields)
+
+
+def make_vacansy(rnd: random.Random) -> SimpleNamespace:
+    salary_min = rnd.choice([None, *range(40_000, 300_001, 20_000)])
+    salary_max = rnd.choice([None, *range(100_000, 500_001, 50_000)])
+    return SimpleNamespace(id=uuid.uuid4(),
+                           place_of_work=popular(rnd, CITIES),
+                           required_specialt=popular(rnd, SPECIALTIES),
+                           required_experience=rnd.choice(EXPERIENCE),
+                           salary_min=salary_min,
+                           salary_max=salary_max,
+                           currency=rnd.choice(CURRENCIES) if salary_min or salary_max else None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=100_000)
+    parser.add_argument("--vacansies", type=int, default=1000)
+    parser.add_argument("--naive-vacansies", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    rnd = random.Random(args.seed)
+
+    # как в get_predicates: поиски группируются по каноническому фильтру
+    started = time.perf_counter()
+    grouped: dict[str, tuple[dict, list[uuid.UUID]]] = {}
+    naive_predicates = []
+    for _ in range(args.searches):
+        filters = canonical_filters(make_filter(rnd))
+        key = predicate_key(filters)
+        search_id = uuid.uuid4()
+        grouped.setdefault(key, (filters, []))[1].append(search_id)
+        naive_predicates.append(Predicate.from_filters(key, filters, [search_id]))
+    prepared = time.perf_counter() - started
+    vacansies = [make_vacansy(rnd) for _ in range(args.vacansies)]
+
+    started = time.perf_counter()
+    index = PredicateIndex(Predicate.from_filters(key, filters, ids) for key, (filters, ids) in grouped.items())
+    built = time.perf_counter() - started
+    print(f"поисков {args.searches}, различных предикатов {len(index)} "
+          f"(подготовка {prepared:.2f} c, индекс {built * 1000:.0f} мс)")
+
+    started = time.perf_counter()
+    search_ids, vacansy_ids = index.match_batch(vacansies)
+    grouped_time = time.perf_counter() - started
+    print(f"grouped: {len(vacansies)} вакансий за {grouped_time * 1000:.0f} мс - "
+          f"{len(vacansies) / grouped_time:,.0f} вакансий/с, {len(search_ids):,} совпадений")
+
+    sample = vacansies[:args.naive_vacansies]
+    started = time.perf_counter()
+    naive_pairs = {(predicate.search_ids[0], vacansy.id)
+                   for vacansy in sample for predicate in naive_predicates if predicate.matches(vacansy)}
+    naive_time = (time.perf_counter() - started) / len(sample) * len(vacansies)
+    print(f"naive:   {len(vacansies)} вакансий за ~{naive_time * 1000:.0f} мс - "
+          f"{len(vacansies) / naive_time:,.0f} вакансий/с (оценка по {len(sample)})")
+    print(f"ускорение: x{naive_time / grouped_time:.1f}")
+
+    sample_ids = {vacansy.id for vacansy in sample}
+    grouped_pairs = {pair for pair in zip(search_ids, vacansy_ids) if pair[1] in sample_ids}
+    assert grouped_pairs == naive_pairs, "совпадения grouped и naive различаются"
+    per_vacansy = defaultdict(int)
+    for vacansy_id in vacansy_ids:
+        per_vacansy[vacansy_id] += 1
+    print(f"совпадения сверены; в среднем {len(vacansy_ids) / len(vacansies):.1f} поисков на вакансию, "
+          f"максимум {max(per_vacansy.values(), default=0)}")
+
+
+if __name__ == "__main__":
+    main()
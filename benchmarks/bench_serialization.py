@@ -0,0 +1,159 @@
+"""Бенчмарк сериализации списочных ответов: /auth/entries и /role/user.
+
+    python -m benchmarks.bench_serialization --items 50 --repeat 2000
+
+База не нужна: сервисы и проверка токена подменяются через dependency_overrides,
+поэтому измеряется только путь ответа FastAPI. Сравниваются:
+
+  encoder  - прежний путь: проверка по response_model, jsonable_encoder и json.dumps;
+  orjson   - то же, но ORJSONResponse (default_response_class приложения);
+  typed    - TypedJSONResponse: TypeAdapter.dump_json сразу в байты.
+
+Сначала печатается время одной сериализации страницы, затем задержка запроса
+через ASGI (httpx.ASGITransport) к настоящему приложению и к копии маршрутов
+в прежнем виде.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import Depends, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi_pagination import add_pagination
+
+from main import app
+from src.api.v1_handlers.role import user_roles_not_modified
+from src.database.session import db_helper
+from src.schemas.entry import EntryResponse
+from src.schemas.pagination import LimitOffsetTotalPage
+from src.schemas.role import ResponseRole
+from src.services.auth import get_auth_service
+from src.services.role import get_role_service
+from src.utils.responses import TypedJSONResponse, type_adapter
+from src.utils.token_manager import verify_access_token
+
+USER_ID = uuid.uuid4()
+
+
+def entries_page(items: int) -> LimitOffsetTotalPage[EntryResponse]:
+    now = datetime.now(timezone.utc)
+    return LimitOffsetTotalPage[EntryResponse](
+        items=[EntryResponse(user_agent="Mozilla/5.0 (X11; Linux x86_64) Firefox/118.0",
+                             date_time=now - timedelta(minutes=n), is_active=n % 2 == 0) for n in range(items)],
+        limit=items, offset=0, has_next=True)
+
+
+def roles_page(items: int) -> LimitOffsetTotalPage[ResponseRole]:
+    return LimitOffsetTotalPage[ResponseRole](
+        items=[ResponseRole(id=uuid.uuid4(), name=f"role-{n}") for n in range(items)],
+        limit=items, offset=0, total=items, has_next=False)
+
+
+class FakeAuthService:
+    def __init__(self, page) -> None:
+        self.page = page
+
+    async def entry_history(self, access_token, unique, total_mode=None):
+        return self.page
+
+
+class FakeRoleService:
+    def __init__(self, page) -> None:
+        self.page = page
+
+    async def get_user_access_area(self, user_id):
+        return self.page
+
+    async def get_user_roles_version(self, user_id):
+        # без версий ETag не считается: измеряется только сериализация
+        return []
+
+
+def legacy_app() -> FastAPI:
+    # маршруты в прежнем виде с теми же зависимостями: модель возвращается как есть, остальное делает FastAPI
+    legacy = FastAPI(default_response_class=JSONResponse)
+
+    @legacy.get("/auth/entries", response_model=LimitOffsetTotalPage[EntryResponse])
+    async def user_entries(unique: bool = True,
+                           token: str = Depends(verify_access_token),
+                           auth_service=Depends(get_auth_service)):
+        return await auth_service.entry_history(token, unique)
+
+    @legacy.get("/role/user",
+                response_model=LimitOffsetTotalPage[ResponseRole],
+                dependencies=[Depends(user_roles_not_modified)])
+    async def get_user_role(user_id: uuid.UUID, role_service=Depends(get_role_service)):
+        return await role_service.get_user_access_area(user_id)
+
+    add_pagination(legacy)
+    return legacy
+
+
+def measure_sync(name: str, func, repeat: int) -> None:
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat * 1_000_000
+    print(f"{name:>24}: {elapsed:8.1f} us")
+
+
+async def measure_asgi(name: str, target: FastAPI, url: str, repeat: int) -> None:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await client.get(url)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:>24}: median {statistics.median(timings):8.1f} us, p95 {p95:8.1f} us, "
+          f"{len(response.content)} bytes")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    # обработчики приложения пишут DEBUG в файл, у копии маршрутов логов нет
+    logging.disable(logging.INFO)
+
+    entries, roles = entries_page(args.items), roles_page(args.items)
+    for page, page_type in ((entries, LimitOffsetTotalPage[EntryResponse]),
+                            (roles, LimitOffsetTotalPage[ResponseRole])):
+        print(f"{page_type.__name__}, {args.items} элементов")
+        # response_model проверяет ответ заново, как FastAPI делает в serialize_response
+        measure_sync("encoder", lambda: json.dumps(
+            jsonable_encoder(page_type.model_validate(page, from_attributes=True))).encode(), args.repeat)
+        measure_sync("orjson", lambda: ORJSONResponse(
+            jsonable_encoder(page_type.model_validate(page, from_attributes=True))).body, args.repeat)
+        measure_sync("typed", lambda: type_adapter(page_type).dump_json(page), args.repeat)
+        measure_sync("typed response", lambda: TypedJSONResponse(page, page_type).body, args.repeat)
+
+    legacy = legacy_app()
+    for target in (app, legacy):
+        target.dependency_overrides[verify_access_token] = lambda: "token"
+        target.dependency_overrides[get_auth_service] = lambda: FakeAuthService(entries)
+        target.dependency_overrides[get_role_service] = lambda: FakeRoleService(roles)
+    query = f"limit={args.items}&offset=0"
+    print("ASGI")
+    await measure_asgi("entries encoder", legacy, f"/auth/entries?{query}", args.repeat)
+    await measure_asgi("entries typed", app, f"/auth/entries?{query}", args.repeat)
+    await measure_asgi("role/user encoder", legacy, f"/role/user?user_id={USER_ID}&{query}", args.repeat)
+    await measure_asgi("role/user typed", app, f"/role/user?user_id={USER_ID}&{query}", args.repeat)
+    await db_helper.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""Бенчмарк карточки вакансии с большим числом комментариев.
+
+    python -m benchmarks.bench_vacansy_detail --comments 50000 --repeat 20
+
+Нужна база из настроек приложения (DB_*) с примененными миграциями.
+Создает пользователя, HR и вакансию с --comments комментариями, сравнивает
+прежнюю загрузку ORM-графа (selectinload(Vacansy.comments)) с проекциями
+VacansyDAL.get: none, latest и all. Для каждой печатает медиану и p95
+задержки и пик памяти Python (tracemalloc), затем удаляет тестовые данные.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import selectinload
+
+from src.crud.vacansy import VacansyDAL
+from src.database.models import Vacansy
+from src.database.session import db_helper
+from src.schemas.vacansy import CommentsProjection
+
+
+async def seed(comments: int) -> tuple[uuid.UUID, uuid.UUID]:
+    user_id, hr_id, vacansy_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    async with db_helper.async_session() as session:
+        await session.execute(text('INSERT INTO "user" (id, email, password, is_active) '
+                                   'VALUES (:id, :email, :password, true)'),
+                              {"id": user_id, "email": f"bench-{user_id}@example.com", "password": "-"})
+        await session.execute(text("INSERT INTO hr (id, first_name, last_name, middle_name, age, company_name, "
+                                   "is_active, user_id) VALUES (:id, 'bench', 'bench', 'bench', 30, 'bench', "
+                                   "true, :user_id)"),
+                              {"id": hr_id, "user_id": user_id})
+        await session.execute(text("INSERT INTO vacansy (id, place_of_work, about_the_company, required_specialt, "
+                                   "proposed_salary, working_conditions, required_experience, is_active, "
+                                   "comments_count, hr_id) VALUES (:id, 'bench', 'bench', 'bench', "
+                                   "'от 100 000 руб', 'bench', 'bench', true, :comments, :hr_id)"),
+                              {"id": vacansy_id, "comments": comments, "hr_id": hr_id})
+        await session.execute(text("INSERT INTO comment (id, text, created_at, user_id, vacansy_id) "
+                                   "SELECT gen_random_uuid(), repeat('комментарий ', 20), "
+                                   "now() - make_interval(secs => n), :user_id, :vacansy_id "
+                                   "FROM generate_series(1, :comments) AS n"),
+                              {"user_id": user_id, "vacansy_id": vacansy_id, "comments": comments})
+        await session.commit()
+        await session.execute(text("ANALYZE comment"))
+    return user_id, vacansy_id
+
+
+async def cleanup(user_id: uuid.UUID) -> None:
+    async with db_helper.async_session() as session:
+        await session.execute(text('DELETE FROM "user" WHERE id = :id'), {"id": user_id})
+        await session.commit()
+
+
+async def load_orm_graph(vacansy_id: uuid.UUID) -> None:
+    # прежняя реализация VacansyDAL.get
+    async with db_helper.async_session() as session:
+        query = select(Vacansy).options(selectinload(Vacansy.comments)).where(
+            Vacansy.id == vacansy_id, Vacansy.is_active == True)
+        res = await session.execute(query)
+        res.fetchone()
+
+
+async def load_projection(vacansy_id: uuid.UUID, comments: CommentsProjection, limit: int) -> None:
+    async with db_helper.async_session() as session:
+        await VacansyDAL(session).get(vacansy_id, comments, limit)
+
+
+async def measure(name: str, load, repeat: int) -> None:
+    await load()  # прогрев: соединение из пула, кэш планов
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await load()
+        timings.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    await load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:>12}: median {statistics.median(timings):8.2f} ms, p95 {p95:8.2f} ms, "
+          f"peak {peak / 2 ** 20:8.2f} MiB")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comments", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--latest", type=int, default=20)
+    args = parser.parse_args()
+
+    user_id, vacansy_id = await seed(args.comments)
+    try:
+        print(f"вакансия {vacansy_id}: {args.comments} комментариев")
+        await measure("orm graph", lambda: load_orm_graph(vacansy_id), args.repeat)
+        await measure("none", lambda: load_projection(vacansy_id, CommentsProjection.none, args.latest),
+                      args.repeat)
+        await measure(f"latest {args.latest}",
+                      lambda: load_projection(vacansy_id, CommentsProjection.latest, args.latest), args.repeat)
+        await measure("all", lambda: load_projection(vacansy_id, CommentsProjection.all, args.latest),
+                      args.repeat)
+    finally:
+        await cleanup(user_id)
+        await db_helper.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""Проверка планов запросов DAL с фильтром is_active.
+
+    python -m benchmarks.explain_indexes --users 200 --rows 100
+
+Нужна база из настроек приложения (DB_*) с примененными миграциями.
+Создает --users пользователей, у каждого HR и по --rows сессий входа и вакансий,
+из которых активны только несколько процентов, выполняет ANALYZE. Затем
+вызывает методы DAL, перехватывает отправленный ими SQL, выполняет для него
+EXPLAIN с теми же параметрами и проверяет, что в плане есть ожидаемый частичный
+индекс. Печатает узлы плана каждого запроса; код выхода 1, если индекс не использован.
+Тестовые данные удаляются.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+
+from fastapi_pagination import LimitOffsetParams
+from fastapi_pagination.api import _params_val
+from sqlalchemy import event, text
+
+from src.crud.entry import EntryDAL
+from src.crud.vacansy import VacansyDAL
+from src.database.session import db_helper
+from src.utils.pagination import TotalMode
+
+ACTIVE_SHARE = 0.03
+
+
+async def seed(users: int, rows: int) -> tuple[list[uuid.UUID], uuid.UUID, uuid.UUID]:
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    async with db_helper.async_session() as session:
+        await session.execute(text('INSERT INTO "user" (id, email, password, is_active) '
+                                   "SELECT id, 'explain-' || id || '@example.com', '-', true "
+                                   "FROM unnest(CAST(:ids AS uuid[])) AS id"),
+                              {"ids": user_ids})
+        await session.execute(text("INSERT INTO hr (id, first_name, last_name, middle_name, age, company_name, "
+                                   "is_active, user_id) SELECT gen_random_uuid(), 'explain', 'explain', "
+                                   "'explain', 30, 'explain', true, id FROM unnest(CAST(:ids AS uuid[])) AS id"),
+                              {"ids": user_ids})
+        await session.execute(text("INSERT INTO entry (id, user_id, user_agent, date_time, refresh_token, is_active) "
+                                   "SELECT gen_random_uuid(), u.id, 'agent-' || gen_random_uuid(), "
+                                   "now() - make_interval(mins => n), '-', random() < :share "
+                                   "FROM unnest(CAST(:ids AS uuid[])) AS u(id), generate_series(1, :rows) AS n"),
+                              {"ids": user_ids, "rows": rows, "share": ACTIVE_SHARE})
+        await session.execute(text("INSERT INTO vacansy (id, place_of_work, about_the_company, required_specialt, "
+                                   "proposed_salary, working_conditions, required_experience, is_active, "
+                                   "comments_count, created, hr_id) "
+                                   "SELECT gen_random_uuid(), 'explain', 'explain', 'explain', 'explain', "
+                                   "'explain', 'explain', random() < :share, 0, "
+                                   "now() - make_interval(mins => n), hr.id "
+                                   "FROM hr, generate_series(1, :rows) AS n WHERE hr.user_id = ANY(CAST(:ids AS uuid[]))"),
+                              {"ids": user_ids, "rows": rows, "share": ACTIVE_SHARE})
+        user_agent = await session.scalar(text("SELECT user_agent FROM entry WHERE user_id = :id AND is_active "
+                                               "LIMIT 1"), {"id": user_ids[0]})
+        hr_id = await session.scalar(text("SELECT id FROM hr WHERE user_id = :id"), {"id": user_ids[0]})
+        await session.commit()
+        for table in ("entry", "vacansy", "hr", '"user"'):
+            await session.execute(text(f"ANALYZE {table}"))
+    return user_ids, hr_id, user_agent
+
+
+async def cleanup(user_ids: list[uuid.UUID]) -> None:
+    async with db_helper.async_session() as session:
+        await session.execute(text('DELETE FROM "user" WHERE id = ANY(CAST(:ids AS uuid[]))'), {"ids": user_ids})
+        await session.commit()
+
+
+def index_names(plan: dict) -> set[str]:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= index_names(child)
+    return names
+
+
+def node_types(plan: dict, depth: int = 0) -> list[str]:
+    line = "  " * depth + plan["Node Type"] + (f" using {plan['Index Name']}" if "Index Name" in plan else "")
+    return [line] + [item for child in plan.get("Plans", []) for item in node_types(child, depth + 1)]
+
+
+async def explain(name: str, call, expected_index: str) -> bool:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    sync_engine = db_helper.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        async with db_helper.async_session() as session:
+            await call(session)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    ok = bool(statements)
+    print(f"{name}: ожидается {expected_index}")
+    async with db_helper.async_session() as session:
+        conn = await session.connection()
+        for statement, parameters in statements:
+            res = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = res.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            plan = plan[0]["Plan"]
+            used = expected_index in index_names(plan)
+            ok = ok and used
+            print("\n".join("    " + line for line in node_types(plan)))
+            print(f"    -> {'OK' if used else 'индекс не использован'}")
+    return ok
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=100)
+    args = parser.parse_args()
+
+    # пагинирующие методы DAL берут limit/offset из контекста запроса FastAPI
+    _params_val.set(LimitOffsetParams(limit=20, offset=0))
+
+    user_ids, hr_id, user_agent = await seed(args.users, args.rows)
+    try:
+        checks = [
+            await explain("EntryDAL.get_by_user_agent",
+                          lambda session: EntryDAL(session).get_by_user_agent(user_agent, only_active=True),
+                          "ix_entry_user_agent_active"),
+            await explain("EntryDAL.get_by_user_id_list",
+                          lambda session: EntryDAL(session).get_by_user_id_list(
+                              user_ids[0], only_active=True, total_mode=TotalMode.none),
+                          "ix_entry_user_id_active"),
+            await explain("VacansyDAL.get_by_hr_id",
+                          lambda session: VacansyDAL(session).get_by_hr_id(hr_id, total_mode=TotalMode.none),
+                          "ix_vacansy_hr_id_active"),
+        ]
+    finally:
+        await cleanup(user_ids)
+        await db_helper.engine.dispose()
+    if not all(checks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
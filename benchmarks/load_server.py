@@ -0,0 +1,112 @@
+"""Нагрузочный тест production-запуска: пропускная способность от числа процессов gunicorn.
+
+    python -m benchmarks.load_server --workers 1 2 4 --concurrency 64 --duration 10
+
+Для каждого значения --workers запускает gunicorn -c gunicorn.conf.py на --port
+(SERVER_WORKERS=n) и нагружает --path keep-alive соединениями из --clients процессов
+нагрузки, затем останавливает сервер SIGTERM. Печатает запросы в секунду, p50 и p99.
+
+Путь по умолчанию не обращается к базе, поэтому измеряет сам сервер: рост с числом
+процессов упирается в число ядер (нагрузку дает та же машина). Для путей, читающих
+Postgres и Redis, нужны база и Redis из настроек приложения.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+
+def wait_ready(url: str, server: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn завершился с кодом {server.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"сервер не ответил за {timeout} c")
+
+
+async def load(url: str, connections: int, duration: float) -> tuple[list[float], int]:
+    timings, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+
+    async def connection(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.get(url)
+                if response.status_code >= 500:
+                    errors += 1
+            except httpx.TransportError:
+                errors += 1
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        await asyncio.gather(*(connection(client) for _ in range(connections)))
+    return timings, errors
+
+
+def run_client(url: str, connections: int, duration: float) -> tuple[list[float], int]:
+    return asyncio.run(load(url, connections, duration))
+
+
+def measure(args: argparse.Namespace, workers: int) -> float:
+    env = {**os.environ, "SERVER_WORKERS": str(workers), "SERVER_PORT": str(args.port),
+           "SERVER_HOST": "127.0.0.1"}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+                               "--log-level", "warning"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+    try:
+        wait_ready(url, server)
+        # прогрев: все процессы импортировали приложение и прошли lifespan
+        run_client(url, args.concurrency, 1)
+        per_client = max(args.concurrency // args.clients, 1)
+        with ProcessPoolExecutor(args.clients) as pool:
+            results = list(pool.map(run_client, [url] * args.clients, [per_client] * args.clients,
+                                    [args.duration] * args.clients))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    timings = sorted(timing for client_timings, _ in results for timing in client_timings)
+    errors = sum(client_errors for _, client_errors in results)
+    rps = len(timings) / args.duration
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] if timings else float("nan")
+    print(f"workers {workers:>2}: {rps:9,.0f} rps, p50 {statistics.median(timings or [0]):7.2f} ms, "
+          f"p99 {p99:7.2f} ms, ошибок {errors}")
+    return rps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=max((os.cpu_count() or 2) // 2, 1))
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--path", default="/openapi.json")
+    parser.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args()
+
+    print(f"ядер {os.cpu_count()}, процессов нагрузки {args.clients}, соединений {args.concurrency}, {args.path}")
+    baseline = None
+    for workers in args.workers:
+        rps = measure(args, workers)
+        baseline = baseline or rps
+        print(f"            x{rps / baseline:.2f} к {args.workers[0]} процессу")
+
+
+if __name__ == "__main__":
+    main()
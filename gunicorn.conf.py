@@ -0,0 +1,37 @@
+"""Запуск приложения в production:
+
+    gunicorn -c gunicorn.conf.py
+
+Число процессов, backlog, keep-alive, таймауты и preload задаются переменными SERVER_*
+(src.core.config.ServerSettings). Для разработки - python main.py (один процесс с reload).
+"""
+import gc
+
+from src.core.config import settings
+
+wsgi_app = "main:app"
+worker_class = "src.core.server.UvicornWorker"
+
+bind = f"{settings.server.host}:{settings.server.port}"
+workers = settings.server.worker_count
+backlog = settings.server.backlog
+keepalive = settings.server.keepalive
+timeout = settings.server.timeout
+graceful_timeout = settings.server.graceful_timeout
+max_requests = settings.server.max_requests
+max_requests_jitter = settings.server.max_requests_jitter
+preload_app = settings.server.preload
+
+
+def when_ready(server) -> None:
+    if preload_app:
+        # объекты импортированного приложения не трогает сборщик мусора процессов:
+        # страницы памяти остаются общими после fork, а не копируются при первой сборке
+        gc.freeze()
+
+
+def post_fork(server, worker) -> None:
+    if preload_app:
+        from src.database.session import db_helper
+        # соединения, если мастер их открыл при импорте, принадлежат ему: процесс открывает свои
+        db_helper.engine.sync_engine.dispose(close=False)
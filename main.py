@@ -1,18 +1,49 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 import logging.config
 
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
 from fastapi_pagination import add_pagination
 
 from src.api.v1_handlers.auth import auth_router
+from src.api.v1_handlers.health import health_router
+from src.api.v1_handlers.hr import hr_router
+from src.api.v1_handlers.image import image_router
+from src.api.v1_handlers.jobs import jobs_router
+from src.api.v1_handlers.outbox import outbox_router
+from src.api.v1_handlers.resume import resume_router
 from src.api.v1_handlers.role import role_router
+from src.api.v1_handlers.saved_search import saved_search_router
+from src.api.v1_handlers.vacansy import vacansy_router
 from src.core.config import settings
 from src.core.log_config import LOGGING
+from src.database.redis import redis_helper
+from src.database.session import db_helper
+from src.services.image import image_pool
+from src.services.warmup import warmup
 
 logging.config.dictConfig(LOGGING)
 log = logging.getLogger("main")
 
-app = FastAPI(title=settings.app.project_name)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # фоновые и периодические задачи выполняет воркер очереди задач (worker.py)
+    await warmup.start(app)
+    yield
+    await warmup.stop()
+    # по SIGTERM после завершения начатых запросов: соединения закрываются, а не обрываются
+    image_pool.shutdown()
+    await db_helper.engine.dispose()
+    await redis_helper.close()
+
+
+app = FastAPI(title=settings.app.project_name,
+              default_response_class=ORJSONResponse,
+              lifespan=lifespan)
 
 add_pagination(app)
 
@@ -20,11 +51,20 @@ main_router = APIRouter()
 
 main_router.include_router(auth_router, tags=["Auth"])
 main_router.include_router(role_router, tags=["Role"])
+main_router.include_router(vacansy_router, tags=["Vacansy"])
+main_router.include_router(resume_router, tags=["Resume"])
+main_router.include_router(image_router, tags=["Image"])
+main_router.include_router(hr_router, tags=["Hr"])
+main_router.include_router(outbox_router, tags=["Outbox"])
+main_router.include_router(jobs_router, tags=["Jobs"])
+main_router.include_router(saved_search_router, tags=["SavedSearch"])
+main_router.include_router(health_router, tags=["Health"])
 
 app.include_router(main_router)
 
 
 if __name__ == "__main__":
+    # разработка; в production - gunicorn -c gunicorn.conf.py
     uvicorn.run("main:app",
                 host="0.0.0.0",
                 port=8000,
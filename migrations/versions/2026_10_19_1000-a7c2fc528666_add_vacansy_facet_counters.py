@@ -0,0 +1,87 @@
+"""Add vacansy_facet counters maintained by trigger
+
+Revision ID: a7c2fc528666
+Revises: 53950b1466b7
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c2fc528666"
+down_revision: Union[str, None] = "53950b1466b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vacansy_facet",
+        sa.Column("facet", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.String(length=500), nullable=False),
+        sa.Column("count", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("facet", "value"),
+    )
+    op.execute(
+        """
+        CREATE FUNCTION vacansy_facet_apply(v_place text, v_specialt text, v_experience text, delta integer)
+        RETURNS void AS $$
+        BEGIN
+            INSERT INTO vacansy_facet (facet, value, count)
+            VALUES ('place_of_work', v_place, delta),
+                   ('required_specialt', v_specialt, delta),
+                   ('required_experience', v_experience, delta)
+            ON CONFLICT (facet, value) DO UPDATE SET count = vacansy_facet.count + EXCLUDED.count;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION vacansy_facet_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_active THEN
+                PERFORM vacansy_facet_apply(OLD.place_of_work, OLD.required_specialt,
+                                            OLD.required_experience, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_active THEN
+                PERFORM vacansy_facet_apply(NEW.place_of_work, NEW.required_specialt,
+                                            NEW.required_experience, 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER vacansy_facet_sync
+        AFTER INSERT OR DELETE OR UPDATE OF place_of_work, required_specialt, required_experience, is_active
+        ON vacansy
+        FOR EACH ROW EXECUTE FUNCTION vacansy_facet_trigger();
+        """
+    )
+    # начальное заполнение счетчиков по уже существующим вакансиям
+    op.execute(
+        """
+        INSERT INTO vacansy_facet (facet, value, count)
+        SELECT facet, value, count(*)
+        FROM vacansy,
+             LATERAL (VALUES ('place_of_work', place_of_work),
+                             ('required_specialt', required_specialt),
+                             ('required_experience', required_experience)) AS f(facet, value)
+        WHERE is_active
+        GROUP BY facet, value;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS vacansy_facet_sync ON vacansy;")
+    op.execute("DROP FUNCTION IF EXISTS vacansy_facet_trigger();")
+    op.execute("DROP FUNCTION IF EXISTS vacansy_facet_apply(text, text, text, integer);")
+    op.drop_table("vacansy_facet")
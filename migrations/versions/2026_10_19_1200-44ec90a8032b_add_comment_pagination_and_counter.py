@@ -0,0 +1,43 @@
+"""Add comment keyset index and vacansy.comments_count
+
+Revision ID: 44ec90a8032b
+Revises: 65340242697b
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "44ec90a8032b"
+down_revision: Union[str, None] = "65340242697b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # колонка с константным default добавляется без перезаписи таблицы
+    op.add_column("vacansy", sa.Column("comments_count", sa.Integer(), server_default="0", nullable=False))
+    op.execute(
+        """
+        UPDATE vacansy SET comments_count = counts.cnt
+        FROM (SELECT vacansy_id, count(*) AS cnt FROM comment GROUP BY vacansy_id) AS counts
+        WHERE vacansy.id = counts.vacansy_id;
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_comment_vacansy_id_created_at_id",
+            "comment",
+            ["vacansy_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_comment_vacansy_id_created_at_id", table_name="comment", postgresql_concurrently=True)
+    op.drop_column("vacansy", "comments_count")
@@ -0,0 +1,38 @@
+"""Add vacansy_import progress table
+
+Revision ID: accdeb31d8c3
+Revises: 44ec90a8032b
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "accdeb31d8c3"
+down_revision: Union[str, None] = "44ec90a8032b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vacansy_import",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("hr_id", sa.UUID(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("rows_processed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rows_imported", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rows_failed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["hr_id"], ["hr.id"], onupdate="CASCADE", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("vacansy_import")
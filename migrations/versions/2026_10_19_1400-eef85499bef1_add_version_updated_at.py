@@ -0,0 +1,34 @@
+"""Add version and updated_at to vacansy, resume and role
+
+Revision ID: eef85499bef1
+Revises: accdeb31d8c3
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "eef85499bef1"
+down_revision: Union[str, None] = "accdeb31d8c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("vacansy", "resume", "role")
+
+
+def upgrade() -> None:
+    # константные default: колонки добавляются без перезаписи таблиц
+    for table_name in TABLES:
+        op.add_column(table_name, sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+        op.add_column(table_name, sa.Column("updated_at", sa.DateTime(timezone=True),
+                                            server_default=sa.text("now()"), nullable=False))
+
+
+def downgrade() -> None:
+    for table_name in TABLES:
+        op.drop_column(table_name, "updated_at")
+        op.drop_column(table_name, "version")
@@ -0,0 +1,47 @@
+"""Add partial indexes for active vacansy and entry rows
+
+Revision ID: a212370873e9
+Revises: eef85499bef1
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a212370873e9"
+down_revision: Union[str, None] = "eef85499bef1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# имя индекса -> (таблица, колонки); условие у всех одно - WHERE is_active
+PARTIAL_INDEXES = {
+    "ix_vacansy_hr_id_active": ("vacansy", ["hr_id"]),
+    "ix_vacansy_created_id_active": ("vacansy", ["created", "id"]),
+    "ix_entry_user_agent_active": ("entry", ["user_agent"]),
+    "ix_entry_user_id_active": ("entry", ["user_id"]),
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY не блокирует запись, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in PARTIAL_INDEXES.items():
+            # прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс с тем же именем
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text("is_active"),
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, _) in reversed(PARTIAL_INDEXES.items()):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
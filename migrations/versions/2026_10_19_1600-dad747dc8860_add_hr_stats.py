@@ -0,0 +1,154 @@
+"""Add hr_stats aggregates maintained by statement-level triggers
+
+Revision ID: dad747dc8860
+Revises: a212370873e9
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "dad747dc8860"
+down_revision: Union[str, None] = "a212370873e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "hr_stats",
+        sa.Column("hr_id", sa.UUID(), nullable=False),
+        sa.Column("active_vacansies", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("total_vacansies", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("comments_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_vacansy_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_comment_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["hr_id"], ["hr.id"], onupdate="CASCADE", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("hr_id"),
+    )
+    # триггеры уровня оператора: массовая загрузка вакансий дает одно обновление на HR, а не на строку
+    op.execute(
+        """
+        CREATE FUNCTION hr_stats_vacansy_insert() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO hr_stats AS s (hr_id, active_vacansies, total_vacansies, comments_count,
+                                       last_vacansy_at, updated_at)
+            SELECT hr_id, count(*) FILTER (WHERE is_active), count(*), sum(comments_count), max(created), now()
+            FROM new_rows
+            GROUP BY hr_id
+            ON CONFLICT (hr_id) DO UPDATE SET
+                active_vacansies = s.active_vacansies + EXCLUDED.active_vacansies,
+                total_vacansies = s.total_vacansies + EXCLUDED.total_vacansies,
+                comments_count = s.comments_count + EXCLUDED.comments_count,
+                last_vacansy_at = greatest(s.last_vacansy_at, EXCLUDED.last_vacansy_at),
+                updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION hr_stats_vacansy_update() RETURNS trigger AS $$
+        BEGIN
+            -- старые строки вычитаются, новые прибавляются: так учитывается и смена hr_id
+            WITH delta AS (
+                SELECT hr_id, sum(active) AS active, sum(total) AS total, sum(comments) AS comments
+                FROM (SELECT hr_id, -is_active::int AS active, -1 AS total, -comments_count AS comments
+                      FROM old_rows
+                      UNION ALL
+                      SELECT hr_id, is_active::int, 1, comments_count
+                      FROM new_rows) AS changes
+                GROUP BY hr_id
+            ), commented AS (
+                SELECT DISTINCT new_rows.hr_id
+                FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+                WHERE new_rows.comments_count > old_rows.comments_count
+            )
+            INSERT INTO hr_stats AS s (hr_id, active_vacansies, total_vacansies, comments_count,
+                                       last_comment_at, updated_at)
+            SELECT delta.hr_id, delta.active, delta.total, delta.comments,
+                   CASE WHEN commented.hr_id IS NOT NULL THEN now() END, now()
+            FROM delta LEFT JOIN commented ON commented.hr_id = delta.hr_id
+            -- правка текста вакансии счетчиков не меняет и строку hr_stats не трогает
+            WHERE delta.active <> 0 OR delta.total <> 0 OR delta.comments <> 0
+            ON CONFLICT (hr_id) DO UPDATE SET
+                active_vacansies = s.active_vacansies + EXCLUDED.active_vacansies,
+                total_vacansies = s.total_vacansies + EXCLUDED.total_vacansies,
+                comments_count = s.comments_count + EXCLUDED.comments_count,
+                last_comment_at = greatest(s.last_comment_at, EXCLUDED.last_comment_at),
+                updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION hr_stats_vacansy_delete() RETURNS trigger AS $$
+        BEGIN
+            -- только UPDATE: при каскадном удалении HR строки hr уже нет и вставка нарушила бы FK
+            UPDATE hr_stats AS s SET
+                active_vacansies = s.active_vacansies - deleted.active,
+                total_vacansies = s.total_vacansies - deleted.total,
+                comments_count = s.comments_count - deleted.comments,
+                updated_at = now()
+            FROM (SELECT hr_id, count(*) FILTER (WHERE is_active) AS active, count(*) AS total,
+                         sum(comments_count) AS comments
+                  FROM old_rows
+                  GROUP BY hr_id) AS deleted
+            WHERE s.hr_id = deleted.hr_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER hr_stats_vacansy_insert AFTER INSERT ON vacansy
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION hr_stats_vacansy_insert();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER hr_stats_vacansy_update AFTER UPDATE ON vacansy
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION hr_stats_vacansy_update();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER hr_stats_vacansy_delete AFTER DELETE ON vacansy
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION hr_stats_vacansy_delete();
+        """
+    )
+    # начальное заполнение по уже существующим вакансиям и комментариям
+    op.execute(
+        """
+        INSERT INTO hr_stats (hr_id, active_vacansies, total_vacansies, comments_count,
+                              last_vacansy_at, last_comment_at)
+        SELECT vacansy.hr_id, count(*) FILTER (WHERE vacansy.is_active), count(*), sum(vacansy.comments_count),
+               max(vacansy.created), max(last_comment.created_at)
+        FROM vacansy
+        LEFT JOIN LATERAL (SELECT max(created_at) AS created_at FROM comment
+                           WHERE comment.vacansy_id = vacansy.id) AS last_comment ON true
+        GROUP BY vacansy.hr_id;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS hr_stats_vacansy_delete ON vacansy;")
+    op.execute("DROP TRIGGER IF EXISTS hr_stats_vacansy_update ON vacansy;")
+    op.execute("DROP TRIGGER IF EXISTS hr_stats_vacansy_insert ON vacansy;")
+    op.execute("DROP FUNCTION IF EXISTS hr_stats_vacansy_delete();")
+    op.execute("DROP FUNCTION IF EXISTS hr_stats_vacansy_update();")
+    op.execute("DROP FUNCTION IF EXISTS hr_stats_vacansy_insert();")
+    op.drop_table("hr_stats")
@@ -0,0 +1,56 @@
+"""Add user_purge progress table and foreign key indexes used by the purge
+
+Revision ID: 41cb164a7172
+Revises: dad747dc8860
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "41cb164a7172"
+down_revision: Union[str, None] = "dad747dc8860"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# каждая пачка очистки ищет строки по внешнему ключу
+FOREIGN_KEY_INDEXES = {
+    "ix_comment_user_id": ("comment", ["user_id"]),
+    "ix_vacansy_hr_id": ("vacansy", ["hr_id"]),
+    "ix_hr_user_id": ("hr", ["user_id"]),
+    "ix_resume_user_id": ("resume", ["user_id"]),
+    "ix_entry_user_id": ("entry", ["user_id"]),
+    "ix_user_role_user_id": ("user_role", ["user_id"]),
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_purge",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("status", sa.String(length=20), server_default="pending", nullable=False),
+        sa.Column("step", sa.String(length=50), nullable=True),
+        sa.Column("rows_deleted", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("timings", postgresql.JSONB(astext_type=sa.Text()), server_default="{}", nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in FOREIGN_KEY_INDEXES.items():
+            # прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс с тем же именем
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, _) in reversed(FOREIGN_KEY_INDEXES.items()):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    op.drop_table("user_purge")
@@ -0,0 +1,53 @@
+"""Add saved searches and their new-vacancy matches
+
+Revision ID: 508a97c7e382
+Revises: 431fbf278394
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "508a97c7e382"
+down_revision: Union[str, None] = "431fbf278394"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "saved_search",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("filters", postgresql.JSONB(astext_type=sa.Text()), server_default="{}", nullable=False),
+        sa.Column("predicate_key", sa.String(length=40), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], onupdate="CASCADE", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_saved_search_user_id", "saved_search", ["user_id"])
+    op.create_table(
+        "saved_search_match",
+        sa.Column("saved_search_id", sa.UUID(), nullable=False),
+        sa.Column("vacansy_id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["saved_search_id"], ["saved_search.id"], onupdate="CASCADE", ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["vacansy_id"], ["vacansy.id"], onupdate="CASCADE", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("saved_search_id", "vacansy_id"),
+    )
+    op.create_index("ix_saved_search_match_search_created", "saved_search_match", ["saved_search_id", "created_at"])
+    op.create_index("ix_saved_search_match_vacansy_id", "saved_search_match", ["vacansy_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_saved_search_match_vacansy_id", table_name="saved_search_match")
+    op.drop_index("ix_saved_search_match_search_created", table_name="saved_search_match")
+    op.drop_table("saved_search_match")
+    op.drop_index("ix_saved_search_user_id", table_name="saved_search")
+    op.drop_table("saved_search")
@@ -0,0 +1,27 @@
+"""Add role permissions bitmask
+
+Revision ID: ed1178d9c543
+Revises: 508a97c7e382
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ed1178d9c543"
+down_revision: Union[str, None] = "508a97c7e382"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # постоянное значение по умолчанию: PostgreSQL не переписывает таблицу
+    op.add_column("role", sa.Column("permissions", sa.BigInteger(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("role", "permissions")
@@ -0,0 +1,45 @@
+"""Add unique (user_id, role_id) index and covering role_id index on user_role
+
+Revision ID: 9229454c9282
+Revises: ed1178d9c543
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9229454c9282"
+down_revision: Union[str, None] = "ed1178d9c543"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # накопившиеся дубли: из каждой группы остается одна строка
+    op.execute(sa.text(
+        "DELETE FROM user_role a USING user_role b "
+        "WHERE a.user_id = b.user_id AND a.role_id = b.role_id AND a.id > b.id"))
+    # CONCURRENTLY не блокирует запись, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        # прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс с тем же именем
+        op.drop_index("ux_user_role_user_id_role_id", table_name="user_role",
+                      postgresql_concurrently=True, if_exists=True)
+        op.create_index("ux_user_role_user_id_role_id", "user_role", ["user_id", "role_id"],
+                        unique=True, postgresql_concurrently=True)
+        op.drop_index("ix_user_role_role_id", table_name="user_role",
+                      postgresql_concurrently=True, if_exists=True)
+        op.create_index("ix_user_role_role_id", "user_role", ["role_id"],
+                        postgresql_include=["user_id", "id"], postgresql_concurrently=True)
+        # поиск по user_id обслуживает первая колонка уникального индекса
+        op.drop_index("ix_user_role_user_id", table_name="user_role", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_user_role_user_id", "user_role", ["user_id"], postgresql_concurrently=True)
+        op.drop_index("ix_user_role_role_id", table_name="user_role", postgresql_concurrently=True)
+        op.drop_index("ux_user_role_user_id_role_id", table_name="user_role", postgresql_concurrently=True)
@@ -1,14 +1,17 @@
 import logging
 import logging.config
 
-from fastapi import APIRouter, Depends, Header, Response, Cookie
-from fastapi_pagination import LimitOffsetPage
+from fastapi import APIRouter, Depends, Header, Response, Cookie, status
 
 from src.core.config import settings
 from src.schemas.user import UserCreate, ChangeUserData, ChangeUserPassword, LoginRequest, UserResponse
 from src.schemas.entry import EntryResponse
+from src.schemas.job import JobAcceptedResponse
+from src.schemas.pagination import LimitOffsetTotalPage
 from src.utils.token_manager import verify_refresh_token, verify_access_token
 from src.services.auth import AuthServiceBase, get_auth_service
+from src.utils.pagination import TotalMode
+from src.utils.responses import TypedJSONResponse
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
@@ -89,7 +92,7 @@ async def user_data(token: str = Depends(verify_access_token),
 
 
 @auth_router.get("/entries",
-                 response_model=LimitOffsetPage[EntryResponse],
+                 response_model=LimitOffsetTotalPage[EntryResponse],
                  summary="Получить запрос на историю записей пользователей",
                  description="Предоставляет пользователю доступ к записям с помощью токена доступа",
                  response_description="User entries")
@@ -97,9 +100,10 @@ async def user_entries(unique: bool = True,
                        token: str = Depends(verify_access_token),
                        auth_service: AuthServiceBase = Depends(
                            get_auth_service),
-                       ) -> LimitOffsetPage[EntryResponse]:
-    user_entries = await auth_service.entry_history(token, unique)
-    return user_entries
+                       ) -> Response:
+    # история входов растет бесконечно, total не считаем - достаточно has_next
+    user_entries = await auth_service.entry_history(token, unique, total_mode=TotalMode.none)
+    return TypedJSONResponse(user_entries, LimitOffsetTotalPage[EntryResponse])
 
 
 @auth_router.get("/role",
@@ -130,15 +134,19 @@ async def logout(response: Response,
 
 
 @auth_router.get("/logout_all",
+                 status_code=status.HTTP_202_ACCEPTED,
+                 response_model=JobAcceptedResponse,
                  summary="Получить запрос на выход из системы из всех активных сеансов",
-                 description="Закрывает сеансы пользователя и удаляет токены доступа и обновления",
-                 response_description="None")
+                 description="Сразу отзывает текущий токен доступа; остальные сеансы закрывает фоновая задача, "
+                             "ее состояние - GET /jobs/{job_id}",
+                 response_description="id задачи закрытия сеансов")
 async def logout_all(response: Response,
                      token: str = Depends(verify_access_token),
-                     auth_service: AuthServiceBase = Depends(get_auth_service)) -> None:
-    await auth_service.logout_all(token)
+                     auth_service: AuthServiceBase = Depends(get_auth_service)) -> JobAcceptedResponse:
+    job_id = await auth_service.logout_all(token)
     log.debug('Удалить refresh token в cookie')
     response.delete_cookie(settings.token.refresh_token_cookie_name)
+    return JobAcceptedResponse(job_id=job_id)
 
 
 @auth_router.post("/change_pwd",
@@ -177,13 +185,16 @@ async def change_user_data(changed_user_data: ChangeUserData,
 
 @auth_router.post("/deactivate_user",
                   summary="Отправить запрос на деактивацию пользователя",
+                  status_code=status.HTTP_202_ACCEPTED,
+                  response_model=JobAcceptedResponse,
                   description="Inactivate user's account",
-                  response_description="None")
+                  response_description="id задачи закрытия сеансов")
 async def deactivфte_user(response: Response,
                           access_token: str = Depends(verify_access_token),
-                          auth_service: AuthServiceBase = Depends(get_auth_service)):
+                          auth_service: AuthServiceBase = Depends(get_auth_service)) -> JobAcceptedResponse:
     log_msg = f'Деактивация пользователя: {deactivфte_user}'
     log.debug(log_msg)
-    await auth_service.deactivate_user(access_token)
+    job_id = await auth_service.deactivate_user(access_token)
     log.debug('Удалить refresh token в cookie')
     response.delete_cookie(settings.token.refresh_token_cookie_name)
+    return JobAcceptedResponse(job_id=job_id)
@@ -0,0 +1,37 @@
+import logging
+import logging.config
+
+from fastapi import APIRouter, status
+from fastapi.responses import ORJSONResponse
+
+from src.schemas.health import HealthResponse, HealthStatus
+from src.services.warmup import warmup
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+health_router = APIRouter(prefix="/health")
+
+
+@health_router.get("/live",
+                   response_model=HealthResponse,
+                   summary="Проверка, что процесс жив",
+                   description="Отвечает 200, пока процесс обрабатывает запросы; базу и Redis не проверяет",
+                   response_description="Процесс жив")
+async def health_live() -> HealthResponse:
+    return HealthResponse(status=HealthStatus.alive)
+
+
+@health_router.get("/ready",
+                   response_model=HealthResponse,
+                   responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": HealthResponse}},
+                   summary="Проверка готовности принимать трафик",
+                   description="503, пока не закончен прогрев процесса (соединения пулов, горячие запросы, "
+                               "каталог ролей); после него 200 и длительность шагов прогрева",
+                   response_description="Процесс прогрет")
+async def health_ready() -> HealthResponse | ORJSONResponse:
+    if not warmup.ready:
+        return ORJSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                              content=HealthResponse(status=HealthStatus.warming_up).model_dump(mode="json"))
+    return HealthResponse(status=HealthStatus.ready, warmup=warmup.report)
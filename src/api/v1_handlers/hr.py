@@ -0,0 +1,30 @@
+from uuid import UUID
+import logging
+import logging.config
+
+from fastapi import APIRouter, Depends
+
+from src.schemas.hr import HrDashboardResponse
+from src.services.hr_stats import HrStatsServiceBase, get_hr_stats_service
+from src.utils.token_manager import TokenManagerBase, get_token_manager, verify_access_token
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+hr_router = APIRouter(prefix="/hr")
+
+
+@hr_router.get("/{hr_id}/dashboard",
+               response_model=HrDashboardResponse,
+               summary="Запрос на панель HR",
+               description="Число активных и всех вакансий HR, комментариев к ним и время последней "
+                           "активности; доступно только владельцу HR",
+               response_description="Агрегаты по вакансиям HR")
+async def hr_dashboard(hr_id: UUID,
+                       token: str = Depends(verify_access_token),
+                       token_manager: TokenManagerBase = Depends(get_token_manager),
+                       hr_stats_service: HrStatsServiceBase = Depends(get_hr_stats_service)) -> HrDashboardResponse:
+    token_data = await token_manager.get_data_from_access_token(token)
+    dashboard = await hr_stats_service.get_dashboard(hr_id, token_data.sub)
+    return dashboard
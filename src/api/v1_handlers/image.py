@@ -0,0 +1,26 @@
+from typing import Optional
+import logging
+import logging.config
+
+from fastapi import APIRouter, Depends, Header
+
+from src.services.image import ImageServiceBase, get_image_service
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+image_router = APIRouter(prefix="/images")
+
+
+@image_router.get("/{digest}/{size}",
+                  summary="Запрос на получение изображения",
+                  description="Файл изображения нужного размера; поддерживаются Range и If-None-Match",
+                  response_description="Изображение в формате WebP")
+async def get_image(digest: str,
+                    size: str,
+                    range_header: Optional[str] = Header(default=None, alias="Range"),
+                    if_none_match: Optional[str] = Header(default=None),
+                    image_service: ImageServiceBase = Depends(get_image_service)):
+    response = await image_service.get_image(digest, size, range_header, if_none_match)
+    return response
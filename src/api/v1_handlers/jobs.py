@@ -0,0 +1,42 @@
+import logging
+import logging.config
+
+from fastapi import APIRouter, Depends
+
+from src.schemas.job import JobMetricsResponse, JobStatusResponse
+from src.schemas.token import AccessTokenPayload
+from src.services.job import JobServiceBase, get_job_service
+from src.utils.permissions import Permission
+from src.utils.token_manager import TokenManagerBase, get_token_manager, require_permission, verify_access_token
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+jobs_router = APIRouter(prefix="/jobs")
+
+
+@jobs_router.get("/metrics",
+                 response_model=JobMetricsResponse,
+                 summary="Запрос на метрики очередей задач",
+                 description="По каждой очереди: число ожидающих и выполняемых задач, возраст самой старой "
+                             "ожидающей, счетчики выполненных, упавших и повторенных задач, среднее ожидание "
+                             "в очереди и среднее время выполнения",
+                 response_description="Метрики очередей")
+async def jobs_metrics(token_data: AccessTokenPayload = Depends(require_permission(Permission.ops_read)),
+                       job_service: JobServiceBase = Depends(get_job_service)) -> JobMetricsResponse:
+    return await job_service.get_metrics()
+
+
+@jobs_router.get("/{job_id}",
+                 response_model=JobStatusResponse,
+                 summary="Запрос на состояние задачи",
+                 description="Состояние фоновой задачи, поставленной текущим пользователем: "
+                             "scheduled, queued, running, retrying, done или failed",
+                 response_description="Состояние задачи")
+async def job_status(job_id: str,
+                     token: str = Depends(verify_access_token),
+                     token_manager: TokenManagerBase = Depends(get_token_manager),
+                     job_service: JobServiceBase = Depends(get_job_service)) -> JobStatusResponse:
+    token_data = await token_manager.get_data_from_access_token(token)
+    return await job_service.get_status(job_id, token_data.sub)
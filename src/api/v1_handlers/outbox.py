@@ -0,0 +1,28 @@
+import logging
+import logging.config
+
+from fastapi import APIRouter, Depends
+
+from src.schemas.outbox import OutboxLagResponse
+from src.schemas.token import AccessTokenPayload
+from src.services.outbox import OutboxServiceBase, get_outbox_service
+from src.utils.permissions import Permission
+from src.utils.token_manager import require_permission
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+outbox_router = APIRouter(prefix="/outbox")
+
+
+@outbox_router.get("/lag",
+                   response_model=OutboxLagResponse,
+                   summary="Запрос на отставание потока изменений",
+                   description="Число неопубликованных событий outbox и возраст самого старого; "
+                               "по каждому потоку Redis Streams - длина, а по группам потребителей "
+                               "число выданных, но не подтвержденных (pending) и еще не выданных (lag) событий",
+                   response_description="Метрики отставания")
+async def outbox_lag(token_data: AccessTokenPayload = Depends(require_permission(Permission.ops_read)),
+                     outbox_service: OutboxServiceBase = Depends(get_outbox_service)) -> OutboxLagResponse:
+    return await outbox_service.get_lag()
@@ -0,0 +1,88 @@
+from typing import Optional
+from uuid import UUID
+import logging
+import logging.config
+
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from fastapi_filter import FilterDepends
+
+from src.core.config import settings
+from src.schemas.image import ImageResponse
+from src.schemas.resume import ResumeResponse
+from src.services.image import ImageServiceBase, get_image_service
+from src.services.resume import ResumeServiceBase, get_resume_service
+from src.utils.etag import check_not_modified, weak_etag
+from src.utils.export import ExportFormat, export_response
+from src.utils.filter import ResumeFilter
+from src.utils.permissions import Permission
+from src.utils.token_manager import TokenManagerBase, get_token_manager, require_permission, verify_access_token
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+resume_router = APIRouter(prefix="/resume")
+
+
+async def resume_not_modified(resume_id: UUID,
+                              request: Request,
+                              response: Response,
+                              token: str = Depends(verify_access_token),
+                              resume_service: ResumeServiceBase = Depends(get_resume_service)) -> None:
+    # зависимости маршрута выполняются раньше зависимостей обработчика: без проверки токена
+    # здесь 304 получил бы и неавторизованный клиент, узнав, какие резюме существуют.
+    # читается только версия: если копия клиента актуальна, резюме не загружается
+    version = await resume_service.get_version(resume_id)
+    if version is not None:
+        check_not_modified(request, response, weak_etag(resume_id, version.version), version.updated_at)
+
+
+@resume_router.get("/export",
+                   response_class=StreamingResponse,
+                   dependencies=[Depends(require_permission(Permission.hr_dashboard))],
+                   summary="Запрос на выгрузку резюме",
+                   description="Потоковая выгрузка активных резюме по фильтру в NDJSON или CSV; "
+                               "при Accept-Encoding: gzip ответ сжимается на лету. Доступна HR "
+                               "(право hr_dashboard)",
+                   response_description="Файл с резюме")
+async def export_resume(export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias="format"),
+                        resume_filter: ResumeFilter = FilterDepends(ResumeFilter),
+                        accept_encoding: Optional[str] = Header(default=None),
+                        resume_service: ResumeServiceBase = Depends(get_resume_service)):
+    log_msg = f'Выгрузка резюме: {resume_filter}, format={export_format}'
+    log.debug(log_msg)
+    content = resume_service.export(resume_filter, export_format)
+    return export_response(content, export_format, "resume", accept_encoding, settings.export.gzip_level)
+
+
+@resume_router.post("/{resume_id}/image",
+                    response_model=ImageResponse,
+                    summary="Запрос на загрузку фото к резюме",
+                    description="Изображение декодируется и уменьшается до всех размеров вне event loop; "
+                                "одинаковые файлы хранятся один раз",
+                    response_description="Адреса изображения во всех размерах")
+async def upload_resume_image(resume_id: UUID,
+                              file: UploadFile,
+                              token: str = Depends(verify_access_token),
+                              token_manager: TokenManagerBase = Depends(get_token_manager),
+                              image_service: ImageServiceBase = Depends(get_image_service)):
+    token_data = await token_manager.get_data_from_access_token(token)
+    # на байт больше лимита: этого достаточно, чтобы отказать, не читая файл целиком
+    data = await file.read(settings.image.max_upload_size + 1)
+    image = await image_service.upload_resume_image(resume_id, token_data.sub, data)
+    return image
+
+
+@resume_router.get("/{resume_id}",
+                   response_model=ResumeResponse,
+                   dependencies=[Depends(resume_not_modified)],
+                   summary="Запрос на получение резюме",
+                   description="Поддерживает If-None-Match / If-Modified-Since: "
+                               "если резюме не менялось, возвращается 304 без тела",
+                   response_description="Резюме")
+async def get_resume(resume_id: UUID,
+                     token: str = Depends(verify_access_token),
+                     resume_service: ResumeServiceBase = Depends(get_resume_service)):
+    resume = await resume_service.get_resume(resume_id)
+    return resume
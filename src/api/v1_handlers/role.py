@@ -2,10 +2,15 @@ from uuid import UUID
 import logging
 import logging.config
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
-from src.schemas.role import ResponseRole, RequestNewRoleToUser, RequestRole
+from src.schemas.pagination import LimitOffsetTotalPage
+from src.schemas.role import ResponseRole, RequestNewRoleToUser, RequestRole, RequestRolesToUsers, ResponseBulkRoles
 from src.services.role import RoleService, get_role_service
+from src.utils.etag import check_not_modified, weak_etag
+from src.utils.permissions import Permission
+from src.utils.responses import TypedJSONResponse
+from src.utils.token_manager import require_permission
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
@@ -13,15 +18,40 @@ log = logging.getLogger(__name__)
 
 role_router = APIRouter(prefix="/role")
 
+# менять роли и их назначения может только пользователь с правом role_manage;
+# первого такого пользователя назначает команда python -m src.services.role <email>
+
+
+async def role_not_modified(role_id: UUID,
+                            request: Request,
+                            response: Response,
+                            role_service: RoleService = Depends(get_role_service)) -> None:
+    version = await role_service.get_role_version(role_id)
+    if version is not None:
+        check_not_modified(request, response, weak_etag(role_id, version.version), version.updated_at)
+
+
+async def user_roles_not_modified(user_id: UUID,
+                                  request: Request,
+                                  response: Response,
+                                  role_service: RoleService = Depends(get_role_service)) -> None:
+    # список меняется и при изменении роли, и при выдаче/отзыве: в ETag входят все пары (id, version)
+    # и limit/offset страницы
+    versions = await role_service.get_user_roles_version(user_id)
+    if versions:
+        check_not_modified(request, response, weak_etag(user_id, request.url.query,
+                                                        *(f"{id}:{version}" for id, version in versions)))
+
 
 @role_router.post("/new",
                   response_model=ResponseRole,
+                  dependencies=[Depends(require_permission(Permission.role_manage))],
                   summary="Отправить запрос на создание новой роли",
                   description="Создает новую роль и возвращает новый объект role",
                   response_description="object Role")
 async def create_new_role(role_body: RequestRole,
                           role_service: RoleService = Depends(get_role_service)) -> ResponseRole:
-    new_role = await role_service.create_role(role_body.name)
+    new_role = await role_service.create_role(role_body.name, role_body.permissions)
     if not new_role:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -32,23 +62,25 @@ async def create_new_role(role_body: RequestRole,
 
 @role_router.patch("/update",
                    response_model=ResponseRole,
+                   dependencies=[Depends(require_permission(Permission.role_manage))],
                    summary="запрос на обновление существующей роли",
                    description="Обновляет существующую роль и возвращает новый объект role",
                    response_description="object Role")
 async def update_existed_role(role_id: UUID,
                               role_body: RequestRole,
                               role_service: RoleService = Depends(get_role_service)) -> ResponseRole:
-    updated_role = await role_service.update_role(role_id, role_body.name)
+    updated_role = await role_service.update_role(role_id, role_body.name, role_body.permissions)
     if not updated_role:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Роль не обновлена"
         )
-    return ResponseRole(id=updated_role.id, name=updated_role.name)
+    return updated_role
 
 
 @role_router.get("/",
                  response_model=ResponseRole,
+                 dependencies=[Depends(role_not_modified)],
                  summary="запрос на существующую роль",
                  description="Получает существующую роль и возвращает новый объект role",
                  response_description="object Role")
@@ -60,11 +92,12 @@ async def get_existed_role(role_id: UUID,
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Роль не существует"
         )
-    return ResponseRole(id=role.id, name=role.name)
+    return role
 
 
 @role_router.delete("/",
                     response_model=bool,
+                    dependencies=[Depends(require_permission(Permission.role_manage))],
                     summary="Запрос на удаление существующей роли",
                     description="Удаляет существующую роль и возвращает объект bool",
                     response_description="True or False")
@@ -80,27 +113,31 @@ async def delete_existed_role(role_id: UUID,
 
 
 @role_router.get("/user",
-                 response_model=list[ResponseRole],
+                 response_model=LimitOffsetTotalPage[ResponseRole],
+                 dependencies=[Depends(user_roles_not_modified)],
                  summary="Запрос на получение роли пользователя",
                  description="Получение списка ролей пользователя",
                  response_description="UUID, name")
 async def get_user_role(user_id: UUID,
-                        role_service: RoleService = Depends(get_role_service)):
+                        response: Response,
+                        role_service: RoleService = Depends(get_role_service)) -> Response:
     log_msg = f'{user_id=}, {role_service=}'
     log.debug(log_msg)
     roles = await role_service.get_user_access_area(user_id)
-    log_msg = f'{roles=}'
-    log.debug(log_msg)
     if not roles:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Role не обнаружен"
         )
-    return roles
+    # repr страницы не пишем в лог: f-строка строится даже при выключенном DEBUG и стоит дороже сериализации
+    log.debug(f'{user_id=}: {len(roles.items)} ролей')
+    # заголовки, выставленные зависимостями (ETag), в готовый Response сами не попадают
+    return TypedJSONResponse(roles, LimitOffsetTotalPage[ResponseRole], headers=response.headers)
 
 
 @role_router.post("/role-to-user",
                   response_model=bool,
+                  dependencies=[Depends(require_permission(Permission.role_manage))],
                   summary="Запрос на добавление новой роли пользователю",
                   description="Добавьте новую роль пользователю",
                   response_description="True or False")
@@ -117,6 +154,7 @@ async def set_role_to_user(role_body: RequestNewRoleToUser,
 
 @role_router.delete("/role-to-user",
                     response_model=bool,
+                    dependencies=[Depends(require_permission(Permission.role_manage))],
                     summary="Запрос на удаление роли пользователя",
                     description="Удаление роли у пользователя",
                     response_description="True or False")
@@ -130,3 +168,30 @@ async def remove_from_role_user(role_body: RequestNewRoleToUser,
             detail="Роль не найдена"
         )
     return bool(updated_user)
+
+
+@role_router.post("/role-to-user/bulk",
+                  response_model=ResponseBulkRoles,
+                  dependencies=[Depends(require_permission(Permission.role_manage))],
+                  summary="Запрос на назначение ролей списку пользователей",
+                  description="Назначает роли по списку пар (user_id, role_id): все пользователи и роли "
+                              "проверяются двумя запросами, назначения записываются одним запросом. "
+                              "Для каждой пары возвращается результат",
+                  response_description="Результат по каждой паре и число пар по результатам")
+async def set_roles_to_users(role_body: RequestRolesToUsers,
+                             role_service: RoleService = Depends(get_role_service)) -> Response:
+    result = await role_service.set_roles_to_users(role_body.pairs)
+    return TypedJSONResponse(result, ResponseBulkRoles)
+
+
+@role_router.delete("/role-to-user/bulk",
+                    response_model=ResponseBulkRoles,
+                    dependencies=[Depends(require_permission(Permission.role_manage))],
+                    summary="Запрос на отзыв ролей у списка пользователей",
+                    description="Отзывает роли по списку пар (user_id, role_id) одним запросом "
+                                "и возвращает результат для каждой пары",
+                    response_description="Результат по каждой паре и число пар по результатам")
+async def remove_roles_from_users(role_body: RequestRolesToUsers,
+                                  role_service: RoleService = Depends(get_role_service)) -> Response:
+    result = await role_service.remove_roles_from_users(role_body.pairs)
+    return TypedJSONResponse(result, ResponseBulkRoles)
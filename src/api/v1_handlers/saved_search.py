@@ -0,0 +1,74 @@
+from uuid import UUID
+import logging
+import logging.config
+
+from fastapi import APIRouter, Depends, Query
+from fastapi_filter import FilterDepends
+
+from src.schemas.saved_search import SavedSearchResponse
+from src.schemas.vacansy import VacansyShortResponse
+from src.services.saved_search import SavedSearchServiceBase, get_saved_search_service
+from src.utils.filter import VacansyFilter
+from src.utils.token_manager import TokenManagerBase, get_token_manager, verify_access_token
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+saved_search_router = APIRouter(prefix="/saved_search")
+
+
+@saved_search_router.post("/",
+                          response_model=SavedSearchResponse,
+                          summary="Запрос на сохранение поиска вакансий",
+                          description="Сохраняет фильтр с теми же параметрами, что и /vacansy/search; "
+                                      "новые подходящие вакансии появляются в /saved_search/{id}/matches",
+                          response_description="Сохраненный поиск")
+async def create_saved_search(name: str = Query(max_length=100),
+                              vacansy_filter: VacansyFilter = FilterDepends(VacansyFilter),
+                              token: str = Depends(verify_access_token),
+                              token_manager: TokenManagerBase = Depends(get_token_manager),
+                              saved_search_service: SavedSearchServiceBase = Depends(get_saved_search_service)
+                              ) -> SavedSearchResponse:
+    token_data = await token_manager.get_data_from_access_token(token)
+    return await saved_search_service.create(token_data.sub, name, vacansy_filter)
+
+
+@saved_search_router.get("/",
+                         response_model=list[SavedSearchResponse],
+                         summary="Запрос на список сохраненных поисков",
+                         response_description="Сохраненные поиски пользователя")
+async def get_saved_searches(token: str = Depends(verify_access_token),
+                             token_manager: TokenManagerBase = Depends(get_token_manager),
+                             saved_search_service: SavedSearchServiceBase = Depends(get_saved_search_service)
+                             ) -> list[SavedSearchResponse]:
+    token_data = await token_manager.get_data_from_access_token(token)
+    return await saved_search_service.get_list(token_data.sub)
+
+
+@saved_search_router.get("/{saved_search_id}/matches",
+                         response_model=list[VacansyShortResponse],
+                         summary="Запрос на новые вакансии сохраненного поиска",
+                         description="Вакансии, созданные после сохранения поиска и подошедшие под него; "
+                                     "последние найденные первыми",
+                         response_description="Подошедшие вакансии")
+async def get_saved_search_matches(saved_search_id: UUID,
+                                   limit: int = Query(default=50, ge=1, le=200),
+                                   token: str = Depends(verify_access_token),
+                                   token_manager: TokenManagerBase = Depends(get_token_manager),
+                                   saved_search_service: SavedSearchServiceBase = Depends(get_saved_search_service)
+                                   ) -> list[VacansyShortResponse]:
+    token_data = await token_manager.get_data_from_access_token(token)
+    return await saved_search_service.get_matches(saved_search_id, token_data.sub, limit)
+
+
+@saved_search_router.delete("/{saved_search_id}",
+                            summary="Запрос на удаление сохраненного поиска",
+                            response_description="id удаленного поиска")
+async def delete_saved_search(saved_search_id: UUID,
+                              token: str = Depends(verify_access_token),
+                              token_manager: TokenManagerBase = Depends(get_token_manager),
+                              saved_search_service: SavedSearchServiceBase = Depends(get_saved_search_service)
+                              ) -> UUID:
+    token_data = await token_manager.get_data_from_access_token(token)
+    return await saved_search_service.delete(saved_search_id, token_data.sub)
@@ -0,0 +1,171 @@
+from typing import Optional
+from uuid import UUID
+import logging
+import logging.config
+
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi_filter import FilterDepends
+
+from src.core.config import settings
+from src.schemas.comment import CommentResponse
+from src.schemas.pagination import CursorPage
+from src.schemas.resume import ResumeMatch
+from src.schemas.token import AccessTokenPayload
+from src.schemas.vacansy import (CommentsProjection, VacansyDetailResponse, VacansyImportProgress,
+                                 VacansyImportReport, VacansyShortResponse, VacansySearchPage)
+from src.services.matching import MatchingServiceBase, get_matching_service
+from src.services.recommendation import RecommendationServiceBase, get_recommendation_service
+from src.services.vacansy import VacansyServiceBase, get_vacansy_service
+from src.services.vacansy_import import VacansyImportServiceBase, get_vacansy_import_service
+from src.utils.etag import check_not_modified, weak_etag
+from src.utils.export import ExportFormat, export_response
+from src.utils.filter import VacansyFilter
+from src.utils.responses import TypedJSONResponse
+from src.utils.permissions import Permission
+from src.utils.token_manager import TokenManagerBase, get_token_manager, require_permission, verify_access_token
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+vacansy_router = APIRouter(prefix="/vacansy")
+
+
+async def vacansy_not_modified(vacansy_id: UUID,
+                               request: Request,
+                               response: Response,
+                               vacansy_service: VacansyServiceBase = Depends(get_vacansy_service)) -> None:
+    # читается только версия: если копия клиента актуальна, карточка не загружается
+    version = await vacansy_service.get_version(vacansy_id)
+    if version is not None:
+        check_not_modified(request, response,
+                           weak_etag(vacansy_id, version.version, request.url.query), version.updated_at)
+
+
+@vacansy_router.get("/search",
+                    response_model=VacansySearchPage[VacansyShortResponse],
+                    summary="Запрос на поиск вакансий со счетчиками фасетов",
+                    description="Возвращает страницу вакансий и количество активных вакансий "
+                                "по месту работы, специальности и опыту",
+                    response_description="Вакансии и фасеты")
+async def search_vacansy(vacansy_filter: VacansyFilter = FilterDepends(VacansyFilter),
+                         vacansy_service: VacansyServiceBase = Depends(get_vacansy_service)) -> Response:
+    log_msg = f'Поиск вакансий: {vacansy_filter}'
+    log.debug(log_msg)
+    page = await vacansy_service.search(vacansy_filter)
+    return TypedJSONResponse(page, VacansySearchPage[VacansyShortResponse])
+
+
+@vacansy_router.get("/export",
+                    response_class=StreamingResponse,
+                    summary="Запрос на выгрузку вакансий",
+                    description="Потоковая выгрузка активных вакансий по фильтру в NDJSON или CSV; "
+                                "при Accept-Encoding: gzip ответ сжимается на лету",
+                    response_description="Файл с вакансиями")
+async def export_vacansy(export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias="format"),
+                         vacansy_filter: VacansyFilter = FilterDepends(VacansyFilter),
+                         accept_encoding: Optional[str] = Header(default=None),
+                         vacansy_service: VacansyServiceBase = Depends(get_vacansy_service)):
+    log_msg = f'Выгрузка вакансий: {vacansy_filter}, format={export_format}'
+    log.debug(log_msg)
+    content = vacansy_service.export(vacansy_filter, export_format)
+    return export_response(content, export_format, "vacansy", accept_encoding, settings.export.gzip_level)
+
+
+@vacansy_router.post("/import",
+                     response_model=VacansyImportReport,
+                     summary="Запрос на массовую загрузку вакансий",
+                     description="Тело запроса - файл CSV (с заголовком) или NDJSON. Валидные строки "
+                                 "вставляются пачками через COPY; чтобы продолжить прерванную загрузку, "
+                                 "отправьте тот же файл с import_id из прошлого ответа (в том числе "
+                                 "после статуса failed). HR должен принадлежать пользователю токена; "
+                                 "файл больше IMPORT_MAX_FILE_SIZE байт отклоняется с 413",
+                     response_description="Отчет о загрузке с ошибками по строкам")
+async def import_vacansy(request: Request,
+                         hr_id: UUID,
+                         import_id: Optional[UUID] = None,
+                         file_format: ExportFormat = Query(default=ExportFormat.csv, alias="format"),
+                         token: str = Depends(verify_access_token),
+                         token_manager: TokenManagerBase = Depends(get_token_manager),
+                         import_service: VacansyImportServiceBase = Depends(get_vacansy_import_service)):
+    log_msg = f'Загрузка вакансий: hr_id={hr_id}, import_id={import_id}, format={file_format}'
+    log.debug(log_msg)
+    token_data = await token_manager.get_data_from_access_token(token)
+    report = await import_service.import_file(hr_id, token_data.sub, import_id, file_format, request.stream())
+    return report
+
+
+@vacansy_router.get("/import/{import_id}",
+                    response_model=VacansyImportProgress,
+                    summary="Запрос на прогресс загрузки вакансий",
+                    description="Сколько строк файла уже обработано, вставлено и отклонено",
+                    response_description="Прогресс загрузки")
+async def import_progress(import_id: UUID,
+                          token: str = Depends(verify_access_token),
+                          token_manager: TokenManagerBase = Depends(get_token_manager),
+                          import_service: VacansyImportServiceBase = Depends(get_vacansy_import_service)):
+    token_data = await token_manager.get_data_from_access_token(token)
+    progress = await import_service.get_progress(import_id, token_data.sub)
+    return progress
+
+
+@vacansy_router.get("/recommended",
+                    response_model=list[VacansyShortResponse],
+                    summary="Запрос на рекомендованные вакансии",
+                    description="Вакансии, подобранные по резюме пользователя фоновой задачей",
+                    response_description="Вакансии в порядке убывания сходства")
+async def recommended_vacansy(limit: int = Query(default=20, ge=1, le=settings.recommendation.top_n),
+                              token: str = Depends(verify_access_token),
+                              token_manager: TokenManagerBase = Depends(get_token_manager),
+                              recommendation_service: RecommendationServiceBase = Depends(
+                                  get_recommendation_service)) -> Response:
+    token_data = await token_manager.get_data_from_access_token(token)
+    recommended = await recommendation_service.get_recommended(token_data.sub, limit)
+    return TypedJSONResponse(recommended, list[VacansyShortResponse])
+
+
+@vacansy_router.get("/{vacansy_id}/matches",
+                    response_model=list[ResumeMatch],
+                    summary="Запрос на подбор резюме к вакансии",
+                    description="Ранжирует активные резюме по сходству с требованиями вакансии. "
+                                "Доступен HR (право hr_dashboard) и только для вакансий его HR",
+                    response_description="Лучшие резюме с оценкой сходства")
+async def match_resumes(vacansy_id: UUID,
+                        limit: int = Query(default=settings.matching.top_k, ge=1, le=500),
+                        token_data: AccessTokenPayload = Depends(require_permission(Permission.hr_dashboard)),
+                        matching_service: MatchingServiceBase = Depends(get_matching_service)) -> Response:
+    matches = await matching_service.match_resumes(vacansy_id, token_data.sub, limit)
+    return TypedJSONResponse(matches, list[ResumeMatch])
+
+
+@vacansy_router.get("/{vacansy_id}/comments",
+                    response_model=CursorPage[CommentResponse],
+                    dependencies=[Depends(vacansy_not_modified)],
+                    summary="Запрос на комментарии к вакансии",
+                    description="Комментарии в порядке создания; для следующей страницы "
+                                "передайте next_cursor из ответа",
+                    response_description="Страница комментариев и курсор следующей страницы")
+async def get_comments(vacansy_id: UUID,
+                       response: Response,
+                       limit: int = Query(default=50, ge=1, le=200),
+                       cursor: Optional[str] = Query(default=None),
+                       vacansy_service: VacansyServiceBase = Depends(get_vacansy_service)) -> Response:
+    comments = await vacansy_service.get_comments(vacansy_id, limit, cursor)
+    # заголовки, выставленные зависимостями (ETag), в готовый Response сами не попадают
+    return TypedJSONResponse(comments, CursorPage[CommentResponse], headers=response.headers)
+
+
+@vacansy_router.get("/{vacansy_id}",
+                    response_model=VacansyDetailResponse,
+                    dependencies=[Depends(vacansy_not_modified)],
+                    summary="Запрос на получение вакансии",
+                    description="comments=none - без комментариев, latest - последние comments_limit, "
+                                "all - все комментарии",
+                    response_description="Вакансия")
+async def get_vacansy(vacansy_id: UUID,
+                      comments: CommentsProjection = Query(default=CommentsProjection.latest),
+                      comments_limit: int = Query(default=20, ge=1, le=200),
+                      vacansy_service: VacansyServiceBase = Depends(get_vacansy_service)):
+    vacansy = await vacansy_service.get_vacansy(vacansy_id, comments, comments_limit)
+    return vacansy
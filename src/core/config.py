@@ -1,5 +1,7 @@
+import os
 from pprint import pprint
 from pathlib import Path
+from typing import Optional
 
 from pydantic import SecretStr, BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -55,6 +57,205 @@ class RedisSettings(BaseSettings):
     password: SecretStr
 
 
+class PaginationSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="pagination_",
+                                      env_file=BASE_DIR / ".env")
+
+    count_cache_ttl: int = 30
+    count_cache_size: int = 1024
+    exact_threshold: int = 1000
+
+
+class FacetSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="facet_",
+                                      env_file=BASE_DIR / ".env")
+
+    snapshot_ttl: float = 10
+    top_values: int = 20
+
+
+class MatchingSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="matching_",
+                                      env_file=BASE_DIR / ".env")
+
+    path: Path = BASE_DIR / "var" / "matching"
+    dim: int = 2 ** 18
+    nnz: int = 64
+    chunk_rows: int = 65536
+    sync_batch_size: int = 1000
+    top_k: int = 20
+
+
+class RecommendationSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="recommendation_",
+                                      env_file=BASE_DIR / ".env")
+
+    enabled: bool = True
+    interval: float = 60
+    top_n: int = 100
+    candidates_per_vacansy: int = 1000
+    key_ttl: int = 7 * 24 * 3600
+
+
+class ExportSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="export_",
+                                      env_file=BASE_DIR / ".env")
+
+    yield_per: int = 1000
+    buffer_size: int = 64 * 1024
+    gzip_level: int = 6
+
+
+class ImportSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="import_",
+                                      env_file=BASE_DIR / ".env")
+
+    batch_size: int = 1000
+    max_reported_errors: int = 1000
+    max_file_size: int = 100 * 1024 * 1024
+
+
+class ImageSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="image_",
+                                      env_file=BASE_DIR / ".env")
+
+    path: Path = BASE_DIR / "var" / "images"
+    # размер - максимальная сторона в пикселях
+    sizes: dict[str, int] = {"thumb": 160, "medium": 640, "large": 1600}
+    quality: int = 82
+    max_upload_size: int = 10 * 1024 * 1024
+    max_pixels: int = 40_000_000
+    workers: int = 2
+    # если задан, файлы отдает nginx (internal location) через X-Accel-Redirect
+    accel_redirect_prefix: str | None = None
+
+
+class HrStatsSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="hr_stats_",
+                                      env_file=BASE_DIR / ".env")
+
+    # счетчики ведут триггеры, сверка с исходными таблицами только исправляет расхождения
+    reconcile_enabled: bool = True
+    reconcile_interval: float = 3600
+    reconcile_batch_size: int = 500
+
+
+class UserPurgeSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="user_purge_",
+                                      env_file=BASE_DIR / ".env")
+
+    enabled: bool = True
+    interval: float = 30
+    batch_size: int = 1000
+    # пауза между пачками, чтобы очистка не вытесняла запросы пользователей
+    pause: float = 0.1
+    # один проход задачи короче блокировки, иначе его подхватит второй воркер
+    time_budget: float = 60
+
+
+class OutboxSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="outbox_",
+                                      env_file=BASE_DIR / ".env")
+
+    relay_enabled: bool = True
+    # период постановки прохода ретранслятора в очередь задач events
+    interval: float = 1
+    batch_size: int = 500
+    stream_prefix: str = "events:"
+    # потоки обрезаются ниже самой отстающей группы потребителей (XTRIM MINID);
+    # поток без групп - приблизительно до stream_maxlen событий
+    trim_interval: float = 60
+    stream_maxlen: int = 100_000
+    # сообщения, не подтвержденные упавшим потребителем дольше этого, забирают другие
+    claim_idle_ms: int = 60_000
+
+
+class SavedSearchSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="saved_search_",
+                                      env_file=BASE_DIR / ".env")
+
+    enabled: bool = True
+    interval: float = 60
+    batch_size: int = 1000
+    # вакансия с меньшим created может зафиксироваться позже уже обработанной:
+    # свежие вакансии ждут settle_seconds, чтобы watermark их не перепрыгнул
+    settle_seconds: float = 5
+    max_per_user: int = 20
+
+
+class RoleCatalogSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="role_catalog_",
+                                      env_file=BASE_DIR / ".env")
+
+    version_key: str = "role_catalog:version"
+    # как часто процесс сверяет версию своего снимка с Redis; изменение роли,
+    # сделанное другим процессом, видно в нем не позже чем через check_interval
+    check_interval: float = 1
+
+
+class JobsSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="jobs_",
+                                      env_file=BASE_DIR / ".env")
+
+    key_prefix: str = "jobs:"
+    # очередь -> число одновременно выполняемых задач в одном воркере
+    queues: dict[str, int] = {"default": 4, "maintenance": 3, "events": 1}
+    # как часто воркер переносит отложенные задачи в очереди и ставит периодические
+    poll_interval: float = 0.5
+    block_timeout: int = 5
+    default_timeout: float = 300
+    default_max_retries: int = 3
+    # задержка повтора: backoff_base ** номер попытки секунд
+    backoff_base: float = 2
+    result_ttl: int = 86400
+
+
+class WarmupSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="warmup_",
+                                      env_file=BASE_DIR / ".env")
+
+    enabled: bool = True
+    # соединения, открываемые при старте; Postgres - не больше pool_size движка
+    db_connections: int = 5
+    redis_connections: int = 5
+    # сколько startup ждет прогрев: дальше процесс принимает запросы, а /health/ready
+    # отвечает 503, пока прогрев не закончится
+    startup_wait: float = 10
+    # пауза перед повтором, если Postgres или Redis недоступны
+    retry_interval: float = 5
+
+
+class ServerSettings(BaseSettings):
+    """Запуск в production: gunicorn -c gunicorn.conf.py main:app"""
+    model_config = SettingsConfigDict(env_prefix="server_",
+                                      env_file=BASE_DIR / ".env")
+
+    host: str = "0.0.0.0"
+    port: int = 8000
+    # None - по одному процессу на каждое доступное ядро
+    workers: Optional[int] = None
+    # очередь принятых ядром, но еще не обработанных соединений
+    backlog: int = 2048
+    # keep-alive должен быть дольше простоя соединения у балансировщика перед приложением
+    keepalive: int = 75
+    timeout: int = 60
+    # сколько после SIGTERM ждать завершения начатых запросов и lifespan
+    graceful_timeout: int = 30
+    # перезапуск процесса после max_requests запросов (0 - без перезапуска)
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    # импорт приложения до fork: код и данные модулей общие для процессов (copy-on-write)
+    preload: bool = False
+
+    @property
+    def worker_count(self) -> int:
+        if self.workers:
+            return self.workers
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+
 class JWTSetting(BaseSettings):
     REQUEST_LIMIT_PER_MINUTE: int = 20
 
@@ -64,6 +265,21 @@ class Settings:
     token: TokenSettings = TokenSettings()
     redis: RedisSettings = RedisSettings()
     db: UserDBSettings = UserDBSettings()
+    pagination: PaginationSettings = PaginationSettings()
+    facet: FacetSettings = FacetSettings()
+    matching: MatchingSettings = MatchingSettings()
+    recommendation: RecommendationSettings = RecommendationSettings()
+    export: ExportSettings = ExportSettings()
+    bulk_import: ImportSettings = ImportSettings()
+    image: ImageSettings = ImageSettings()
+    hr_stats: HrStatsSettings = HrStatsSettings()
+    user_purge: UserPurgeSettings = UserPurgeSettings()
+    outbox: OutboxSettings = OutboxSettings()
+    saved_search: SavedSearchSettings = SavedSearchSettings()
+    role_catalog: RoleCatalogSettings = RoleCatalogSettings()
+    jobs: JobsSettings = JobsSettings()
+    server: ServerSettings = ServerSettings()
+    warmup: WarmupSettings = WarmupSettings()
 
 
 settings = Settings()
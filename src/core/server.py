@@ -0,0 +1,18 @@
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+# часть graceful_timeout, оставляемая shutdown lifespan после ожидания начатых запросов
+LIFESPAN_SHUTDOWN_RESERVE = 5
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """Процесс gunicorn с uvicorn на uvloop и httptools.
+
+    По SIGTERM uvicorn перестает принимать соединения и ждет начатые запросы не дольше
+    graceful_timeout - LIFESPAN_SHUTDOWN_RESERVE секунд, затем выполняет shutdown lifespan,
+    который закрывает пулы Postgres и Redis, - раньше, чем gunicorn завершит процесс по SIGKILL.
+    """
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(self.cfg.graceful_timeout - LIFESPAN_SHUTDOWN_RESERVE, 1)
@@ -1,5 +1,18 @@
 from abc import ABCMeta, abstractmethod
-from typing import Any
+from typing import Any, Optional
+
+from sqlalchemy import exc
+
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
+
+
+def violated_constraint(error: exc.IntegrityError, sqlstate: str) -> Optional[str]:
+    """Имя нарушенного ограничения, если код ошибки PostgreSQL равен sqlstate, иначе None"""
+    if getattr(error.orig, "sqlstate", None) != sqlstate:
+        return None
+    # error.orig - обертка SQLAlchemy, исходное исключение asyncpg в __cause__
+    return getattr(error.orig.__cause__, "constraint_name", None)
 
 
 class CrudBase(metaclass=ABCMeta):
@@ -1,13 +1,15 @@
 from uuid import UUID
-from typing import Union
+from datetime import datetime
+from typing import Optional, Union
 import logging.config
 
 from fastapi import status, HTTPException
-from sqlalchemy import select, update, exc, delete
+from sqlalchemy import select, update, exc, delete, tuple_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Comment
+from src.database.models import Comment, Vacansy
 from src.crud.base_classes import CrudBase
+from src.crud.outbox import add_event
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
@@ -20,6 +22,21 @@ class CommentDAL(CrudBase):
         log.debug("Инициализация CommentDAL")
         self.db_session = session
 
+    async def _change_comments_count(self, vacansy_id: UUID, delta: int) -> None:
+        # UPDATE ... SET comments_count = comments_count + delta берет блокировку строки,
+        # поэтому параллельные изменения не теряются; коммитит вызывающий метод.
+        # Комментарии входят в карточку вакансии, поэтому версия вакансии тоже меняется
+        query = update(Vacansy).where(Vacansy.id == vacansy_id).values(
+            comments_count=Vacansy.comments_count + delta,
+            version=Vacansy.version + 1,
+            updated_at=func.now())
+        await self.db_session.execute(query)
+
+    async def _touch_vacansy(self, vacansy_id: UUID) -> None:
+        query = update(Vacansy).where(Vacansy.id == vacansy_id).values(
+            version=Vacansy.version + 1, updated_at=func.now())
+        await self.db_session.execute(query)
+
     async def create(self, vacansy_id: UUID, comment: dict, user_id: UUID) -> Union[Comment, None, Exception]:
         log_message = f'CRUD Создание Comment: vacansy_id={vacansy_id}, comment={comment}, user_id={user_id}'
         log.debug(log_message)
@@ -27,6 +44,9 @@ class CommentDAL(CrudBase):
             comm: Comment = Comment(
                 vacansy_id=vacansy_id, user_id=user_id, **comment)
             self.db_session.add(comm)
+            await self.db_session.flush()
+            await self._change_comments_count(vacansy_id, 1)
+            add_event(self.db_session, "comment", "created", comm.id, {"vacansy_id": str(vacansy_id)})
             await self.db_session.commit()
             return comm
         except exc.SQLAlchemyError as error:
@@ -40,12 +60,20 @@ class CommentDAL(CrudBase):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Неизвестная ошибка при попытке создать Comment")
 
-    async def get(self, vacansy_id: UUID) -> Union[list[Comment], None, Exception]:
-        log_message = f'CRUD Получение Comment: vacansy_id={vacansy_id}'
+    async def get(self,
+                  vacansy_id: UUID,
+                  limit: int,
+                  after: Optional[tuple[datetime, UUID]] = None) -> Union[list[Comment], None, Exception]:
+        log_message = f'CRUD Получение Comment: vacansy_id={vacansy_id}, limit={limit}, after={after}'
         log.debug(log_message)
         try:
+            # keyset-пагинация по индексу (vacansy_id, created_at, id): стоимость страницы
+            # не зависит от ее номера; limit + 1 строка - признак следующей страницы
             query = select(Comment.id, Comment.text, Comment.created_at).where(
                 Comment.vacansy_id == vacansy_id)
+            if after is not None:
+                query = query.where(tuple_(Comment.created_at, Comment.id) > tuple_(*after))
+            query = query.order_by(Comment.created_at, Comment.id).limit(limit + 1)
             res = await self.db_session.execute(query)
             comment_rows = res.fetchall()
             return comment_rows
@@ -54,6 +82,7 @@ class CommentDAL(CrudBase):
             log.exception(log_message)
         except Exception as error:
             log_message = f"неизвестная ошибка при получении Comment: vacansy_id={vacansy_id} {error}"
+            log.exception(log_message)
 
     async def delete(self, vacansy_id: UUID, comment_id: UUID, user_id: UUID) -> Union[UUID, None, Exception]:
         log_message = f'CRUD Удаление Comment: vacansy_id={vacansy_id}, comment_id={comment_id}, user_id={user_id}'
@@ -62,8 +91,11 @@ class CommentDAL(CrudBase):
             query = delete(Comment).where(Comment.vacansy_id == vacansy_id, Comment.id ==
                                           comment_id, Comment.user_id == user_id).returning(Comment.id)
             res = await self.db_session.execute(query)
-            await self.db_session.commit()
             comment_id_row = res.fetchone()
+            if comment_id_row is not None:
+                await self._change_comments_count(vacansy_id, -1)
+                add_event(self.db_session, "comment", "deleted", comment_id_row[0], {"vacansy_id": str(vacansy_id)})
+            await self.db_session.commit()
             if comment_id_row is not None:
                 return comment_id_row[0]
         except exc.SQLAlchemyError as error:
@@ -84,8 +116,11 @@ class CommentDAL(CrudBase):
             query = delete(Comment).where(
                 Comment.vacansy_id == vacansy_id, Comment.id == comment_id).returning(Comment.id)
             res = await self.db_session.execute(query)
-            await self.db_session.commit()
             comment_id_row = res.fetchone()
+            if comment_id_row is not None:
+                await self._change_comments_count(vacansy_id, -1)
+                add_event(self.db_session, "comment", "deleted", comment_id_row[0], {"vacansy_id": str(vacansy_id)})
+            await self.db_session.commit()
             if comment_id_row is not None:
                 return comment_id_row[0]
         except exc.SQLAlchemyError as error:
@@ -93,7 +128,7 @@ class CommentDAL(CrudBase):
             log.exception(log_message)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Ошибка SQLAlchemyError при удалении админом Comment")
-        except Exception:
+        except Exception as error:
             log_message = f"Неизвестная ошибка при удалении админом Comment: vacansy_id={vacansy_id}, comment_id={comment_id} {error}"
             log.exception(log_message)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -107,8 +142,11 @@ class CommentDAL(CrudBase):
             query = update(Comment).where(Comment.vacansy_id == vacansy_id, Comment.id == comment_id,
                                           Comment.user_id == user_id).values(**comment).returning(Comment.id)
             res = await self.db_session.execute(query)
-            await self.db_session.commit()
             comment_id_row = res.fetchone()
+            if comment_id_row is not None:
+                await self._touch_vacansy(vacansy_id)
+                add_event(self.db_session, "comment", "updated", comment_id_row[0], {"vacansy_id": str(vacansy_id)})
+            await self.db_session.commit()
             if comment_id_row is not None:
                 return comment_id_row[0]
         except exc.SQLAlchemyError as error:
@@ -3,12 +3,12 @@ from typing import Optional
 import logging.config
 
 from fastapi import status, HTTPException
-from fastapi_pagination.ext.sqlalchemy import paginate
 from sqlalchemy import select, update, exc, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import Entry
 from src.crud.base_classes import CrudBase
+from src.utils.pagination import paginate, TotalMode
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
@@ -117,7 +117,8 @@ class EntryDAL(CrudBase):
     async def get_by_user_id_list(self,
                                   user_id: UUID,
                                   unique: bool = False,
-                                  only_active: bool = False) -> Optional[list[Entry]]:
+                                  only_active: bool = False,
+                                  total_mode: TotalMode = TotalMode.exact) -> Optional[list[Entry]]:
         log_message = f'CRUD Получение списка Entry: user_id = {user_id}'
         log.debug(log_message)
 
@@ -128,7 +129,7 @@ class EntryDAL(CrudBase):
             if unique:
                 query = query.distinct(
                     tuple_(Entry.user_agent, Entry.is_active))
-            entries = await paginate(self.db_session, query)
+            entries = await paginate(self.db_session, query, total_mode)
             return entries
         except exc.SQLAlchemyError as error:
             log_message = f"Ощибка SQLAlchemyError при получении списка Entry по user_id = {user_id}"
@@ -160,3 +161,17 @@ class EntryDAL(CrudBase):
             log_message = f"Неизвестная ошибка при получении списка Entry по user_agent = {user_agent}"
             log.error(log_message)
             log.exception(error)
+
+    async def get_active_refresh_tokens(self, user_id: UUID) -> Optional[list[str]]:
+        """Refresh-токены всех активных сессий пользователя, без пагинации запроса"""
+        log_message = f'CRUD Получение активных refresh token Entry: user_id = {user_id}'
+        log.debug(log_message)
+        try:
+            query = select(Entry.refresh_token).where(Entry.user_id == user_id, Entry.is_active == True,
+                                                      Entry.refresh_token.is_not(None))
+            res = await self.db_session.execute(query)
+            return res.scalars().all()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ощибка SQLAlchemyError при получении refresh token Entry по user_id = {user_id}"
+            log.error(log_message)
+            log.exception(error)
@@ -0,0 +1,101 @@
+from uuid import UUID
+from typing import Optional, Union
+import logging.config
+
+from fastapi import status, HTTPException
+from sqlalchemy import select, exc, func, any_, bindparam, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Comment, Hr, HrStats, Vacansy
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+COUNTER_COLUMNS = ("active_vacansies", "total_vacansies", "comments_count")
+ACTIVITY_COLUMNS = ("last_vacansy_at", "last_comment_at")
+
+
+class HrStatsDAL:
+    """Чтение агрегатов и сверка; приращения пишут триггеры hr_stats_vacansy_*"""
+
+    def __init__(self, session: AsyncSession) -> None:
+        log.debug("Инициализация HrStatsDAL")
+        self.db_session = session
+
+    async def get(self, hr_id: UUID, user_id: UUID) -> Union[tuple, None, Exception]:
+        """Агрегаты HR, принадлежащего user_id: два поиска по первичному ключу одним запросом.
+
+        Строки hr_stats нет, пока у HR не было вакансий, поэтому LEFT JOIN и нули по умолчанию.
+        """
+        log_message = f'CRUD Получение HrStats: hr_id={hr_id}, user_id={user_id}'
+        log.debug(log_message)
+        try:
+            query = select(Hr.id.label("hr_id"),
+                           func.coalesce(HrStats.active_vacansies, 0).label("active_vacansies"),
+                           func.coalesce(HrStats.total_vacansies, 0).label("total_vacansies"),
+                           func.coalesce(HrStats.comments_count, 0).label("comments_count"),
+                           HrStats.last_vacansy_at, HrStats.last_comment_at, HrStats.updated_at).\
+                outerjoin(HrStats, HrStats.hr_id == Hr.id).\
+                where(Hr.id == hr_id, Hr.user_id == user_id)
+            res = await self.db_session.execute(query)
+            return res.fetchone()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении HrStats: hr_id={hr_id} {error}"
+            log.exception(log_message)
+
+    async def reconcile_batch(self, after: Optional[UUID], limit: int) -> Union[tuple[Optional[UUID], int], Exception]:
+        """Пересчитать агрегаты следующих limit HR (по id после after) из vacansy и comment.
+
+        Строки hr_stats пачки сначала блокируются, и пересчет идет уже после блокировки:
+        транзакции, изменившие вакансии этих HR, либо видны пересчету, либо ждут блокировку
+        и прибавляют свое приращение к уже исправленному значению.
+        Возвращает (последний id пачки или None, если HR больше нет; число исправленных строк).
+        """
+        log_message = f'CRUD Сверка HrStats: after={after}, limit={limit}'
+        log.debug(log_message)
+        try:
+            query = select(Hr.id).order_by(Hr.id).limit(limit)
+            if after is not None:
+                query = query.where(Hr.id > after)
+            res = await self.db_session.execute(query)
+            hr_ids = res.scalars().all()
+            if not hr_ids:
+                return None, 0
+            ids = bindparam("hr_ids", hr_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+
+            await self.db_session.execute(select(HrStats.hr_id).where(HrStats.hr_id == any_(ids)).
+                                          order_by(HrStats.hr_id).with_for_update())
+
+            last_comment = select(func.max(Comment.created_at)).\
+                where(Comment.vacansy_id == Vacansy.id).scalar_subquery()
+            actual = select(Hr.id,
+                            func.count(Vacansy.id).filter(Vacansy.is_active == True),
+                            func.count(Vacansy.id),
+                            func.coalesce(func.sum(Vacansy.comments_count), 0),
+                            func.max(Vacansy.created),
+                            func.max(last_comment),
+                            func.now()).\
+                outerjoin(Vacansy, Vacansy.hr_id == Hr.id).\
+                where(Hr.id == any_(ids)).group_by(Hr.id)
+            columns = (*COUNTER_COLUMNS, *ACTIVITY_COLUMNS, "updated_at")
+            insert_query = pg_insert(HrStats).from_select(["hr_id", *columns], actual)
+            query = insert_query.on_conflict_do_update(
+                index_elements=[HrStats.hr_id],
+                set_={name: insert_query.excluded[name] for name in columns},
+                # строка переписывается только при расхождении счетчиков: last_comment_at триггер
+                # ставит по времени транзакции, и он не совпадает с comment.created_at до микросекунд
+                where=tuple_(*(HrStats.__table__.c[name] for name in COUNTER_COLUMNS)).is_distinct_from(
+                    tuple_(*(insert_query.excluded[name] for name in COUNTER_COLUMNS)))
+            ).returning(HrStats.hr_id)
+            res = await self.db_session.execute(query)
+            fixed = len(res.fetchall())
+            await self.db_session.commit()
+            return hr_ids[-1], fixed
+        except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
+            log_message = f"Ошибка SQLAlchemyError при сверке HrStats: after={after} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при сверке агрегатов HR")
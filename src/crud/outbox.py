@@ -0,0 +1,87 @@
+from uuid import UUID
+from datetime import datetime
+from typing import Any, Optional, Union
+import logging.config
+
+from fastapi import status, HTTPException
+from sqlalchemy import select, delete, insert, exc, func, literal, any_, bindparam, BigInteger, ColumnElement, Insert
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import OutboxEvent
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+def add_event(session: AsyncSession,
+              topic: str,
+              event: str,
+              aggregate_id: UUID,
+              payload: Optional[dict[str, Any]] = None) -> None:
+    """Добавить событие в текущую транзакцию сессии; коммитит DAL, изменивший данные"""
+    session.add(OutboxEvent(topic=topic, event=event, aggregate_id=aggregate_id, payload=payload or {}))
+
+
+def events_from_select(topic: str,
+                       event: str,
+                       aggregate_id: ColumnElement,
+                       payload: Union[dict[str, Any], ColumnElement]) -> Insert:
+    """INSERT ... SELECT событий по столбцу id: массовое изменение - одно событие на строку одним запросом.
+
+    payload - постоянный словарь или выражение jsonb по строке (jsonb_build_object).
+    """
+    if not isinstance(payload, ColumnElement):
+        payload = literal(payload, JSONB)
+    return insert(OutboxEvent).from_select(
+        ["topic", "event", "aggregate_id", "payload"],
+        select(literal(topic), literal(event), aggregate_id, payload))
+
+
+class OutboxDAL:
+    """Чтение и удаление событий ретранслятором; транзакцией управляет вызывающий"""
+
+    def __init__(self, session: AsyncSession) -> None:
+        log.debug("Инициализация OutboxDAL")
+        self.db_session = session
+
+    async def lock_batch(self, limit: int) -> Union[list[OutboxEvent], Exception]:
+        """Следующие limit событий по порядку записи.
+
+        SKIP LOCKED: несколько ретрансляторов разбирают разные пачки и не ждут друг друга.
+        """
+        log_message = f'CRUD Выборка OutboxEvent: limit={limit}'
+        log.debug(log_message)
+        try:
+            query = select(OutboxEvent).order_by(OutboxEvent.id).limit(limit).\
+                with_for_update(skip_locked=True)
+            res = await self.db_session.execute(query)
+            return res.scalars().all()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при выборке OutboxEvent {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при выборке событий")
+
+    async def delete(self, event_ids: list[int]) -> Union[None, Exception]:
+        log_message = f'CRUD Удаление OutboxEvent: {len(event_ids)} шт.'
+        log.debug(log_message)
+        try:
+            ids = bindparam("event_ids", event_ids, type_=ARRAY(BigInteger))
+            await self.db_session.execute(delete(OutboxEvent).where(OutboxEvent.id == any_(ids)))
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при удалении OutboxEvent {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при удалении событий")
+
+    async def get_backlog(self) -> Union[tuple[int, Optional[datetime]], None, Exception]:
+        """Число неопубликованных событий и время самого старого"""
+        log.debug('CRUD Получение очереди OutboxEvent')
+        try:
+            res = await self.db_session.execute(select(func.count(), func.min(OutboxEvent.created_at)).select_from(OutboxEvent))
+            return res.fetchone()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении очереди OutboxEvent {error}"
+            log.exception(log_message)
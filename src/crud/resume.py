@@ -1,20 +1,26 @@
 from uuid import UUID
-from typing import Union
+from datetime import datetime
+from typing import Any, AsyncIterator, Mapping, Optional, Union
 import logging.config
 
 from fastapi import status, HTTPException
-from sqlalchemy import select, update, exc, delete
+from sqlalchemy import select, update, exc, delete, tuple_, any_, bindparam, func
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi_pagination.ext.sqlalchemy import paginate
 
 from src.database.models import Resume
 from src.crud.base_classes import CrudBase
+from src.crud.outbox import add_event
 from src.utils.filter import ResumeFilter
+from src.utils.pagination import paginate, TotalMode
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
 log = logging.getLogger(__name__)
 
+EXPORT_COLUMNS = (Resume.id, Resume.first_name, Resume.last_name, Resume.middle_name, Resume.age,
+                  Resume.experience, Resume.education, Resume.about, Resume.created_at)
+
 
 class ResumeDAL(CrudBase):
 
@@ -28,6 +34,8 @@ class ResumeDAL(CrudBase):
         try:
             resume: Resume = Resume(user_id=user_id, **body)
             self.db_session.add(resume)
+            await self.db_session.flush()
+            add_event(self.db_session, "resume", "created", resume.id, {"user_id": str(user_id)})
             await self.db_session.commit()
             return resume
         except exc.SQLAlchemyError as error:
@@ -57,15 +65,29 @@ class ResumeDAL(CrudBase):
             log_message = f"Неизвестная ошибка при получени Resume: resume_id={resume_id} {error}"
             log.exception(log_message)
 
-    async def get_list_resume(self, resume_filter: ResumeFilter) -> Union[list[Resume], None, Exception]:
+    async def get_version(self, resume_id: UUID) -> Union[tuple[int, datetime], None, Exception]:
+        log_message = f'CRUD Получение версии Resume: resume_id={resume_id}'
+        log.debug(log_message)
+        try:
+            query = select(Resume.version, Resume.updated_at).where(Resume.id == resume_id,
+                                                                    Resume.is_active == True)
+            res = await self.db_session.execute(query)
+            return res.fetchone()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении версии Resume: resume_id={resume_id} {error}"
+            log.exception(log_message)
+
+    async def get_list_resume(self,
+                              resume_filter: ResumeFilter,
+                              total_mode: TotalMode = TotalMode.exact) -> Union[list[Resume], None, Exception]:
         log_message = f'CRUD Получение списка Resume: resume_filter={resume_filter}'
         log.debug(log_message)
         try:
             query = select(Resume.id, Resume.first_name, Resume.last_name, Resume.middle_name,
-                           Resume.age, Resume.experience, Resume.education, Resume.about)
+                           Resume.age, Resume.experience, Resume.education, Resume.about, Resume.image)
             query = resume_filter.filter(query)
             query = resume_filter.sort(query)
-            resume_rows = await paginate(self.db_session, query)
+            resume_rows = await paginate(self.db_session, query, total_mode)
             return resume_rows
         except exc.SQLAlchemyError as error:
             log_message = f"Ошибка SQLAlchemyError при получении списка Resume: resume_filter={resume_filter} {error}"
@@ -74,15 +96,37 @@ class ResumeDAL(CrudBase):
             log_message = f"Неизвестная ошибка при получении списка Resume: resume_filter={resume_filter} {error}"
             log.exception(log_message)
 
+    async def stream_list(self,
+                          resume_filter: ResumeFilter,
+                          yield_per: int) -> AsyncIterator[Mapping[str, Any]]:
+        log_message = f'CRUD Выгрузка Resume: resume_filter={resume_filter}'
+        log.debug(log_message)
+        query = select(*EXPORT_COLUMNS).where(Resume.is_active == True)
+        query = resume_filter.filter(query)
+        query = resume_filter.sort(query)
+        try:
+            # серверный курсор: в памяти не больше yield_per строк
+            res = await self.db_session.stream(query.execution_options(yield_per=yield_per))
+            async for partition in res.partitions():
+                for row in partition:
+                    yield row._mapping
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при выгрузке Resume: resume_filter={resume_filter} {error}"
+            log.exception(log_message)
+            raise
+
     async def update(self, resume_id: int, user_id: UUID, kwargs: dict) -> Union[UUID, None, Exception]:
         log_message = f'CRUD Обновление Resume: resume_id={resume_id}, user_id={user_id}, kwargs={kwargs}'
         log.debug(log_message)
         try:
             query = update(Resume).where(Resume.id == resume_id, Resume.user_id == user_id).values(
-                **kwargs).returning(Resume.id)
+                **kwargs, version=Resume.version + 1, updated_at=func.now()).returning(Resume.id, Resume.version)
             res = await self.db_session.execute(query)
-            await self.db_session.commit()
             resume_row = res.fetchone()
+            if resume_row is not None:
+                add_event(self.db_session, "resume", "updated", resume_row.id,
+                          {"user_id": str(user_id), "version": resume_row.version, "fields": sorted(kwargs)})
+            await self.db_session.commit()
             if resume_row is not None:
                 return resume_row[0]
         except exc.SQLAlchemyError as error:
@@ -103,8 +147,10 @@ class ResumeDAL(CrudBase):
             query = delete(Resume).where(Resume.id == resume_id,
                                          Resume.user_id == user_id).returning(Resume.id)
             res = await self.db_session.execute(query)
-            await self.db_session.commit()
             resume_id_row = res.fetchone()
+            if resume_id_row is not None:
+                add_event(self.db_session, "resume", "deleted", resume_id_row[0], {"user_id": str(user_id)})
+            await self.db_session.commit()
             if resume_id_row is not None:
                 return resume_id_row[0]
         except exc.SQLAlchemyError as error:
@@ -137,3 +183,55 @@ class ResumeDAL(CrudBase):
             log.exception(log_message)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Неизвестная ошибка при получении списка Resume с помощью user_id")
+
+    async def get_for_matching(self,
+                               after: Optional[tuple[datetime, UUID]],
+                               limit: int) -> Union[list[tuple], None, Exception]:
+        log_message = f'CRUD Получение Resume для matching: after={after}, limit={limit}'
+        log.debug(log_message)
+        try:
+            query = select(Resume.id, Resume.experience, Resume.education, Resume.about,
+                           Resume.created_at, Resume.is_active)
+            if after is not None:
+                query = query.where(tuple_(Resume.created_at, Resume.id) > tuple_(*after))
+            query = query.order_by(Resume.created_at, Resume.id).limit(limit)
+            res = await self.db_session.execute(query)
+            return res.fetchall()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении Resume для matching: after={after} {error}"
+            log.exception(log_message)
+        except Exception as error:
+            log_message = f"Неизвестная ошибка при получении Resume для matching: after={after} {error}"
+            log.exception(log_message)
+
+    async def get_matching_rows(self, resume_ids: list[UUID]) -> Union[dict[UUID, tuple], None, Exception]:
+        """Строки резюме для matching по id, включая неактивные: удаленных в ответе нет, None - ошибка базы"""
+        log_message = f'CRUD Получение Resume для matching: {len(resume_ids)} шт.'
+        log.debug(log_message)
+        try:
+            ids = bindparam("resume_ids", resume_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            query = select(Resume.id, Resume.experience, Resume.education, Resume.about,
+                           Resume.is_active).where(Resume.id == any_(ids))
+            res = await self.db_session.execute(query)
+            return {row.id: row for row in res.fetchall()}
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении Resume для matching: {error}"
+            log.exception(log_message)
+        except Exception as error:
+            log_message = f"Неизвестная ошибка при получении Resume для matching: {error}"
+            log.exception(log_message)
+
+    async def get_owners(self, resume_ids: list[UUID]) -> Union[dict[UUID, UUID], None, Exception]:
+        log_message = f'CRUD Получение владельцев Resume: {len(resume_ids)} шт.'
+        log.debug(log_message)
+        try:
+            ids = bindparam("resume_ids", resume_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            query = select(Resume.id, Resume.user_id).where(Resume.id == any_(ids), Resume.is_active == True)
+            res = await self.db_session.execute(query)
+            return {resume_id: user_id for resume_id, user_id in res.fetchall()}
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении владельцев Resume {error}"
+            log.exception(log_message)
+        except Exception as error:
+            log_message = f"Неизвестная ошибка при получении владельцев Resume {error}"
+            log.exception(log_message)
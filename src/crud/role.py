@@ -1,19 +1,27 @@
 from uuid import UUID
+from datetime import datetime
 from typing import Union
 import logging.config
 
 from fastapi import status, HTTPException
-from sqlalchemy import select, update, exc
+from sqlalchemy import select, update, delete, exc, func, literal, any_, bindparam, Row
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi_pagination.ext.sqlalchemy import paginate
 
 from src.database.models import Role, UserRole, User
-from src.crud.base_classes import CrudBase
+from src.crud.base_classes import CrudBase, UNIQUE_VIOLATION, violated_constraint
+from src.crud.outbox import events_from_select
+from src.utils.pagination import paginate, TotalMode
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
 log = logging.getLogger(__name__)
 
+# столбцы ответа и каталога ролей: изменения возвращают их в RETURNING, без повторного чтения
+CATALOG_COLUMNS = (Role.id, Role.name, Role.permissions, Role.version, Role.updated_at)
+# уникальный индекс role.name создан без имени, PostgreSQL назвал его <таблица>_<колонка>_key
+ROLE_NAME_KEY = "role_name_key"
+
 
 class RoleDAL(CrudBase):
 
@@ -21,43 +29,43 @@ class RoleDAL(CrudBase):
         log.debug("Инициализация RoleDAL")
         self.db_session = session
 
-    async def create(self, name: str) -> Union[Role, Exception]:
-        log_message = f'CRUD Создание Role: name={name}'
+    async def create(self, name: str, permissions: int = 0) -> Union[Row, None, Exception]:
+        """Создать роль одним запросом; None, если роль с таким именем уже есть"""
+        log_message = f'CRUD Создание Role: name={name}, permissions={permissions}'
         log.debug(log_message)
         try:
-            new_role = Role(name=name)
-            self.db_session.add(new_role)
+            inserted = pg_insert(Role).values(id=func.gen_random_uuid(), name=name, permissions=permissions).\
+                on_conflict_do_nothing(index_elements=[Role.name]).returning(*CATALOG_COLUMNS).cte("inserted")
+            events = events_from_select("role", "created", inserted.c.id,
+                                        {"name": name, "permissions": permissions}).cte("events")
+            res = await self.db_session.execute(select(inserted).add_cte(events))
+            role_row = res.fetchone()
             await self.db_session.commit()
-            return new_role
+            return role_row
         except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
             log_message = f"Ошибка SQLAlchemyError при создании Role {error}"
             log.exception(log_message)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Ошбика SQLAlchemyError при создании Role")
-        except Exception as error:
-            log_message = f"Неизвестная ошибка при создании Role {error}"
-            log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Неизвестная ошбика при создании Role")
 
     async def delete(self, id: UUID | str) -> Union[UUID, None, Exception]:
+        """Удалить роль одним запросом; None, если роли нет"""
         log_message = f'CRUD Удаление Role: id={id}'
         log.debug(log_message)
         try:
-            role = await self.db_session.get(Role, id)
-            await self.db_session.delete(role)
+            deleted = delete(Role).where(Role.id == id).returning(Role.id).cte("deleted")
+            events = events_from_select("role", "deleted", deleted.c.id, {}).cte("events")
+            res = await self.db_session.execute(select(deleted.c.id).add_cte(events))
+            role_id = res.scalar_one_or_none()
             await self.db_session.commit()
-            return role.id
+            return role_id
         except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
             log_message = f"Ошибка SQLAlchemyError при удалении Role {error}"
             log.exception(log_message)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Ошибка SQLAlchemyError при удалении Role")
-        except Exception as error:
-            log_message = f"Неизвестная ошибка при удалении Role {error}"
-            log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Неизвестная ошибка при удалении Role")
 
     async def get(self, id: UUID) -> Union[Role, None, Exception]:
         log_message = f'CRUD Получение Role: id={id}'
@@ -75,36 +83,73 @@ class RoleDAL(CrudBase):
             log_message = f"Неизвестная ошибка при получения Role {error}"
             log.exception(log_message)
 
-    async def update(self, id: UUID, **kwargs) -> Union[UUID, Exception, None]:
-        log_message = f'CRUD Обновление Role: id={id}'
+    async def get_version(self, id: UUID) -> Union[tuple[int, datetime], None, Exception]:
+        log_message = f'CRUD Получение версии Role: id={id}'
         log.debug(log_message)
         try:
-            query = update(Role).where(Role.id == id).values(
-                kwargs).returning(Role.id)
+            query = select(Role.version, Role.updated_at).where(Role.id == id)
             res = await self.db_session.execute(query)
-            role_id_row = res.fetchone()
+            return res.fetchone()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении версии Role {error}"
+            log.exception(log_message)
+
+    async def get_versions_by_user_id(self, user_id: UUID) -> Union[list[tuple[UUID, int]], None, Exception]:
+        log_message = f'CRUD Получение версий Role пользователя: user_id={user_id}'
+        log.debug(log_message)
+        try:
+            query = select(Role.id, Role.version).join(UserRole, Role.id == UserRole.role_id).where(
+                UserRole.user_id == user_id).order_by(Role.id)
+            res = await self.db_session.execute(query)
+            return res.fetchall()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении версий Role пользователя {error}"
+            log.exception(log_message)
+
+    async def update(self, id: UUID, **kwargs) -> Union[Row, Exception, None]:
+        """Обновить роль одним запросом и вернуть ее новые значения; None, если роли нет.
+
+        Занятое другой ролью имя - нарушение уникальности role.name, ответ 400.
+        """
+        log_message = f'CRUD Обновление Role: id={id}'
+        log.debug(log_message)
+        try:
+            updated = update(Role).where(Role.id == id).values(
+                **kwargs, version=Role.version + 1, updated_at=func.now()).returning(*CATALOG_COLUMNS).cte("updated")
+            events = events_from_select("role", "updated", updated.c.id,
+                                        func.jsonb_build_object("version", updated.c.version,
+                                                                "fields", literal(sorted(kwargs), JSONB))).cte("events")
+            res = await self.db_session.execute(select(updated).add_cte(events))
+            role_row = res.fetchone()
             await self.db_session.commit()
-            if role_id_row is not None:
-                return role_id_row[0]
+            return role_row
+        except exc.IntegrityError as error:
+            await self.db_session.rollback()
+            if violated_constraint(error, UNIQUE_VIOLATION) != ROLE_NAME_KEY:
+                log_message = f"Ошибка IntegrityError при обновление Role {error}"
+                log.exception(log_message)
+                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                    detail="Ошибка SQLAlchemy редактирования Role")
+            log.error(f"{status.HTTP_400_BAD_REQUEST}: Роль {kwargs.get('name')} существует")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="Эта роль существует")
         except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
             log_message = f"Ошибка SQLAlchemy при обновление Role {error}"
             log.exception(log_message)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Ошибка SQLAlchemy редактирования Role")
-        except Exception as error:
-            log_message = f"Неизвестная ошибка при обновление Role {error}"
-            log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Неизвестная ошибка редактирования Role")
 
-    async def get_by_user_id_paginate(self, user_id: UUID) -> Union[list[Role], Exception, None]:
+    async def get_by_user_id_paginate(self,
+                                      user_id: UUID,
+                                      total_mode: TotalMode = TotalMode.exact) -> Union[list[Role], Exception, None]:
         log_message = f'CRUD Получение списка Role: user_id={user_id}'
         log.debug(log_message)
         try:
             query = select(Role).join(UserRole, Role.id == UserRole.role_id).\
                 join(User, User.id == UserRole.user_id).\
                 where(UserRole.user_id == user_id)
-            roles = await paginate(self.db_session, query)
+            roles = await paginate(self.db_session, query, total_mode)
             return roles
         except exc.SQLAlchemyError as error:
             log_message = f"Ошибка SQLAlchemyError при получении списка Role: {error}"
@@ -121,7 +166,7 @@ class RoleDAL(CrudBase):
                 join(User, User.id == UserRole.user_id).\
                 where(UserRole.user_id == user_id)
             res = await self.db_session.execute(query)
-            roles = res.fetchall()
+            roles = res.scalars().all()
             return roles
         except exc.SQLAlchemyError as error:
             log_message = f"Ошибка SQLAlchemyError при получении списка Role: {error}"
@@ -146,12 +191,12 @@ class RoleDAL(CrudBase):
             log_message = f"Неизвестная ошибка при получении Role по name={name}: {error}"
             log.exception(log_message)
 
-    async def get_all(self) -> Union[list[Role], None, Exception]:
+    async def get_all(self, total_mode: TotalMode = TotalMode.exact) -> Union[list[Role], None, Exception]:
         log_message = f'CRUD Получение списка Role: all'
         log.debug(log_message)
         try:
             query = select(Role)
-            roles = await paginate(self.db_session, query)
+            roles = await paginate(self.db_session, query, total_mode)
             return roles
         except exc.SQLAlchemyError as error:
             log_message = f"Ошибка SQLAlchemyError при получении списка Role: all {error}"
@@ -160,30 +205,24 @@ class RoleDAL(CrudBase):
             log_message = f"Неизвестная ошибка при получении списка Role: all {error}"
             log.exception(log_message)
 
-    async def delete_by_user_id_and_role_id(self,
-                                            user_id: UUID,
-                                            role_id: UUID) -> Union[UUID, None, Exception]:
-        log_message = f'CRUD Удаление Role: user_id: {user_id}; role_id: {role_id}'
+    async def get_existing_ids(self, ids: list[UUID]) -> Union[set[UUID], None, Exception]:
+        log_message = f'CRUD Проверка Role: {len(ids)} шт.'
         log.debug(log_message)
         try:
-            query = select(UserRole).join(Role, Role.id == UserRole.role_id).\
-                join(User, User.id == UserRole.user_id).\
-                where(UserRole.user_id == user_id,
-                      Role.id == role_id)
-            res = await self.db_session.execute(query)
-            role_rows = res.fetchone()
-            if role_rows:
-                user_role = await self.db_session.get(UserRole, role_rows[0].id)
-                await self.db_session.delete(user_role)
-                await self.db_session.commit()
-                return user_role.id
+            role_ids = bindparam("role_ids", ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            res = await self.db_session.execute(select(Role.id).where(Role.id == any_(role_ids)))
+            return set(res.scalars().all())
         except exc.SQLAlchemyError as error:
-            log_message = f"Ошибка SQLAlchemyError при удалении Role: user_id: {user_id}; role_id: {role_id} {error}"
+            log_message = f"Ошибка SQLAlchemyError при проверке Role {error}"
             log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Ошибка SQLAlchemyError при попытке удалить Role")
-        except Exception as error:
-            log_message = f"Неизвестная ошибка при удалении Role: user_id: {user_id}; role_id: {role_id} {error}"
+
+    async def get_catalog(self) -> Union[list[tuple[UUID, str, int, int, datetime]], None, Exception]:
+        """Все роли одним запросом, без пагинации: каталог ролей мал"""
+        log.debug('CRUD Получение каталога Role')
+        try:
+            query = select(*CATALOG_COLUMNS).order_by(Role.name)
+            res = await self.db_session.execute(query)
+            return res.fetchall()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении каталога Role {error}"
             log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Неизвестная ошибка при попытке удалить Role")
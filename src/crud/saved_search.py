@@ -0,0 +1,165 @@
+from uuid import UUID
+from datetime import datetime, timedelta
+from typing import Any, Optional, Union
+import logging.config
+
+from fastapi import status, HTTPException
+from sqlalchemy import select, delete, insert, exc, func, literal, tuple_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import OutboxEvent, SavedSearch, SavedSearchMatch, Vacansy
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+# столбцы, по которым Predicate.matches проверяет вакансию
+DELTA_COLUMNS = (Vacansy.id, Vacansy.place_of_work, Vacansy.required_specialt, Vacansy.required_experience,
+                 Vacansy.salary_min, Vacansy.salary_max, Vacansy.currency, Vacansy.created)
+SHORT_COLUMNS = (Vacansy.id, Vacansy.place_of_work, Vacansy.required_specialt, Vacansy.proposed_salary,
+                 Vacansy.salary_min, Vacansy.salary_max, Vacansy.currency, Vacansy.working_conditions,
+                 Vacansy.required_experience, Vacansy.comments_count, Vacansy.created)
+
+
+class SavedSearchDAL:
+
+    def __init__(self, session: AsyncSession) -> None:
+        log.debug("Инициализация SavedSearchDAL")
+        self.db_session = session
+
+    async def create(self,
+                     user_id: UUID,
+                     name: str,
+                     filters: dict[str, Any],
+                     predicate_key: str) -> Union[SavedSearch, Exception]:
+        log_message = f'CRUD Создание SavedSearch: user_id={user_id}, filters={filters}'
+        log.debug(log_message)
+        try:
+            saved_search = SavedSearch(user_id=user_id, name=name, filters=filters, predicate_key=predicate_key)
+            self.db_session.add(saved_search)
+            await self.db_session.commit()
+            return saved_search
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при создании SavedSearch: user_id={user_id} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при сохранении поиска")
+
+    async def count_by_user_id(self, user_id: UUID) -> Union[int, None, Exception]:
+        log_message = f'CRUD Подсчет SavedSearch: user_id={user_id}'
+        log.debug(log_message)
+        try:
+            return await self.db_session.scalar(
+                select(func.count()).select_from(SavedSearch).where(SavedSearch.user_id == user_id))
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при подсчете SavedSearch: user_id={user_id} {error}"
+            log.exception(log_message)
+
+    async def get_by_user_id(self, user_id: UUID) -> Union[list[SavedSearch], None, Exception]:
+        log_message = f'CRUD Получение списка SavedSearch: user_id={user_id}'
+        log.debug(log_message)
+        try:
+            query = select(SavedSearch).where(SavedSearch.user_id == user_id).order_by(SavedSearch.created_at)
+            res = await self.db_session.execute(query)
+            return res.scalars().all()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении списка SavedSearch: user_id={user_id} {error}"
+            log.exception(log_message)
+
+    async def delete(self, saved_search_id: UUID, user_id: UUID) -> Union[UUID, None, Exception]:
+        log_message = f'CRUD Удаление SavedSearch: saved_search_id={saved_search_id}, user_id={user_id}'
+        log.debug(log_message)
+        try:
+            query = delete(SavedSearch).where(SavedSearch.id == saved_search_id,
+                                              SavedSearch.user_id == user_id).returning(SavedSearch.id)
+            res = await self.db_session.execute(query)
+            await self.db_session.commit()
+            return res.scalar()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при удалении SavedSearch: saved_search_id={saved_search_id} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при удалении сохраненного поиска")
+
+    async def get_predicates(self) -> Union[list[tuple], None, Exception]:
+        """Различные предикаты и id поисков с каждым: (predicate_key, filters, [id, ...])"""
+        log.debug('CRUD Получение предикатов SavedSearch')
+        try:
+            query = select(SavedSearch.predicate_key, SavedSearch.filters, func.array_agg(SavedSearch.id)).\
+                group_by(SavedSearch.predicate_key, SavedSearch.filters)
+            res = await self.db_session.execute(query)
+            return res.fetchall()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении предикатов SavedSearch {error}"
+            log.exception(log_message)
+
+    async def get_delta(self,
+                        after: Optional[tuple[datetime, UUID]],
+                        limit: int,
+                        settle_seconds: float) -> Union[list[tuple], None, Exception]:
+        """Активные вакансии после watermark по индексу ix_vacansy_created_id_active"""
+        log_message = f'CRUD Получение новых Vacansy для SavedSearch: after={after}, limit={limit}'
+        log.debug(log_message)
+        try:
+            query = select(*DELTA_COLUMNS).where(
+                Vacansy.is_active == True,
+                Vacansy.created < func.now() - timedelta(seconds=settle_seconds))
+            if after is not None:
+                query = query.where(tuple_(Vacansy.created, Vacansy.id) > tuple_(*after))
+            query = query.order_by(Vacansy.created, Vacansy.id).limit(limit)
+            res = await self.db_session.execute(query)
+            return res.fetchall()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении новых Vacansy для SavedSearch: after={after} {error}"
+            log.exception(log_message)
+
+    async def record_matches(self, search_ids: list[UUID], vacansy_ids: list[UUID]) -> Union[int, Exception]:
+        """Записать пары (поиск, вакансия) и по событию outbox на каждый поиск с новыми совпадениями.
+
+        Один запрос: пары передаются двумя массивами и разворачиваются unnest, повторно
+        записанные пары (повтор после падения до сдвига watermark) пропускаются.
+        """
+        log_message = f'CRUD Запись SavedSearchMatch: {len(search_ids)} шт.'
+        log.debug(log_message)
+        try:
+            pairs = select(
+                func.unnest(bindparam("search_ids", search_ids, type_=ARRAY(PG_UUID(as_uuid=True)))),
+                func.unnest(bindparam("vacansy_ids", vacansy_ids, type_=ARRAY(PG_UUID(as_uuid=True)))))
+            inserted = pg_insert(SavedSearchMatch).from_select(["saved_search_id", "vacansy_id"], pairs).\
+                on_conflict_do_nothing().returning(SavedSearchMatch.saved_search_id).cte("inserted")
+            per_search = select(literal("saved_search"), literal("matched"), inserted.c.saved_search_id,
+                                func.jsonb_build_object("user_id", SavedSearch.user_id, "count", func.count())).\
+                join(SavedSearch, SavedSearch.id == inserted.c.saved_search_id).\
+                group_by(inserted.c.saved_search_id, SavedSearch.user_id)
+            query = insert(OutboxEvent).from_select(["topic", "event", "aggregate_id", "payload"], per_search).\
+                add_cte(inserted).returning(OutboxEvent.payload["count"].as_integer())
+            res = await self.db_session.execute(query)
+            recorded = sum(res.scalars().all())
+            await self.db_session.commit()
+            return recorded
+        except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
+            log_message = f"Ошибка SQLAlchemyError при записи SavedSearchMatch {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при записи совпадений поиска")
+
+    async def get_matches(self,
+                          saved_search_id: UUID,
+                          user_id: UUID,
+                          limit: int) -> Union[list[tuple], None, Exception]:
+        log_message = f'CRUD Получение SavedSearchMatch: saved_search_id={saved_search_id}, user_id={user_id}'
+        log.debug(log_message)
+        try:
+            query = select(*SHORT_COLUMNS).\
+                join(SavedSearchMatch, SavedSearchMatch.vacansy_id == Vacansy.id).\
+                join(SavedSearch, SavedSearch.id == SavedSearchMatch.saved_search_id).\
+                where(SavedSearch.id == saved_search_id, SavedSearch.user_id == user_id,
+                      Vacansy.is_active == True).\
+                order_by(SavedSearchMatch.created_at.desc()).limit(limit)
+            res = await self.db_session.execute(query)
+            return res.fetchall()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении SavedSearchMatch: saved_search_id={saved_search_id} {error}"
+            log.exception(log_message)
@@ -3,7 +3,8 @@ from typing import Union
 import logging.config
 
 from fastapi import status, HTTPException
-from sqlalchemy import select, update, exc
+from sqlalchemy import select, update, exc, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
@@ -65,6 +66,19 @@ class UserDAL(CrudBase):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Неизвестная ошибка при удалении пользователя")
 
+    async def get_existing_ids(self, ids: list[UUID]) -> Union[set[UUID], None, Exception]:
+        """Какие из ids принадлежат активным пользователям - один запрос на весь список"""
+        log_message = f'CRUD Проверка User: {len(ids)} шт.'
+        log.debug(log_message)
+        try:
+            user_ids = bindparam("user_ids", ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            res = await self.db_session.execute(select(User.id).where(User.id == any_(user_ids),
+                                                                      User.is_active == True))
+            return set(res.scalars().all())
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при проверке пользователей: {error}"
+            log.exception(log_message)
+
     async def get(self, id: UUID) -> Union[User, Exception, None]:
         log_message = f'CRUD Получение User: id={id}'
         log.debug(log_message)
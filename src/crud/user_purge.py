@@ -0,0 +1,188 @@
+import time
+from uuid import UUID
+from typing import Any, Optional, Sequence, Union
+import logging.config
+
+from fastapi import status, HTTPException
+from sqlalchemy import select, update, delete, exc, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import (Comment, Entry, Hr, Resume, SavedSearch, User, UserPurge, UserRole, Vacansy,
+                                 VacansyImport)
+from src.crud.outbox import events_from_select
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+# порядок важен: сначала дочерние строки, чтобы ON DELETE CASCADE не делал скрытой работы
+PURGE_STEPS = ("comment", "vacansy_comment", "vacansy", "vacansy_import", "hr",
+               "resume", "entry", "user_role", "saved_search", "user")
+
+
+def _hr_ids(user_id: UUID):
+    return select(Hr.id).where(Hr.user_id == user_id)
+
+
+def _delete_own_comments(user_id: UUID, limit: int):
+    """Комментарии пользователя к чужим вакансиям: comments_count вакансий уменьшается тем же запросом"""
+    deleted = delete(Comment).where(
+        Comment.id.in_(select(Comment.id).where(Comment.user_id == user_id).limit(limit))
+    ).returning(Comment.id, Comment.vacansy_id).cte("deleted")
+    counts = select(deleted.c.vacansy_id, func.count().label("cnt")).\
+        group_by(deleted.c.vacansy_id).cte("counts")
+    adjusted = update(Vacansy).where(Vacansy.id == counts.c.vacansy_id).values(
+        comments_count=Vacansy.comments_count - counts.c.cnt,
+        version=Vacansy.version + 1,
+        updated_at=func.now()).cte("adjusted")
+    events = events_from_select("comment", "deleted", deleted.c.id,
+                                func.jsonb_build_object("vacansy_id", deleted.c.vacansy_id)).cte("events")
+    return select(func.count()).select_from(deleted).add_cte(adjusted).add_cte(events)
+
+
+def _delete_batch(model, where, limit: int, topic: Optional[str] = None, owner=None):
+    """Пачка удалений; с topic - и событие deleted в outbox по каждой строке тем же запросом.
+
+    owner - столбец модели, который попадает в payload события, как при обычном удалении.
+    """
+    # DELETE ... LIMIT в PostgreSQL нет: пачка выбирается подзапросом по первичному ключу
+    columns = (model.id,) if owner is None else (model.id, owner)
+    deleted = delete(model).where(
+        model.id.in_(select(model.id).where(where).limit(limit))
+    ).returning(*columns).cte("deleted")
+    query = select(func.count()).select_from(deleted)
+    if topic is not None:
+        payload = {} if owner is None else func.jsonb_build_object(owner.key, deleted.c[owner.key])
+        query = query.add_cte(events_from_select(topic, "deleted", deleted.c.id, payload).cte("events"))
+    return query
+
+
+def _purge_query(step: str, user_id: UUID, limit: int):
+    if step == "comment":
+        return _delete_own_comments(user_id, limit)
+    if step == "vacansy_comment":
+        # вакансии удаляются следующим шагом, счетчики их комментариев не нужны
+        vacansy_ids = select(Vacansy.id).where(Vacansy.hr_id.in_(_hr_ids(user_id)))
+        return _delete_batch(Comment, Comment.vacansy_id.in_(vacansy_ids), limit, "comment", Comment.vacansy_id)
+    if step == "vacansy":
+        return _delete_batch(Vacansy, Vacansy.hr_id.in_(_hr_ids(user_id)), limit, "vacansy", Vacansy.hr_id)
+    if step == "vacansy_import":
+        return _delete_batch(VacansyImport, VacansyImport.hr_id.in_(_hr_ids(user_id)), limit)
+    if step == "hr":
+        return _delete_batch(Hr, Hr.user_id == user_id, limit)
+    if step == "resume":
+        return _delete_batch(Resume, Resume.user_id == user_id, limit, "resume", Resume.user_id)
+    if step == "entry":
+        return _delete_batch(Entry, Entry.user_id == user_id, limit)
+    if step == "user_role":
+        return _delete_batch(UserRole, UserRole.user_id == user_id, limit)
+    if step == "saved_search":
+        # saved_search_match удаляется каскадом по первичному ключу (saved_search_id, vacansy_id)
+        return _delete_batch(SavedSearch, SavedSearch.user_id == user_id, limit)
+    if step == "user":
+        # пользователь мог быть снова активирован, пока очистка стояла в очереди
+        return _delete_batch(User, (User.id == user_id) & (User.is_active == False), limit)
+    raise ValueError(f"Неизвестный шаг очистки: {step}")
+
+
+class UserPurgeDAL:
+
+    def __init__(self, session: AsyncSession) -> None:
+        log.debug("Инициализация UserPurgeDAL")
+        self.db_session = session
+
+    async def deactivate(self, user_id: UUID) -> Union[Optional[UUID], Exception]:
+        """Деактивировать пользователя и поставить очистку в очередь одним запросом.
+
+        Очистка не увидит запись раньше, чем пользователь станет неактивным. Завершенная
+        или отмененная очистка того же пользователя ставится в очередь заново.
+        Возвращает id пользователя или None, если активного пользователя нет.
+        """
+        log_message = f'CRUD Создание UserPurge: user_id={user_id}'
+        log.debug(log_message)
+        try:
+            deactivated = update(User).where(User.id == user_id, User.is_active == True).\
+                values(is_active=False).returning(User.id).cte("deactivated")
+            queued = pg_insert(UserPurge).from_select(["user_id"], select(deactivated.c.id)).on_conflict_do_update(
+                index_elements=[UserPurge.user_id],
+                set_={"status": "pending", "step": None, "finished_at": None, "updated_at": func.now()},
+                where=UserPurge.status.in_(("done", "cancelled"))).cte("queued")
+            res = await self.db_session.execute(select(deactivated.c.id).add_cte(queued))
+            deactivated_id = res.scalar_one_or_none()
+            await self.db_session.commit()
+            return deactivated_id
+        except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
+            log_message = f"Ошибка SQLAlchemyError при создании UserPurge: user_id={user_id} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при создании очистки пользователя")
+
+    async def get_unfinished(self, exclude: Sequence[UUID] = ()) -> Union[UserPurge, None, Exception]:
+        """Самая старая незавершенная очистка, в том числе прерванная падением воркера; кроме exclude"""
+        log.debug('CRUD Получение незавершенной UserPurge')
+        try:
+            query = select(UserPurge).where(UserPurge.status.in_(("pending", "running")))
+            if exclude:
+                query = query.where(UserPurge.user_id.not_in(exclude))
+            query = query.order_by(UserPurge.created_at).limit(1)
+            res = await self.db_session.execute(query)
+            purge = res.scalar_one_or_none()
+            await self.db_session.commit()
+            return purge
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении UserPurge {error}"
+            log.exception(log_message)
+
+    async def delete_batch(self,
+                           user_id: UUID,
+                           step: str,
+                           limit: int,
+                           timings: dict[str, Any]) -> Union[int, Exception]:
+        """Удаляет до limit строк шага и в той же транзакции сдвигает прогресс.
+
+        timings дополняется на месте: {шаг: {"rows", "batches", "seconds"}}.
+        Возвращает число удаленных строк; меньше limit - шаг закончен.
+        """
+        log_message = f'CRUD Очистка пользователя: user_id={user_id}, step={step}, limit={limit}'
+        log.debug(log_message)
+        try:
+            started = time.perf_counter()
+            deleted = await self.db_session.scalar(_purge_query(step, user_id, limit))
+            elapsed = time.perf_counter() - started
+            step_timings = timings.setdefault(step, {"rows": 0, "batches": 0, "seconds": 0.0})
+            step_timings["rows"] += deleted
+            step_timings["batches"] += 1
+            step_timings["seconds"] = round(step_timings["seconds"] + elapsed, 6)
+            query = update(UserPurge).where(UserPurge.user_id == user_id).values(
+                status="running",
+                step=step,
+                rows_deleted=UserPurge.rows_deleted + deleted,
+                timings=timings,
+                updated_at=func.now())
+            await self.db_session.execute(query)
+            await self.db_session.commit()
+            return deleted
+        except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
+            log_message = f"Ошибка SQLAlchemyError при очистке пользователя: user_id={user_id}, step={step} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при очистке пользователя")
+
+    async def set_status(self, user_id: UUID, purge_status: str) -> Union[None, Exception]:
+        log_message = f'CRUD Обновление UserPurge: user_id={user_id}, status={purge_status}'
+        log.debug(log_message)
+        try:
+            values = {"status": purge_status, "updated_at": func.now()}
+            if purge_status in ("done", "cancelled"):
+                values["finished_at"] = func.now()
+            await self.db_session.execute(update(UserPurge).where(UserPurge.user_id == user_id).values(**values))
+            await self.db_session.commit()
+        except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
+            log_message = f"Ошибка SQLAlchemyError при обновлении UserPurge: user_id={user_id} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при обновлении очистки пользователя")
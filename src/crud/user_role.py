@@ -1,104 +1,170 @@
 from uuid import UUID
-from typing import Union
+from typing import Optional, Union
 import logging.config
 
 from fastapi import status, HTTPException
-from sqlalchemy import select, update, exc
+from sqlalchemy import select, update, delete, exc, func, bindparam, CTE, Select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import UserRole
-from src.crud.base_classes import CrudBase
+from src.crud.base_classes import CrudBase, FOREIGN_KEY_VIOLATION, violated_constraint
+from src.crud.outbox import events_from_select
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
 log = logging.getLogger(__name__)
 
+# внешние ключи user_role созданы без имени, PostgreSQL назвал их <таблица>_<колонка>_fkey
+FOREIGN_KEY_DETAILS = {"user_role_user_id_fkey": "Пользователь не существует",
+                       "user_role_role_id_fkey": "Роль не существует"}
+
 
 class UserRoleDAL(CrudBase):
+    """Изменения user_role - по одному запросу.
+
+    Каждый запрос сам пишет события outbox в CTE, а существование пользователя и
+    роли проверяют внешние ключи, а не отдельные запросы перед изменением.
+    """
 
     def __init__(self, session: AsyncSession) -> None:
         log.debug("Инициализация UserRoleDAL")
         self.db_session = session
 
-    async def create(self, user_id: UUID, role_id: UUID) -> Union[UserRole, Exception]:
-        log_message = f'CRUD Создание UserRole: user_id={user_id}'
+    async def create(self, user_id: UUID, role_id: UUID) -> Union[Optional[UUID], Exception]:
+        """Назначить роль; id новой строки или None, если роль уже назначена"""
+        log_message = f'CRUD Создание UserRole: user_id={user_id}, role_id={role_id}'
         log.debug(log_message)
         try:
-            new_user_role = UserRole(user_id=user_id,
-                                     role_id=role_id)
-            self.db_session.add(new_user_role)
+            inserted = pg_insert(UserRole).values(id=func.gen_random_uuid(), user_id=user_id, role_id=role_id).\
+                on_conflict_do_nothing(index_elements=[UserRole.user_id, UserRole.role_id]).\
+                returning(UserRole.id, UserRole.user_id, UserRole.role_id).cte("inserted")
+            res = await self.db_session.execute(self._with_events(inserted, "assigned"))
+            user_role_id = res.scalar_one_or_none()
             await self.db_session.commit()
-            return new_user_role
+            return user_role_id
+        except exc.IntegrityError as error:
+            await self.db_session.rollback()
+            constraint = violated_constraint(error, FOREIGN_KEY_VIOLATION)
+            if constraint not in FOREIGN_KEY_DETAILS:
+                log_message = f"Ошибка IntegrityError при создании UserRole: user_id: {user_id} {error}"
+                log.exception(log_message)
+                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                    detail="Ошибка SQLAlchemyError при создание UserRole")
+            log_message = f"{status.HTTP_404_NOT_FOUND}: {FOREIGN_KEY_DETAILS[constraint]}"
+            log.error(log_message)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=FOREIGN_KEY_DETAILS[constraint])
         except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
             log_message = f"Ошибка SQLAlchemyError при создании UserRole: user_id: {user_id} {error}"
             log.exception(log_message)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Ошибка SQLAlchemyError при создание UserRole")
-        except Exception as error:
-            log_message = f"Неизвестная ошибка при создании UserRole: user_id: {user_id} {error}"
-            log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Неизвестная ошибка при создании UserRole")
 
-    async def delete(self, id: UUID) -> Union[UUID, Exception, None]:
-        log_message = f'CRUD Удаление UserRole: id={id}'
+    async def create_many(self, pairs: list[tuple[UUID, UUID]]) -> Union[set[tuple[UUID, UUID]], Exception]:
+        """Назначить роли парами (user_id, role_id) одним запросом, вернуть назначенные пары.
+
+        Пары передаются двумя массивами, уже назначенные пропускает ON CONFLICT.
+        """
+        log_message = f'CRUD Создание UserRole: {len(pairs)} шт.'
         log.debug(log_message)
+        if not pairs:
+            return set()
         try:
-            user_role = await self.db_session.get(UserRole, id)
-            if user_role is not None:
-                await self.db_session.delete(user_role)
-                await self.db_session.commit()
-                return user_role.id
+            given = self._unnest_pairs(pairs)
+            inserted = pg_insert(UserRole).from_select(
+                ["id", "user_id", "role_id"],
+                select(func.gen_random_uuid(), given.c.user_id, given.c.role_id)).\
+                on_conflict_do_nothing(index_elements=[UserRole.user_id, UserRole.role_id]).\
+                returning(UserRole.id, UserRole.user_id, UserRole.role_id).cte("inserted")
+            res = await self.db_session.execute(self._with_events(inserted, "assigned"))
+            assigned = {(user_id, role_id) for _, user_id, role_id in res.fetchall()}
+            await self.db_session.commit()
+            return assigned
+        except exc.IntegrityError as error:
+            # пользователя или роль удалили между проверкой и вставкой
+            await self.db_session.rollback()
+            log_message = f"Нарушение внешнего ключа при создании UserRole {error}"
+            log.error(log_message)
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="Пользователь или роль удалены во время назначения, повторите запрос")
         except exc.SQLAlchemyError as error:
-            log_message = f"Ошибка SQLAlchemy при удалении UserRole: id={id} {error}"
+            await self.db_session.rollback()
+            log_message = f"Ошибка SQLAlchemyError при создании UserRole {error}"
             log.exception(log_message)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Ошибка SQLAlchemyError при удалении UserRole")
-        except Exception as error:
-            log_message = f"Неизвестная ошибка при удалении UserRole: id={id} {error}"
-            log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Неизвестная ошибка при удалении UserRole")
+                                detail="Ошибка SQLAlchemyError при создание UserRole")
 
-    async def delete_by_user_id(self, user_id: str | UUID) -> Union[UUID, None, Exception]:
+    async def delete_many(self, pairs: list[tuple[UUID, UUID]]) -> Union[set[tuple[UUID, UUID]], Exception]:
+        """Отозвать роли парами (user_id, role_id) одним DELETE ... USING, вернуть отозванные пары"""
+        log_message = f'CRUD Удаление UserRole: {len(pairs)} шт.'
+        log.debug(log_message)
+        if not pairs:
+            return set()
+        given = self._unnest_pairs(pairs)
+        rows = await self._delete_where(UserRole.user_id == given.c.user_id, UserRole.role_id == given.c.role_id)
+        return {(user_id, role_id) for _, user_id, role_id in rows}
+
+    async def delete(self, id: UUID) -> Union[UUID, Exception, None]:
+        log_message = f'CRUD Удаление UserRole: id={id}'
+        log.debug(log_message)
+        rows = await self._delete_where(UserRole.id == id)
+        if rows:
+            return rows[0].id
+
+    async def delete_pair(self, user_id: UUID, role_id: UUID) -> Union[UUID, Exception, None]:
+        """Отозвать роль у пользователя; id удаленной строки или None, если роль не была назначена"""
+        log_message = f'CRUD Удаление UserRole: user_id={user_id}, role_id={role_id}'
+        log.debug(log_message)
+        rows = await self._delete_where(UserRole.user_id == user_id, UserRole.role_id == role_id)
+        if rows:
+            return rows[0].id
+
+    async def delete_by_user_id(self, user_id: str | UUID) -> Union[list[UUID], Exception]:
         log_message = f'CRUD Удаление UserRole: user_id={user_id}'
         log.debug(log_message)
-        try:
-            user_role = await self.db_session.get(UserRole, user_id)
-            if user_role is not None:
-                await self.db_session.delete(user_role)
-                await self.db_session.commit()
-                return user_role.id
-        except exc.SQLAlchemyError as error:
-            log_message = f"Ошибка SQLAlchemyError при удалении UserRole: user_id={user_id} {error}"
-            log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Ошибка SQLAlchemyError при удалении UserRole по user_id")
-        except Exception as error:
-            log_message = f"Неизвестная ошибка при удалении UserRole: user_id={user_id} {error}"
-            log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Неизвестная ошибка при удалении UserRole по user_id")
+        rows = await self._delete_where(UserRole.user_id == user_id)
+        return [row.id for row in rows]
 
-    async def delete_by_role_id(self, role_id: UUID | str) -> Union[UUID, None, Exception]:
+    async def delete_by_role_id(self, role_id: UUID | str) -> Union[list[UUID], Exception]:
         log_message = f'CRUD Удаление UserRole: role_id={role_id}'
         log.debug(log_message)
+        rows = await self._delete_where(UserRole.role_id == role_id)
+        return [row.id for row in rows]
+
+    async def _delete_where(self, *criteria) -> Union[list[tuple[UUID, UUID, UUID]], Exception]:
+        """DELETE ... RETURNING вместе с событиями "revoked"; строки (id, user_id, role_id)"""
         try:
-            user_role = await self.db_session.get(UserRole, role_id)
-            if user_role is not None:
-                await self.db_session.delete(user_role)
-                await self.db_session.commit()
-                return user_role.id
+            deleted = delete(UserRole).where(*criteria).\
+                returning(UserRole.id, UserRole.user_id, UserRole.role_id).cte("deleted")
+            res = await self.db_session.execute(self._with_events(deleted, "revoked"))
+            rows = res.fetchall()
+            await self.db_session.commit()
+            return rows
         except exc.SQLAlchemyError as error:
-            log_message = f"Ошибка SQLAlchemyError при удалении UserRole: role_id={role_id} {error}"
-            log.exception(log_message)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Ошибка SQLAlchemyError при удалении UserRole по role_id")
-        except Exception:
-            log_message = f"Неизвестная ошибка при удалении UserRole: role_id={role_id} {error}"
+            await self.db_session.rollback()
+            log_message = f"Ошибка SQLAlchemyError при удалении UserRole {error}"
             log.exception(log_message)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Неизвестная ошибка при удалении UserRole по role_id")
+                                detail="Ошибка SQLAlchemyError при удалении UserRole")
+
+    @staticmethod
+    def _unnest_pairs(pairs: list[tuple[UUID, UUID]]):
+        user_ids, role_ids = zip(*pairs)
+        return func.unnest(bindparam("user_ids", list(user_ids), type_=ARRAY(PG_UUID(as_uuid=True))),
+                           bindparam("role_ids", list(role_ids), type_=ARRAY(PG_UUID(as_uuid=True)))).\
+            table_valued("user_id", "role_id").render_derived(name="given")
+
+    @staticmethod
+    def _with_events(changed: CTE, event: str) -> Select:
+        """SELECT строк, измененных CTE changed; событие outbox на каждую пишет CTE events.
+
+        PostgreSQL выполняет изменяющий CTE, даже если основной запрос на него не ссылается.
+        """
+        events = events_from_select("role", event, changed.c.role_id,
+                                    func.jsonb_build_object("user_id", changed.c.user_id)).cte("events")
+        return select(changed.c.id, changed.c.user_id, changed.c.role_id).add_cte(events)
 
     async def get(self, id: UUID) -> Union[UserRole, None, Exception]:
         log_message = f'CRUD Получение UserRole: id={id}'
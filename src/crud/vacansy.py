@@ -1,21 +1,42 @@
 from uuid import UUID
-from typing import Union
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Mapping, Optional, Union
 import logging.config
 
 from fastapi import status, HTTPException
-from sqlalchemy import select, update, exc, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, exc, delete, any_, bindparam, true, func
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi_pagination.ext.sqlalchemy import paginate
 
-from src.database.models import Vacansy
+from src.database.models import Comment, Hr, Vacansy
 from src.crud.base_classes import CrudBase
+from src.crud.outbox import add_event
+from src.schemas.vacansy import CommentsProjection
 from src.utils.filter import VacansyFilter
+from src.utils.pagination import paginate, TotalMode
+from src.utils.salary import salary_columns
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
 log = logging.getLogger(__name__)
 
+DETAIL_COLUMNS = (Vacansy.id, Vacansy.place_of_work, Vacansy.about_the_company, Vacansy.required_specialt,
+                  Vacansy.proposed_salary, Vacansy.salary_min, Vacansy.salary_max, Vacansy.currency,
+                  Vacansy.working_conditions, Vacansy.required_experience,
+                  Vacansy.comments_count, Vacansy.created)
+COMMENT_COLUMNS = (Comment.id, Comment.text, Comment.created_at)
+
+
+@dataclass(frozen=True, slots=True)
+class VacansyDetail:
+    """Вакансия для карточки: плоские строки вместо ORM-объектов со связями.
+
+    comments is None - комментарии не запрашивались.
+    """
+    vacansy: Mapping[str, Any]
+    comments: Optional[list[Mapping[str, Any]]] = None
+
 
 class VacansyDAL(CrudBase):
 
@@ -27,8 +48,11 @@ class VacansyDAL(CrudBase):
         log_message = f'CRUD Создание Vacansy: vacansy={vacansy}, hr_id={hr_id}'
         log.debug(log_message)
         try:
-            vacansy: Vacansy = Vacansy(hr_id=hr_id, **vacansy)
+            vacansy: Vacansy = Vacansy(hr_id=hr_id, **vacansy,
+                                       **salary_columns(vacansy.get("proposed_salary")))
             self.db_session.add(vacansy)
+            await self.db_session.flush()
+            add_event(self.db_session, "vacansy", "created", vacansy.id, {"hr_id": str(hr_id)})
             await self.db_session.commit()
             return vacansy
         except exc.SQLAlchemyError as error:
@@ -42,16 +66,29 @@ class VacansyDAL(CrudBase):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Неизвестная ошибка при создании вакансии")
 
-    async def get(self, vacansy_id: UUID) -> Union[Vacansy, None, Exception]:
-        log_message = f'CRUD Получение Vacansy: vacansy_id={vacansy_id}'
+    async def get(self,
+                  vacansy_id: UUID,
+                  comments: CommentsProjection = CommentsProjection.none,
+                  comments_limit: int = 20) -> Union[VacansyDetail, None, Exception]:
+        log_message = f'CRUD Получение Vacansy: vacansy_id={vacansy_id}, comments={comments}'
         log.debug(log_message)
         try:
-            query = select(Vacansy).options(selectinload(Vacansy.comments)).where(
-                Vacansy.id == vacansy_id, Vacansy.is_active == True)
+            if comments == CommentsProjection.latest:
+                return await self._get_with_latest_comments(vacansy_id, comments_limit)
+
+            query = select(*DETAIL_COLUMNS).where(Vacansy.id == vacansy_id, Vacansy.is_active == True)
             res = await self.db_session.execute(query)
             vacansy_row = res.fetchone()
-            if vacansy_row is not None:
-                return vacansy_row[0]
+            if vacansy_row is None:
+                return None
+            if comments == CommentsProjection.none:
+                return VacansyDetail(vacansy=vacansy_row._mapping)
+
+            query = select(*COMMENT_COLUMNS).where(Comment.vacansy_id == vacansy_id).order_by(
+                Comment.created_at, Comment.id)
+            res = await self.db_session.execute(query)
+            return VacansyDetail(vacansy=vacansy_row._mapping,
+                                 comments=[row._mapping for row in res])
         except exc.SQLAlchemyError as error:
             log_message = f"Ошибка SQLAlchemyError при получении Vacansy: vacansy_id={vacansy_id} {error}"
             log.exception(log_message)
@@ -59,16 +96,50 @@ class VacansyDAL(CrudBase):
             log_message = f"Неизвестная ошибка при получении Vacansy: vacansy_id={vacansy_id} {error}"
             log.exception(log_message)
 
-    async def get_list_vacansy_dal(self, vacansy_filter: VacansyFilter) -> Union[list[Vacansy], None, Exception]:
+    async def _get_with_latest_comments(self, vacansy_id: UUID, comments_limit: int) -> Optional[VacansyDetail]:
+        # один запрос: LEFT JOIN LATERAL читает с конца индекса (vacansy_id, created_at, id)
+        # ровно comments_limit строк, сколько бы комментариев ни было у вакансии
+        latest = select(*COMMENT_COLUMNS).where(Comment.vacansy_id == Vacansy.id).order_by(
+            Comment.created_at.desc(), Comment.id.desc()).limit(comments_limit).lateral("latest_comment")
+        query = select(*DETAIL_COLUMNS,
+                       latest.c.id.label("comment_id"),
+                       latest.c.text.label("comment_text"),
+                       latest.c.created_at.label("comment_created_at")).outerjoin(latest, true()).where(
+            Vacansy.id == vacansy_id, Vacansy.is_active == True)
+        res = await self.db_session.execute(query)
+        rows = res.fetchall()
+        if not rows:
+            return None
+        vacansy = {column.key: rows[0]._mapping[column.key] for column in DETAIL_COLUMNS}
+        comments = [{"id": row.comment_id, "text": row.comment_text, "created_at": row.comment_created_at}
+                    for row in reversed(rows) if row.comment_id is not None]
+        return VacansyDetail(vacansy=vacansy, comments=comments)
+
+    async def get_version(self, vacansy_id: UUID) -> Union[tuple[int, datetime], None, Exception]:
+        log_message = f'CRUD Получение версии Vacansy: vacansy_id={vacansy_id}'
+        log.debug(log_message)
+        try:
+            query = select(Vacansy.version, Vacansy.updated_at).where(Vacansy.id == vacansy_id,
+                                                                      Vacansy.is_active == True)
+            res = await self.db_session.execute(query)
+            return res.fetchone()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении версии Vacansy: vacansy_id={vacansy_id} {error}"
+            log.exception(log_message)
+
+    async def get_list_vacansy_dal(self,
+                                   vacansy_filter: VacansyFilter,
+                                   total_mode: TotalMode = TotalMode.exact) -> Union[list[Vacansy], None, Exception]:
         log_message = f'CRUD Получение списка Vacansy: vacansy_filter={vacansy_filter}'
         log.debug(log_message)
         try:
             query = select(Vacansy.id, Vacansy.place_of_work, Vacansy.required_specialt,
-                           Vacansy.proposed_salary, Vacansy.working_conditions, Vacansy.required_experience,
-                           Vacansy.created).where(Vacansy.is_active == True)
+                           Vacansy.proposed_salary, Vacansy.salary_min, Vacansy.salary_max, Vacansy.currency,
+                           Vacansy.working_conditions, Vacansy.required_experience,
+                           Vacansy.comments_count, Vacansy.created).where(Vacansy.is_active == True)
             query = vacansy_filter.filter(query)
             query = vacansy_filter.sort(query)
-            vacansy_rows = await paginate(self.db_session, query)
+            vacansy_rows = await paginate(self.db_session, query, total_mode)
             return vacansy_rows
         except exc.SQLAlchemyError as error:
             log_message = f"Ошибка SQLAlchemyError при получении списка Vacansy: vacansy_filter={vacansy_filter} {error}"
@@ -77,15 +148,40 @@ class VacansyDAL(CrudBase):
             log_message = f"Неизвестная ошибка при получении списка Vacansy: vacansy_filter={vacansy_filter} {error}"
             log.exception(log_message)
 
+    async def stream_list(self,
+                          vacansy_filter: VacansyFilter,
+                          yield_per: int) -> AsyncIterator[Mapping[str, Any]]:
+        log_message = f'CRUD Выгрузка Vacansy: vacansy_filter={vacansy_filter}'
+        log.debug(log_message)
+        query = select(*DETAIL_COLUMNS).where(Vacansy.is_active == True)
+        query = vacansy_filter.filter(query)
+        query = vacansy_filter.sort(query)
+        try:
+            # серверный курсор: в памяти не больше yield_per строк
+            res = await self.db_session.stream(query.execution_options(yield_per=yield_per))
+            async for partition in res.partitions():
+                for row in partition:
+                    yield row._mapping
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при выгрузке Vacansy: vacansy_filter={vacansy_filter} {error}"
+            log.exception(log_message)
+            raise
+
     async def update(self, vacansy_id: UUID, hr_id: UUID, body: dict) -> Union[UUID, None, Exception]:
         log_message = f'CRUD Обновление Vacansy: vacansy_id={vacansy_id}, hr_id={hr_id}, body={body}'
         log.debug(log_message)
         try:
+            if body.get("proposed_salary") is not None:
+                body = {**body, **salary_columns(body["proposed_salary"])}
             query = update(Vacansy).where(Vacansy.id == vacansy_id, Vacansy.is_active == True,
-                                          Vacansy.hr_id == hr_id).values(**body).returning(Vacansy.id)
+                                          Vacansy.hr_id == hr_id).values(
+                **body, version=Vacansy.version + 1, updated_at=func.now()).returning(Vacansy.id, Vacansy.version)
             res = await self.db_session.execute(query)
-            await self.db_session.commit()
             vacansy_row = res.fetchone()
+            if vacansy_row is not None:
+                add_event(self.db_session, "vacansy", "updated", vacansy_row.id,
+                          {"hr_id": str(hr_id), "version": vacansy_row.version, "fields": sorted(body)})
+            await self.db_session.commit()
             if vacansy_row is not None:
                 return vacansy_row[0]
         except exc.SQLAlchemyError as error:
@@ -107,8 +203,11 @@ class VacansyDAL(CrudBase):
                                           Vacansy.hr_id == hr_id).returning(Vacansy.id)
 
             res = await self.db_session.execute(query)
+            deleted_id = res.scalar()
+            if deleted_id is not None:
+                add_event(self.db_session, "vacansy", "deleted", deleted_id, {"hr_id": str(hr_id)})
             await self.db_session.commit()
-            return res.scalar()
+            return deleted_id
         except exc.SQLAlchemyError as error:
             log_message = f"Ошибка SQLAlchemyError при удалении Vacansy: vacansy_id={vacansy_id}, hr_id={hr_id} {error}"
             log.exception(log_message)
@@ -120,13 +219,15 @@ class VacansyDAL(CrudBase):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Неизвестная ошибка при попытке удалить Vacansy")
 
-    async def get_by_hr_id(self, hr_id: UUID) -> Union[list[Vacansy], None, Exception]:
+    async def get_by_hr_id(self,
+                           hr_id: UUID,
+                           total_mode: TotalMode = TotalMode.exact) -> Union[list[Vacansy], None, Exception]:
         log_message = f'CRUD Получение списка Vacansy: hr_id={hr_id}'
         log.debug(log_message)
         try:
             query = select(Vacansy).where(Vacansy.hr_id ==
                                           hr_id, Vacansy.is_active == True)
-            vacansy_rows = await paginate(self.db_session, query)
+            vacansy_rows = await paginate(self.db_session, query, total_mode)
             return vacansy_rows
         except exc.SQLAlchemyError as error:
             log_message = f"Ошибка SQLAlchemyError при получении списка Vacansy: hr_id={hr_id} {error}"
@@ -134,3 +235,58 @@ class VacansyDAL(CrudBase):
         except Exception as error:
             log_message = f"Неизвестная ошибка при получении списка Vacansy: hr_id={hr_id} {error}"
             log.exception(log_message)
+
+    async def get_matching_text(self, vacansy_id: UUID, user_id: UUID) -> Union[str, None, Exception]:
+        """Текст активной вакансии, если ее HR принадлежит пользователю user_id"""
+        log_message = f'CRUD Получение текста Vacansy для matching: vacansy_id={vacansy_id}, user_id={user_id}'
+        log.debug(log_message)
+        try:
+            query = select(Vacansy.required_specialt, Vacansy.required_experience,
+                           Vacansy.about_the_company).join(Hr, Hr.id == Vacansy.hr_id).\
+                where(Vacansy.id == vacansy_id, Vacansy.is_active == True, Hr.user_id == user_id)
+            res = await self.db_session.execute(query)
+            vacansy_row = res.fetchone()
+            if vacansy_row is not None:
+                return " ".join(vacansy_row)
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении текста Vacansy: vacansy_id={vacansy_id} {error}"
+            log.exception(log_message)
+        except Exception as error:
+            log_message = f"Неизвестная ошибка при получении текста Vacansy: vacansy_id={vacansy_id} {error}"
+            log.exception(log_message)
+
+    async def get_matching_texts(self, vacansy_ids: list[UUID]) -> Union[dict[UUID, str], None, Exception]:
+        """Тексты активных вакансий для matching: удаленных и снятых в ответе нет, None - ошибка базы"""
+        log_message = f'CRUD Получение текстов Vacansy для matching: {len(vacansy_ids)} шт.'
+        log.debug(log_message)
+        try:
+            ids = bindparam("vacansy_ids", vacansy_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            query = select(Vacansy.id, Vacansy.required_specialt, Vacansy.required_experience,
+                           Vacansy.about_the_company).where(Vacansy.id == any_(ids), Vacansy.is_active == True)
+            res = await self.db_session.execute(query)
+            return {vacansy_id: " ".join(text) for vacansy_id, *text in res.fetchall()}
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении текстов Vacansy: {error}"
+            log.exception(log_message)
+        except Exception as error:
+            log_message = f"Неизвестная ошибка при получении текстов Vacansy: {error}"
+            log.exception(log_message)
+
+    async def get_by_ids(self, vacansy_ids: list[UUID]) -> Union[list[tuple], None, Exception]:
+        log_message = f'CRUD Получение списка Vacansy: vacansy_ids={vacansy_ids}'
+        log.debug(log_message)
+        try:
+            # один параметр-массив вместо IN (...) с параметром на каждый id
+            ids = bindparam("vacansy_ids", vacansy_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            query = select(Vacansy.id, Vacansy.place_of_work, Vacansy.required_specialt,
+                           Vacansy.proposed_salary, Vacansy.salary_min, Vacansy.salary_max, Vacansy.currency,
+                           Vacansy.working_conditions, Vacansy.required_experience,
+                           Vacansy.comments_count, Vacansy.created).where(Vacansy.id == any_(ids), Vacansy.is_active == True)
+            res = await self.db_session.execute(query)
+            return res.fetchall()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении списка Vacansy: vacansy_ids={vacansy_ids} {error}"
+            log.exception(log_message)
+        except Exception as error:
+            log_message = f"Неизвестная ошибка при получении списка Vacansy: vacansy_ids={vacansy_ids} {error}"
+            log.exception(log_message)
@@ -0,0 +1,38 @@
+from typing import Union
+import logging.config
+
+from sqlalchemy import select, exc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import VacansyFacet
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+class VacansyFacetDAL:
+    """Только чтение: счетчики пишет триггер vacansy_facet_sync"""
+
+    def __init__(self, session: AsyncSession) -> None:
+        log.debug("Инициализация VacansyFacetDAL")
+        self.db_session = session
+
+    async def get_top(self, limit: int) -> Union[list[tuple[str, str, int]], None]:
+        log_message = f'CRUD Получение VacansyFacet: limit={limit}'
+        log.debug(log_message)
+        try:
+            rank = func.row_number().over(partition_by=VacansyFacet.facet,
+                                          order_by=(VacansyFacet.count.desc(), VacansyFacet.value))
+            subquery = select(VacansyFacet.facet, VacansyFacet.value, VacansyFacet.count,
+                              rank.label("rank")).where(VacansyFacet.count > 0).subquery()
+            query = select(subquery.c.facet, subquery.c.value, subquery.c.count).where(
+                subquery.c.rank <= limit).order_by(subquery.c.facet, subquery.c.rank)
+            res = await self.db_session.execute(query)
+            return [tuple(row) for row in res.fetchall()]
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении VacansyFacet: limit={limit} {error}"
+            log.exception(log_message)
+        except Exception as error:
+            log_message = f"Неизвестная ошибка при получении VacansyFacet: limit={limit} {error}"
+            log.exception(log_message)
@@ -0,0 +1,154 @@
+from uuid import UUID
+from typing import Union
+import logging.config
+
+from fastapi import status, HTTPException
+from sqlalchemy import select, update, insert, exc, literal, table, column
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Hr, Vacansy, VacansyImport
+from src.crud.outbox import events_from_select
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+STAGE_TABLE = "vacansy_import_stage"
+STAGE_COLUMNS = ("id", "place_of_work", "about_the_company", "required_specialt", "proposed_salary",
+                 "working_conditions", "required_experience", "salary_min", "salary_max", "currency")
+
+# временная таблица живет до конца соединения, строки - до конца транзакции
+CREATE_STAGE_TABLE = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} (
+    id uuid NOT NULL,
+    place_of_work varchar(250) NOT NULL,
+    about_the_company varchar(3000) NOT NULL,
+    required_specialt varchar(500) NOT NULL,
+    proposed_salary varchar(120) NOT NULL,
+    working_conditions varchar(250) NOT NULL,
+    required_experience varchar(250) NOT NULL,
+    salary_min integer,
+    salary_max integer,
+    currency varchar(3)
+) ON COMMIT DELETE ROWS
+"""
+
+stage = table(STAGE_TABLE, *(column(name) for name in STAGE_COLUMNS))
+
+
+class VacansyImportDAL:
+
+    def __init__(self, session: AsyncSession) -> None:
+        log.debug("Инициализация VacansyImportDAL")
+        self.db_session = session
+
+    async def create(self, hr_id: UUID) -> Union[VacansyImport, Exception]:
+        log_message = f'CRUD Создание VacansyImport: hr_id={hr_id}'
+        log.debug(log_message)
+        try:
+            vacansy_import = VacansyImport(hr_id=hr_id)
+            self.db_session.add(vacansy_import)
+            await self.db_session.commit()
+            return vacansy_import
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при создании VacansyImport: hr_id={hr_id} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при создании загрузки")
+
+    async def get_owned_hr_id(self, hr_id: UUID, user_id: UUID) -> Union[UUID, None, Exception]:
+        """hr_id, если HR активен и принадлежит пользователю user_id, иначе None"""
+        log_message = f'CRUD Проверка Hr: hr_id={hr_id}, user_id={user_id}'
+        log.debug(log_message)
+        try:
+            query = select(Hr.id).where(Hr.id == hr_id, Hr.user_id == user_id, Hr.is_active == True)
+            res = await self.db_session.execute(query)
+            return res.scalar_one_or_none()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при проверке Hr: hr_id={hr_id} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при проверке HR")
+
+    async def get(self, import_id: UUID, user_id: UUID) -> Union[VacansyImport, None, Exception]:
+        """Загрузка, если ее HR принадлежит пользователю user_id"""
+        log_message = f'CRUD Получение VacansyImport: import_id={import_id}'
+        log.debug(log_message)
+        try:
+            query = select(VacansyImport).join(Hr, Hr.id == VacansyImport.hr_id).where(
+                VacansyImport.id == import_id, Hr.user_id == user_id)
+            res = await self.db_session.execute(query)
+            return res.scalar_one_or_none()
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при получении VacansyImport: import_id={import_id} {error}"
+            log.exception(log_message)
+
+    async def merge_batch(self,
+                          import_id: UUID,
+                          hr_id: UUID,
+                          records: list[tuple],
+                          rows_processed: int,
+                          rows_in_batch: int,
+                          rows_failed: int) -> Union[int, None, Exception]:
+        """COPY пачки в staging, INSERT ... SELECT в vacansy и сдвиг прогресса - одной транзакцией.
+
+        rows_processed - ожидаемое значение счетчика до пачки: если его уже сдвинула
+        параллельная загрузка того же файла, транзакция откатывается и возвращается None.
+        """
+        log_message = f'CRUD Загрузка пачки Vacansy: import_id={import_id}, rows={rows_in_batch}'
+        log.debug(log_message)
+        try:
+            conn = await self.db_session.connection()
+            imported = 0
+            if records:
+                await conn.exec_driver_sql(CREATE_STAGE_TABLE)
+                raw_connection = await conn.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    STAGE_TABLE, records=records, columns=STAGE_COLUMNS)
+                query = insert(Vacansy).from_select(
+                    [*STAGE_COLUMNS, "hr_id"],
+                    select(*(stage.c[name] for name in STAGE_COLUMNS), literal(hr_id, PG_UUID(as_uuid=True))))
+                res = await conn.execute(query)
+                imported = res.rowcount
+                await conn.execute(events_from_select("vacansy", "created", stage.c.id,
+                                                      {"hr_id": str(hr_id), "import_id": str(import_id)}))
+            query = update(VacansyImport).where(VacansyImport.id == import_id,
+                                                VacansyImport.rows_processed == rows_processed).values(
+                rows_processed=VacansyImport.rows_processed + rows_in_batch,
+                rows_imported=VacansyImport.rows_imported + imported,
+                rows_failed=VacansyImport.rows_failed + rows_failed)
+            res = await conn.execute(query)
+            if res.rowcount != 1:
+                await self.db_session.rollback()
+                return None
+            await self.db_session.commit()
+            return imported
+        except exc.SQLAlchemyError as error:
+            await self.db_session.rollback()
+            log_message = f"Ошибка SQLAlchemyError при загрузке пачки Vacansy: import_id={import_id} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при загрузке вакансий")
+        except Exception as error:
+            await self.db_session.rollback()
+            log_message = f"Неизвестная ошибка при загрузке пачки Vacansy: import_id={import_id} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Неизвестная ошибка при загрузке вакансий")
+
+    async def set_status(self, import_id: UUID, import_status: str) -> Union[VacansyImport, None, Exception]:
+        log_message = f'CRUD Обновление VacansyImport: import_id={import_id}, status={import_status}'
+        log.debug(log_message)
+        try:
+            query = update(VacansyImport).where(VacansyImport.id == import_id).values(
+                status=import_status).returning(VacansyImport)
+            res = await self.db_session.execute(query)
+            vacansy_import = res.scalar_one_or_none()
+            await self.db_session.commit()
+            return vacansy_import
+        except exc.SQLAlchemyError as error:
+            log_message = f"Ошибка SQLAlchemyError при обновлении VacansyImport: import_id={import_id} {error}"
+            log.exception(log_message)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Ошибка SQLAlchemyError при обновлении загрузки")
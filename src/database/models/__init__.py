@@ -8,6 +8,13 @@ all = (
     "Hr",
     "Comment",
     "Vacansy",
+    "VacansyFacet",
+    "VacansyImport",
+    "HrStats",
+    "UserPurge",
+    "OutboxEvent",
+    "SavedSearch",
+    "SavedSearchMatch",
 )
 
 from .base import Base
@@ -19,3 +26,9 @@ from .entry import Entry
 from .hr import Hr
 from .comment import Comment
 from .vacansy import Vacansy
+from .vacansy_facet import VacansyFacet
+from .vacansy_import import VacansyImport
+from .hr_stats import HrStats
+from .user_purge import UserPurge
+from .outbox import OutboxEvent
+from .saved_search import SavedSearch, SavedSearchMatch
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, DateTime, func, ForeignKey
+from sqlalchemy import String, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -36,3 +36,9 @@ class Comment(Base):
 
     def __repr__(self) -> str:
         return f"Comment: {self.id}"
+
+
+# ключ курсорной пагинации комментариев вакансии: (created_at, id)
+Index("ix_comment_vacansy_id_created_at_id", Comment.vacansy_id, Comment.created_at, Comment.id)
+# удаление комментариев пользователя: очистка после деактивации и ON DELETE CASCADE
+Index("ix_comment_user_id", Comment.user_id)
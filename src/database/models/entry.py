@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, func, ForeignKey
+from sqlalchemy import String, func, ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -27,3 +27,13 @@ class Entry(Base):
     refresh_token: Mapped[str] = mapped_column(String(length=100))
     is_active: Mapped[bool] = mapped_column(default=True)
     user: Mapped["User"] = relationship(back_populates="entries")
+
+
+# Частичные индексы под запросы EntryDAL с only_active=True: закрытых сессий
+# намного больше, чем открытых, и в индексы они не попадают.
+# get_by_user_agent при входе
+Index("ix_entry_user_agent_active", Entry.user_agent, postgresql_where=Entry.is_active)
+# get_by_user_id_list при выходе со всех устройств
+Index("ix_entry_user_id_active", Entry.user_id, postgresql_where=Entry.is_active)
+# все сессии пользователя, включая закрытые: история входов и удаление пользователя
+Index("ix_entry_user_id", Entry.user_id)
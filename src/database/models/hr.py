@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, DateTime, func, ForeignKey
+from sqlalchemy import String, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -39,3 +39,7 @@ class Hr(Base):
         cascade="all, delete",
         back_populates="hr",
         passive_deletes=True)
+
+
+# HR пользователя: каскад от user и пакетная очистка после деактивации
+Index("ix_hr_user_id", Hr.user_id)
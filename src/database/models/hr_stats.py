@@ -0,0 +1,35 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, func, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from .base import Base
+
+
+class HrStats(Base):
+    """Агрегаты по вакансиям HR для панели.
+
+    Поддерживаются триггерами hr_stats_vacansy_* на таблице vacansy в той же
+    транзакции, что и изменение вакансии; комментарии учитываются через
+    vacansy.comments_count. Периодическая сверка исправляет расхождения.
+    """
+    __tablename__ = "hr_stats"
+
+    hr_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),
+                                             ForeignKey("hr.id",
+                                                        ondelete="CASCADE",
+                                                        onupdate="CASCADE"),
+                                             primary_key=True)
+    active_vacansies: Mapped[int] = mapped_column(default=0, server_default="0")
+    total_vacansies: Mapped[int] = mapped_column(default=0, server_default="0")
+    comments_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    last_vacansy_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_comment_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=datetime.utcnow,
+                                                 server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"HrStats: {self.hr_id} ({self.active_vacansies}/{self.total_vacansies}, {self.comments_count})"
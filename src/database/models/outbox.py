@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, String, DateTime, Identity, func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from .base import Base
+
+
+class OutboxEvent(Base):
+    """Событие об изменении данных, ожидающее публикации в Redis Streams.
+
+    Пишется DAL в той же транзакции, что и само изменение: событие появляется
+    тогда и только тогда, когда изменение зафиксировано. Ретранслятор
+    (src.services.outbox) публикует события и удаляет опубликованные строки.
+    """
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    # поток публикации: vacansy, resume, comment, role
+    topic: Mapped[str] = mapped_column(String(length=50))
+    event: Mapped[str] = mapped_column(String(length=50))
+    aggregate_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True))
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, default=dict, server_default="{}")
+    # время транзакции из базы: порядок событий задает id, а не часы приложения
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"OutboxEvent: {self.id} ({self.topic}.{self.event} {self.aggregate_id})"
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, DateTime, func, ForeignKey
+from sqlalchemy import String, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -28,6 +28,11 @@ class Resume(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
                                                  default=datetime.utcnow,
                                                  server_default=func.now())
+    # увеличивается при каждом изменении резюме, см. src.utils.etag
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=datetime.utcnow,
+                                                 server_default=func.now())
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),
                                                ForeignKey("user.id",
                                                           ondelete="CASCADE",
@@ -37,3 +42,7 @@ class Resume(Base):
 
     def __repr__(self) -> str:
         return f"Resume: {self.first_name} - {self.last_name}"
+
+
+# ResumeDAL.get_by_user_id и очистка после деактивации пользователя
+Index("ix_resume_user_id", Resume.user_id)
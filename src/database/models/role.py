@@ -1,7 +1,8 @@
 import uuid
+from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String
+from sqlalchemy import BigInteger, String, DateTime, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -16,6 +17,13 @@ class Role(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(length=100), unique=True)
+    # битовая маска src.utils.permissions.Permission
+    permissions: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # увеличивается при каждом изменении роли, см. src.utils.etag
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=datetime.utcnow,
+                                                 server_default=func.now())
     user_roles: Mapped[list["UserRole"]] = relationship(
         back_populates="role",
         cascade="all, delete",
@@ -0,0 +1,62 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import String, DateTime, func, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from .base import Base
+
+
+class SavedSearch(Base):
+    """Сохраненный VacansyFilter пользователя для уведомлений о новых вакансиях.
+
+    predicate_key - хэш канонического filters (src.utils.saved_search): поиски с
+    одинаковым фильтром проверяются против новых вакансий один раз.
+    """
+    __tablename__ = "saved_search"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),
+                                               ForeignKey("user.id",
+                                                          ondelete="CASCADE",
+                                                          onupdate="CASCADE"),
+                                               nullable=False)
+    name: Mapped[str] = mapped_column(String(length=100))
+    filters: Mapped[dict[str, Any]] = mapped_column(JSONB, default=dict, server_default="{}")
+    predicate_key: Mapped[str] = mapped_column(String(length=40))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=datetime.utcnow,
+                                                 server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"SavedSearch: {self.id} ({self.name})"
+
+
+class SavedSearchMatch(Base):
+    """Новая вакансия, подошедшая под сохраненный поиск; пишется задачей saved_search"""
+    __tablename__ = "saved_search_match"
+
+    saved_search_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),
+                                                       ForeignKey("saved_search.id",
+                                                                  ondelete="CASCADE",
+                                                                  onupdate="CASCADE"),
+                                                       primary_key=True)
+    vacansy_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),
+                                                  ForeignKey("vacansy.id",
+                                                             ondelete="CASCADE",
+                                                             onupdate="CASCADE"),
+                                                  primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"SavedSearchMatch: {self.saved_search_id} - {self.vacansy_id}"
+
+
+# список поисков пользователя и шаг очистки пользователя
+Index("ix_saved_search_user_id", SavedSearch.user_id)
+# выдача совпадений поиска, новые первыми
+Index("ix_saved_search_match_search_created", SavedSearchMatch.saved_search_id, SavedSearchMatch.created_at)
+# ON DELETE CASCADE при удалении вакансии
+Index("ix_saved_search_match_vacansy_id", SavedSearchMatch.vacansy_id)
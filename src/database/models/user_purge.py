@@ -0,0 +1,37 @@
+import uuid
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import String, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from .base import Base
+
+
+class UserPurge(Base):
+    """Очистка данных деактивированного пользователя.
+
+    Без внешнего ключа на user: последним шагом удаляется сама строка пользователя,
+    а запись об очистке с временем по таблицам остается.
+    step и rows_deleted обновляются в той же транзакции, что и удаление пачки,
+    поэтому после падения очистка продолжается с того же шага.
+    """
+    __tablename__ = "user_purge"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    status: Mapped[str] = mapped_column(String(length=20), default="pending", server_default="pending")
+    step: Mapped[Optional[str]] = mapped_column(String(length=50))
+    rows_deleted: Mapped[int] = mapped_column(default=0, server_default="0")
+    # {шаг: {"rows": строк, "batches": пачек, "seconds": время удаления}}
+    timings: Mapped[dict[str, Any]] = mapped_column(JSONB, default=dict, server_default="{}")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=datetime.utcnow,
+                                                 server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=datetime.utcnow,
+                                                 server_default=func.now())
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    def __repr__(self) -> str:
+        return f"UserPurge: {self.user_id} ({self.status}, {self.step}, {self.rows_deleted})"
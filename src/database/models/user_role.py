@@ -1,7 +1,7 @@
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -26,3 +26,10 @@ class UserRole(Base):
                                                           onupdate="CASCADE"), nullable=False)
     user: Mapped["User"] = relationship(back_populates="user_roles")
     role: Mapped["Role"] = relationship(back_populates="user_roles")
+
+
+# одна роль назначается пользователю один раз; по этому индексу разрешается ON CONFLICT,
+# и он же по первой колонке служит поиску ролей пользователя при входе и очистке
+Index("ux_user_role_user_id_role_id", UserRole.user_id, UserRole.role_id, unique=True)
+# пользователи роли и каскад при удалении роли - только по индексу, без чтения таблицы
+Index("ix_user_role_role_id", UserRole.role_id, postgresql_include=["user_id", "id"])
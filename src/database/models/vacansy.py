@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, DateTime, func, ForeignKey
+from sqlalchemy import String, DateTime, func, ForeignKey, Index, and_, or_
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -23,10 +23,21 @@ class Vacansy(Base):
     proposed_salary: Mapped[str] = mapped_column(String(length=120))
     working_conditions: Mapped[str] = mapped_column(String(length=250))
     required_experience: Mapped[str] = mapped_column(String(length=250))
+    # нормализованные значения proposed_salary, см. src.utils.salary
+    salary_min: Mapped[int | None]
+    salary_max: Mapped[int | None]
+    currency: Mapped[str | None] = mapped_column(String(length=3))
     is_active: Mapped[bool] = mapped_column(default=True)
+    # счетчик обновляется в той же транзакции, что и таблица comment (см. CommentDAL)
+    comments_count: Mapped[int] = mapped_column(default=0, server_default="0")
     created: Mapped[datetime] = mapped_column(DateTime(timezone=True),
                                               default=datetime.utcnow,
                                               server_default=func.now())
+    # увеличивается при каждом изменении карточки, см. src.utils.etag
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=datetime.utcnow,
+                                                 server_default=func.now())
     hr_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),
                                              ForeignKey("hr.id",
                                                         ondelete="CASCADE",
@@ -40,3 +51,25 @@ class Vacansy(Base):
 
     def __repr__(self) -> str:
         return f"Vacansy: {self.place_of_work} - {self.required_experience}"
+
+
+# Нижняя и верхняя граница зарплаты: если указана только одна, она же и вторая граница.
+# Выражения должны совпадать с индексами ниже, иначе планировщик их не использует.
+salary_lower = func.coalesce(Vacansy.salary_min, Vacansy.salary_max)
+salary_upper = func.coalesce(Vacansy.salary_max, Vacansy.salary_min)
+salary_range = func.int4range(salary_lower, salary_upper, "[]")
+has_salary = or_(Vacansy.salary_min.isnot(None), Vacansy.salary_max.isnot(None))
+
+Index("ix_vacansy_salary_lower", salary_lower, postgresql_where=Vacansy.is_active)
+Index("ix_vacansy_salary_upper", salary_upper, postgresql_where=Vacansy.is_active)
+Index("ix_vacansy_salary_range", salary_range,
+      postgresql_using="gist",
+      postgresql_where=and_(Vacansy.is_active, has_salary))
+
+# Частичные индексы под запросы VacansyDAL: неактивные вакансии в них не попадают.
+# get_by_hr_id
+Index("ix_vacansy_hr_id_active", Vacansy.hr_id, postgresql_where=Vacansy.is_active)
+# COUNT(*) активных для пагинации
+Index("ix_vacansy_created_id_active", Vacansy.created, Vacansy.id, postgresql_where=Vacansy.is_active)
+# все вакансии HR, включая неактивные: удаление пользователя и ON DELETE CASCADE от hr
+Index("ix_vacansy_hr_id", Vacansy.hr_id)
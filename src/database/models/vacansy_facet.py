@@ -0,0 +1,20 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class VacansyFacet(Base):
+    """Счетчики активных вакансий по значениям фасетов.
+
+    Поддерживаются триггером vacansy_facet_sync на таблице vacansy
+    в той же транзакции, что и изменение вакансии.
+    """
+    __tablename__ = "vacansy_facet"
+
+    facet: Mapped[str] = mapped_column(String(length=50), primary_key=True)
+    value: Mapped[str] = mapped_column(String(length=500), primary_key=True)
+    count: Mapped[int] = mapped_column(default=0, server_default="0")
+
+    def __repr__(self) -> str:
+        return f"VacansyFacet: {self.facet} - {self.value} ({self.count})"
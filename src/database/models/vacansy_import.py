@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, func, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from .base import Base
+
+
+class VacansyImport(Base):
+    """Прогресс массовой загрузки вакансий.
+
+    rows_processed обновляется в той же транзакции, что и вставка пачки,
+    поэтому при повторной загрузке того же файла уже вставленные строки пропускаются.
+    """
+    __tablename__ = "vacansy_import"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    hr_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),
+                                             ForeignKey("hr.id",
+                                                        ondelete="CASCADE",
+                                                        onupdate="CASCADE"),
+                                             nullable=False)
+    status: Mapped[str] = mapped_column(String(length=20), default="in_progress")
+    rows_processed: Mapped[int] = mapped_column(default=0, server_default="0")
+    rows_imported: Mapped[int] = mapped_column(default=0, server_default="0")
+    rows_failed: Mapped[int] = mapped_column(default=0, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=datetime.utcnow,
+                                                 server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=datetime.utcnow,
+                                                 server_default=func.now(),
+                                                 onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"VacansyImport: {self.id} ({self.status}, {self.rows_processed})"
@@ -0,0 +1,26 @@
+from typing import AsyncGenerator
+
+from redis.asyncio import Redis, ConnectionPool
+
+from src.core.config import settings
+
+
+class RedisHelper:
+    """Общий пул соединений Redis для кэшей, очередей и фоновых задач"""
+
+    def __init__(self, host: str, port: int, password: str) -> None:
+        self.pool = ConnectionPool(host=host, port=port, password=password, decode_responses=True)
+        self.redis = Redis(connection_pool=self.pool)
+
+    async def get_redis(self) -> AsyncGenerator[Redis, None]:
+        yield self.redis
+
+    async def close(self) -> None:
+        await self.pool.disconnect()
+
+
+redis_helper = RedisHelper(
+    host=settings.redis.host,
+    port=settings.redis.port,
+    password=settings.redis.password.get_secret_value(),
+)
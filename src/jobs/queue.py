@@ -0,0 +1,194 @@
+import inspect
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+import logging.config
+
+import orjson
+from pydantic import validate_call
+from redis.asyncio import Redis
+
+from src.core.config import settings
+from src.database.redis import redis_helper
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+JOB_STATUSES = ("scheduled", "queued", "running", "retrying", "done", "failed")
+
+# отложенные задачи, чей срок наступил, переносятся в свои очереди атомарно:
+# падение воркера посередине не теряет задачу и не ставит ее дважды
+MOVE_DUE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    local key = ARGV[3] .. 'job:' .. id
+    local queue = redis.call('HGET', key, 'queue')
+    if queue then
+        redis.call('HSET', key, 'status', 'queued', 'enqueued_at', ARGV[1])
+        redis.call('LPUSH', ARGV[3] .. 'queue:' .. queue, id)
+    end
+end
+return #ids
+"""
+
+
+def job_key(job_id: str) -> str:
+    return f"{settings.jobs.key_prefix}job:{job_id}"
+
+
+def queue_key(queue: str) -> str:
+    return f"{settings.jobs.key_prefix}queue:{queue}"
+
+
+def processing_key(queue: str) -> str:
+    return f"{settings.jobs.key_prefix}processing:{queue}"
+
+
+def claimed_key(queue: str) -> str:
+    # job_id -> время, когда воркер взял задачу из очереди (BLMOVE в processing)
+    return f"{settings.jobs.key_prefix}claimed:{queue}"
+
+
+def stats_key(queue: str) -> str:
+    return f"{settings.jobs.key_prefix}stats:{queue}"
+
+
+def scheduled_key() -> str:
+    return f"{settings.jobs.key_prefix}scheduled"
+
+
+@dataclass(frozen=True, slots=True)
+class JobFunction:
+    """Зарегистрированная задача: аргументы проверяются по аннотациям функции.
+
+    Аргументы хранятся в Redis как JSON, поэтому передаются только именованными
+    и только JSON-совместимых типов (UUID, datetime и т.п. сериализует orjson,
+    а при запуске validate_call приводит их обратно к аннотациям).
+    """
+    name: str
+    fn: Callable[..., Awaitable[Any]]
+    queue: str
+    max_retries: int
+    timeout: float
+    result_ttl: int
+
+    async def enqueue(self, *, delay: float = 0, owner: Optional[Any] = None, **kwargs) -> str:
+        """Поставить задачу в очередь (через delay секунд), вернуть ее id"""
+        inspect.signature(self.fn).bind(**kwargs)
+        return await enqueue(redis_helper.redis, self, kwargs, delay=delay, owner=owner)
+
+    async def run(self, kwargs: dict[str, Any]) -> Any:
+        return await validate_call(self.fn)(**kwargs)
+
+
+@dataclass(frozen=True, slots=True)
+class PeriodicJob:
+    job: JobFunction
+    interval: float
+
+
+JOBS: dict[str, JobFunction] = {}
+PERIODIC_JOBS: list[PeriodicJob] = []
+
+
+def job(queue: str = "default",
+        name: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        result_ttl: Optional[int] = None) -> Callable[[Callable[..., Awaitable[Any]]], JobFunction]:
+    """Зарегистрировать async-функцию как задачу очереди queue"""
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> JobFunction:
+        job_function = JobFunction(
+            name=name or f"{fn.__module__}.{fn.__qualname__}",
+            fn=fn,
+            queue=queue,
+            max_retries=settings.jobs.default_max_retries if max_retries is None else max_retries,
+            timeout=timeout or settings.jobs.default_timeout,
+            result_ttl=result_ttl or settings.jobs.result_ttl)
+        if job_function.name in JOBS:
+            raise ValueError(f"Задача {job_function.name} уже зарегистрирована")
+        JOBS[job_function.name] = job_function
+        return job_function
+
+    return decorator
+
+
+def periodic(interval: float, enabled: bool = True, queue: str = "maintenance", **job_options):
+    """Задача без аргументов, которую воркеры ставят не чаще раза в interval секунд на весь кластер"""
+
+    def decorator(fn: Callable[[], Awaitable[Any]]) -> JobFunction:
+        # результаты частых задач не копятся в Redis: хранятся несколько интервалов
+        job_options.setdefault("result_ttl", max(int(interval * 10), 60))
+        job_function = job(queue=queue, max_retries=0, **job_options)(fn)
+        if enabled:
+            PERIODIC_JOBS.append(PeriodicJob(job=job_function, interval=interval))
+        return job_function
+
+    return decorator
+
+
+async def enqueue(redis: Redis,
+                  job_function: JobFunction,
+                  kwargs: dict[str, Any],
+                  delay: float = 0,
+                  owner: Optional[Any] = None) -> str:
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    fields = {"name": job_function.name,
+              "queue": job_function.queue,
+              "args": orjson.dumps(kwargs),
+              "status": "scheduled" if delay > 0 else "queued",
+              "attempts": 0,
+              "created_at": now,
+              "enqueued_at": now + delay}
+    if owner is not None:
+        fields["owner"] = str(owner)
+    pipe = redis.pipeline(transaction=True)
+    pipe.hset(job_key(job_id), mapping=fields)
+    if delay > 0:
+        pipe.zadd(scheduled_key(), {job_id: now + delay})
+    else:
+        pipe.lpush(queue_key(job_function.queue), job_id)
+    await pipe.execute()
+    log.debug(f"Задача {job_function.name} ({job_id}) поставлена в {job_function.queue}, delay={delay}")
+    return job_id
+
+
+async def get_job(redis: Redis, job_id: str) -> Optional[dict[str, str]]:
+    fields = await redis.hgetall(job_key(job_id))
+    return fields or None
+
+
+async def get_queue_metrics(redis: Redis) -> dict[str, Any]:
+    """Глубина очередей, выполняемые задачи и задержки по накопленным счетчикам"""
+    now = time.time()
+    queues = []
+    for queue in settings.jobs.queues:
+        pipe = redis.pipeline(transaction=False)
+        pipe.llen(queue_key(queue))
+        pipe.llen(processing_key(queue))
+        # LPUSH добавляет слева, BLMOVE забирает справа: справа самая старая задача
+        pipe.lindex(queue_key(queue), -1)
+        pipe.hgetall(stats_key(queue))
+        queued, running, oldest_id, stats = await pipe.execute()
+        oldest_age = None
+        if oldest_id is not None:
+            enqueued_at = await redis.hget(job_key(oldest_id), "enqueued_at")
+            if enqueued_at is not None:
+                oldest_age = max(now - float(enqueued_at), 0.0)
+        started = int(stats.get("started", 0))
+        finished = int(stats.get("done", 0)) + int(stats.get("failed", 0)) + int(stats.get("retried", 0))
+        queues.append({"queue": queue,
+                       "queued": queued,
+                       "running": running,
+                       "oldest_queued_age_seconds": oldest_age,
+                       "done": int(stats.get("done", 0)),
+                       "failed": int(stats.get("failed", 0)),
+                       "retried": int(stats.get("retried", 0)),
+                       "avg_wait_ms": float(stats["wait_ms"]) / started if started else None,
+                       "avg_run_ms": float(stats["run_ms"]) / finished if finished else None})
+    return {"scheduled": await redis.zcard(scheduled_key()), "queues": queues}
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import socket
+import time
+import traceback
+from typing import Any, Optional
+import logging.config
+
+import orjson
+from redis.asyncio import Redis
+
+from src.core.config import settings
+from src.jobs.queue import (JOBS, PERIODIC_JOBS, MOVE_DUE_SCRIPT, JobFunction, claimed_key, enqueue, job_key,
+                            queue_key, processing_key, scheduled_key, stats_key)
+from src.utils.periodic import run_periodic
+from src.utils.streams import CONSUMER_GROUPS, StreamConsumer, stream_name
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+# задача в processing дольше timeout + REAP_GRACE секунд - ее воркер упал
+REAP_GRACE = 30
+MOVE_DUE_LIMIT = 100
+
+
+class Worker:
+    """Выполняет задачи очередей settings.jobs.queues.
+
+    На каждую очередь запускается столько читателей, сколько задано в настройках:
+    так ограничивается число одновременных задач очереди в воркере. Взятая задача
+    атомарно (BLMOVE) переходит в список processing и убирается из него только
+    после записи результата, поэтому задачи упавшего воркера не теряются.
+    Кроме очередей воркер читает потоки событий outbox группами, зарегистрированными
+    через consumer_group.
+    """
+
+    def __init__(self, redis: Redis, queues: Optional[dict[str, int]] = None) -> None:
+        self.redis = redis
+        self.queues = queues or settings.jobs.queues
+        self.move_due = redis.register_script(MOVE_DUE_SCRIPT)
+
+    async def _finish(self, job_id: str, job_function: Optional[JobFunction], queue: str,
+                      attempts: int, started: float, error: Optional[str] = None, result: Any = None) -> None:
+        now = time.time()
+        fields: dict[str, Any] = {"finished_at": now}
+        pipe = self.redis.pipeline(transaction=True)
+        max_retries = job_function.max_retries if job_function is not None else 0
+        if error is None:
+            fields.update(status="done", result=orjson.dumps(result, default=str))
+            pipe.hincrby(stats_key(queue), "done")
+        elif attempts <= max_retries:
+            retry_at = now + settings.jobs.backoff_base ** attempts
+            fields.update(status="retrying", error=error, enqueued_at=retry_at)
+            pipe.zadd(scheduled_key(), {job_id: retry_at})
+            pipe.hincrby(stats_key(queue), "retried")
+        else:
+            fields.update(status="failed", error=error)
+            pipe.hincrby(stats_key(queue), "failed")
+        pipe.hset(job_key(job_id), mapping=fields)
+        if fields["status"] != "retrying":
+            pipe.expire(job_key(job_id), job_function.result_ttl if job_function else settings.jobs.result_ttl)
+        pipe.hincrbyfloat(stats_key(queue), "run_ms", (now - started) * 1000)
+        pipe.lrem(processing_key(queue), 1, job_id)
+        pipe.hdel(claimed_key(queue), job_id)
+        await pipe.execute()
+
+    async def _execute(self, queue: str, job_id: str) -> None:
+        started = time.time()
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hgetall(job_key(job_id))
+        pipe.hset(job_key(job_id), mapping={"status": "running", "started_at": started})
+        pipe.hincrby(job_key(job_id), "attempts")
+        fields, _, attempts = await pipe.execute()
+        if "enqueued_at" in fields:
+            await self.redis.hincrbyfloat(stats_key(queue), "wait_ms",
+                                          max(started - float(fields["enqueued_at"]), 0) * 1000)
+        await self.redis.hincrby(stats_key(queue), "started")
+
+        job_function = JOBS.get(fields.get("name"))
+        if job_function is None:
+            log.error(f"Задача {job_id}: неизвестная функция {fields.get('name')}")
+            await self._finish(job_id, None, queue, attempts, started, error="unknown job")
+            return
+        try:
+            result = await asyncio.wait_for(job_function.run(orjson.loads(fields["args"])),
+                                            timeout=job_function.timeout)
+        except asyncio.CancelledError:
+            # остановка воркера: задача остается в processing и вернется в очередь после таймаута
+            raise
+        except Exception as error:
+            log.exception(f"Задача {job_function.name} ({job_id}), попытка {attempts}: {error!r}")
+            await self._finish(job_id, job_function, queue, attempts, started,
+                               error="".join(traceback.format_exception_only(error)).strip())
+            return
+        await self._finish(job_id, job_function, queue, attempts, started, result=result)
+        log.debug(f"Задача {job_function.name} ({job_id}) выполнена за {time.time() - started:.3f} c")
+
+    async def consume(self, queue: str) -> None:
+        while True:
+            try:
+                job_id = await self.redis.blmove(queue_key(queue), processing_key(queue),
+                                                 settings.jobs.block_timeout, "RIGHT", "LEFT")
+                if job_id is not None:
+                    await self.redis.hset(claimed_key(queue), job_id, time.time())
+                    await self._execute(queue, job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                log.exception(f"Ошибка чтения очереди {queue}: {error}")
+                await asyncio.sleep(1)
+
+    async def _reap(self, queue: str) -> None:
+        """Вернуть в работу задачи, зависшие в processing упавшего воркера.
+
+        Отсчет идет от времени, когда задачу взяли из очереди, а не от started_at:
+        воркер может упасть раньше, чем отметит начало, а started_at прошлой попытки устарел.
+        """
+        now = time.time()
+        for job_id in await self.redis.lrange(processing_key(queue), 0, -1):
+            claimed_at = await self.redis.hget(claimed_key(queue), job_id)
+            if claimed_at is None:
+                # воркер упал между BLMOVE и отметкой: отсчет от первого обхода, заметившего задачу
+                await self.redis.hsetnx(claimed_key(queue), job_id, now)
+                continue
+            name, attempts = await self.redis.hmget(job_key(job_id), "name", "attempts")
+            job_function = JOBS.get(name)
+            timeout = job_function.timeout if job_function is not None else settings.jobs.default_timeout
+            if now - float(claimed_at) < timeout + REAP_GRACE:
+                continue
+            # LREM вернет 1 только одному из воркеров, остальные задачу пропустят
+            if await self.redis.lrem(processing_key(queue), 1, job_id):
+                await self._finish(job_id, job_function, queue, int(attempts or 1), float(claimed_at),
+                                   error="worker lost")
+
+    async def tick(self) -> None:
+        now = time.time()
+        moved = await self.move_due(keys=[scheduled_key()],
+                                    args=[now, MOVE_DUE_LIMIT, settings.jobs.key_prefix])
+        if moved:
+            log.debug(f"Отложенных задач перенесено в очереди: {moved}")
+        for periodic_job in PERIODIC_JOBS:
+            # одна постановка за интервал на все воркеры
+            if await self.redis.set(f"{settings.jobs.key_prefix}periodic:{periodic_job.job.name}", now,
+                                    nx=True, px=int(periodic_job.interval * 1000)):
+                await enqueue(self.redis, periodic_job.job, {})
+        for queue in self.queues:
+            await self._reap(queue)
+
+    def _stream_consumers(self) -> list[StreamConsumer]:
+        # имя уникально для процесса: сообщения упавшего воркера заберут другие (XAUTOCLAIM)
+        consumer = f"{socket.gethostname()}-{os.getpid()}"
+        return [StreamConsumer(self.redis, stream_name(group.topic), group.group, consumer, group.handler,
+                               batch_size=settings.outbox.batch_size,
+                               claim_idle_ms=settings.outbox.claim_idle_ms,
+                               start_id=group.start_id)
+                for group in CONSUMER_GROUPS]
+
+    async def run(self) -> None:
+        log.info(f"Воркер задач: очереди {self.queues}, зарегистрировано задач {len(JOBS)}, "
+                 f"периодических {len(PERIODIC_JOBS)}, групп потребителей событий {len(CONSUMER_GROUPS)}")
+        tasks = [asyncio.create_task(run_periodic("jobs_scheduler", settings.jobs.poll_interval, self.tick))]
+        for queue, concurrency in self.queues.items():
+            tasks.extend(asyncio.create_task(self.consume(queue)) for _ in range(concurrency))
+        tasks.extend(asyncio.create_task(consumer.run()) for consumer in self._stream_consumers())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from uuid import UUID
 
 from pydantic import BaseModel
 
@@ -12,9 +13,9 @@ class CommentUpdate(BaseModel):
 
 
 class CommentResponse(BaseModel):
-    id: int
+    id: UUID
     text: str
-    created: datetime
+    created_at: datetime
 
     class Config:
         from_attributes = True
\ No newline at end of file
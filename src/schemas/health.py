@@ -0,0 +1,22 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class HealthStatus(str, Enum):
+    alive = "alive"
+    ready = "ready"
+    warming_up = "warming_up"
+
+
+class WarmupReport(BaseModel):
+    duration_ms: float
+    # шаг прогрева -> длительность, мс
+    steps: dict[str, float]
+    attempts: int
+
+
+class HealthResponse(BaseModel):
+    status: HealthStatus
+    warmup: Optional[WarmupReport] = None
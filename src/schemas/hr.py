@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class HrDashboardResponse(BaseModel):
+    hr_id: UUID
+    active_vacansies: int
+    total_vacansies: int
+    comments_count: int
+    last_vacansy_at: Optional[datetime] = None
+    last_comment_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
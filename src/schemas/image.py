@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class ImageResponse(BaseModel):
+    digest: str
+    urls: dict[str, str]
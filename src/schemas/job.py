@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class JobAcceptedResponse(BaseModel):
+    job_id: str
+
+
+class JobStatusResponse(BaseModel):
+    id: str
+    name: str
+    queue: str
+    status: str
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class QueueMetrics(BaseModel):
+    queue: str
+    queued: int
+    running: int
+    oldest_queued_age_seconds: Optional[float] = None
+    done: int
+    failed: int
+    retried: int
+    avg_wait_ms: Optional[float] = None
+    avg_run_ms: Optional[float] = None
+
+
+class JobMetricsResponse(BaseModel):
+    scheduled: int
+    queues: list[QueueMetrics]
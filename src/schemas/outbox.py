@@ -0,0 +1,21 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class StreamGroupLag(BaseModel):
+    name: str
+    pending: int
+    lag: Optional[int] = None
+
+
+class StreamLag(BaseModel):
+    stream: str
+    length: int
+    groups: list[StreamGroupLag]
+
+
+class OutboxLagResponse(BaseModel):
+    backlog: int
+    oldest_age_seconds: Optional[float] = None
+    streams: list[StreamLag]
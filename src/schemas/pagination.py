@@ -0,0 +1,19 @@
+from typing import Generic, Optional, TypeVar
+
+from fastapi_pagination import LimitOffsetPage
+from pydantic import BaseModel
+from fastapi_pagination.types import GreaterEqualZero
+
+T = TypeVar("T")
+
+
+class LimitOffsetTotalPage(LimitOffsetPage[T], Generic[T]):
+    """Страница, у которой total может отсутствовать (TotalMode.none) или быть оценкой"""
+    total: Optional[GreaterEqualZero] = None
+    has_next: Optional[bool] = None
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Страница курсорной пагинации: next_cursor передается в следующий запрос"""
+    items: list[T]
+    next_cursor: Optional[str] = None
@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from pydantic import BaseModel, Field
 
 
@@ -13,7 +15,7 @@ class ResumeCreate(BaseModel):
 
 
 class ResumeResponse(BaseModel):
-    id: int
+    id: UUID
     first_name: str
     last_name: str
     middle_name: str
@@ -21,6 +23,7 @@ class ResumeResponse(BaseModel):
     experience: str
     education: str
     about: str | None
+    image: str | None = None
 
     class Config:
         from_attributes = True
@@ -34,4 +37,9 @@ class ResumeUpdate(BaseModel):
     experience: str | None
     education: str | None
     about: str | None = None
-    image: str | None = None
\ No newline at end of file
+    image: str | None = None
+
+
+class ResumeMatch(BaseModel):
+    resume_id: UUID
+    score: float
@@ -1,17 +1,29 @@
 from uuid import UUID
+from enum import Enum
+from typing import Optional
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+
+from src.utils.permissions import PermissionName, to_names
 
 
 class ResponseRole(BaseModel):
     id: UUID
     name: str
+    permissions: list[PermissionName] = []
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("permissions", mode="before")
+    @classmethod
+    def permissions_from_mask(cls, value):
+        return to_names(value) if isinstance(value, int) else value
+
 
 class RequestRole(BaseModel):
     name: str = Field()
+    # None при обновлении - права роли не меняются
+    permissions: Optional[list[PermissionName]] = Field(None)
 
 
 class RequestNewRoleToUser(BaseModel):
@@ -19,6 +31,32 @@ class RequestNewRoleToUser(BaseModel):
     role_id: UUID = Field()
 
 
+class RequestRolesToUsers(BaseModel):
+    pairs: list[RequestNewRoleToUser] = Field(min_length=1, max_length=10_000)
+
+
+class BulkRoleStatus(str, Enum):
+    assigned = "assigned"
+    revoked = "revoked"
+    # назначение уже было / отзывать нечего
+    exists = "exists"
+    not_assigned = "not_assigned"
+    user_not_found = "user_not_found"
+    role_not_found = "role_not_found"
+
+
+class BulkRoleResult(BaseModel):
+    user_id: UUID
+    role_id: UUID
+    status: BulkRoleStatus
+
+
+class ResponseBulkRoles(BaseModel):
+    # по одному результату на каждую различную пару запроса, в порядке запроса
+    results: list[BulkRoleResult]
+    counts: dict[str, int]
+
+
 # class UUIDMixIn(BaseModel):
 #     id: UUID = Field(..., alias="uuid")
 
@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class SavedSearchResponse(BaseModel):
+    id: UUID
+    name: str
+    filters: dict[str, Any]
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -9,6 +9,7 @@ class TokenType(str, Enum):
     refresh = "refresh"
 
 class TokenPayloadsBase(BaseModel):
+    sub: str
     email: EmailStr
     role: list[str]
     exp: datetime
@@ -19,7 +20,9 @@ class TokenPayloadsBase(BaseModel):
         return delta.seconds
     
 class AccessTokenPayload(TokenPayloadsBase):
-    pass
+    # объединение масок прав ролей и версия раскладки битов, см. src.utils.permissions
+    perms: int = 0
+    pv: int = 0
 
 class RefreshTokenPayload(TokenPayloadsBase):
     session_id: str
\ No newline at end of file
@@ -1,9 +1,15 @@
 from datetime import datetime
+from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from .comment import CommentResponse
+from .pagination import LimitOffsetTotalPage
+
+T = TypeVar("T")
 
 class VacansyCreate(BaseModel):
     place_of_work: str
@@ -57,3 +63,80 @@ class VacansyUpdate(BaseModel):
     working_conditions: str | None
     required_experience: str | None
     vacant: str | None
+
+
+class VacansyShortResponse(BaseModel):
+    id: UUID
+    place_of_work: str
+    required_specialt: str
+    proposed_salary: str
+    salary_min: int | None = None
+    salary_max: int | None = None
+    currency: str | None = None
+    working_conditions: str
+    required_experience: str
+    comments_count: int = 0
+    created: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CommentsProjection(str, Enum):
+    """Какие комментарии отдавать вместе с вакансией"""
+    none = "none"
+    latest = "latest"
+    all = "all"
+
+
+class VacansyDetailResponse(VacansyShortResponse):
+    about_the_company: str
+    comments: list[CommentResponse] | None = None
+
+
+class VacansyImportRow(BaseModel):
+    """Строка файла массовой загрузки; длины совпадают с колонками таблицы vacansy"""
+    place_of_work: str = Field(min_length=1, max_length=250)
+    about_the_company: str = Field(max_length=3000)
+    required_specialt: str = Field(min_length=1, max_length=500)
+    proposed_salary: str = Field(max_length=120)
+    working_conditions: str = Field(max_length=250)
+    required_experience: str = Field(max_length=250)
+
+    @field_validator("*")
+    @classmethod
+    def no_nul(cls, value: str) -> str:
+        # PostgreSQL не хранит \x00 в text, COPY падает на всей пачке
+        if "\x00" in value:
+            raise ValueError("Строка содержит нулевой символ")
+        return value
+
+
+class VacansyImportRowError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class VacansyImportProgress(BaseModel):
+    id: UUID
+    status: str
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class VacansyImportReport(VacansyImportProgress):
+    elapsed: float
+    rows_per_second: float
+    errors: list[VacansyImportRowError] = Field(default_factory=list)
+    errors_truncated: bool = False
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class VacansySearchPage(LimitOffsetTotalPage[T], Generic[T]):
+    facets: dict[str, list[FacetCount]] = Field(default_factory=dict)
@@ -1,5 +1,6 @@
 from abc import ABCMeta, abstractmethod
 import logging.config
+import uuid
 import bcrypt
 from functools import lru_cache
 
@@ -10,9 +11,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.token import TokenDBBase, get_token_db
 from src.database.models import User as DBUser, Entry as DBEntry
 from src.schemas import user as user_schema
-from src.crud import user as user_dal, role as role_dal, entry as entry_dal
-from src.utils.token_manager import TokenManagerBase, get_token_manager
+from src.crud import user as user_dal, role as role_dal, entry as entry_dal, user_purge as user_purge_dal
+from src.utils.token_manager import TokenManager, TokenManagerBase, get_token_manager
+from src.utils.pagination import TotalMode
+from src.utils.permissions import PERMISSIONS_VERSION, combine
 from src.database.session import db_helper
+from src.jobs.queue import job
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
@@ -47,8 +51,12 @@ class AuthServiceBase(metaclass=ABCMeta):
         """Сбросьте токены доступа и обновите. Закрытие сессии"""
 
     @abstractmethod
-    async def logout_all(self, access_token: str) -> None:
-        """Закрытие сесси всех активных пользователей"""
+    async def logout_all(self, access_token: str) -> str:
+        """Отозвать токен доступа и поставить закрытие всех сессий пользователя в очередь, вернуть id задачи"""
+
+    @abstractmethod
+    async def close_all_sessions(self, user_id: uuid.UUID) -> int:
+        """Закрыть все активные сессии пользователя"""
 
     @abstractmethod
     async def refresh_tokens(self, refresh_token: str, user_agent: str) -> tuple[str, str]:
@@ -72,12 +80,13 @@ class AuthServiceBase(metaclass=ABCMeta):
         """Изменение пароля пользователя"""
 
     @abstractmethod
-    async def entry_history(self, access_token: str, unique: bool) -> list[DBEntry]:
+    async def entry_history(self, access_token: str, unique: bool,
+                            total_mode: TotalMode = TotalMode.exact) -> list[DBEntry]:
         """Получить историю входа пользователя в систему"""
 
     @abstractmethod
-    async def deactivate_user(self, acces_token: str) -> None:
-        """Деактивация пользователя"""
+    async def deactivate_user(self, acces_token: str) -> str:
+        """Деактивация пользователя, вернуть id задачи закрытия его сессий"""
 
 
 class AuthService(AuthServiceBase, HashManagerBase):
@@ -127,7 +136,11 @@ class AuthService(AuthServiceBase, HashManagerBase):
         token_payload = {
             "sub": str(user.id),
             "email": user.email,
-            "role": [str(role.id) for role in roles] if roles else ["пользователь"]
+            "role": [str(role.id) for role in roles] if roles else ["пользователь"],
+            # права читаются из БД при каждой выдаче токенов: изменение роли доходит
+            # до пользователя не позже, чем истечет выданный до него access token
+            "perms": combine(role.permissions for role in roles or ()),
+            "pv": PERMISSIONS_VERSION
         }
         access_token = await self.token_manager.generate_access_token(token_payload)
         token_payload.update({"session_id": str(entry.id)})
@@ -208,16 +221,19 @@ class AuthService(AuthServiceBase, HashManagerBase):
         else:
             await self._close_session(refresh_token)
 
-    async def logout_all(self, access_token: str) -> None:
-        entry_crud = entry_dal.EntryDAL(self.user_db_session)
-        access_token_data = self.token_manager.get_data_from_access_token(
-            access_token)
+    async def logout_all(self, access_token: str) -> str:
+        access_token_data = await self.token_manager.get_data_from_access_token(access_token)
         user_id = access_token_data.sub
+        # текущий токен отзывается сразу, остальные сессии закрывает воркер
         await self.token_db.put(access_token, user_id, access_token_data.left_time)
-        active_sessions = await entry_crud.get_by_user_id_list(user_id, only_active=True)
-        for session in active_sessions:
-            if session.refresh_token:
-                await self._close_session(session.refresh_token)
+        return await close_user_sessions.enqueue(user_id=user_id, owner=user_id)
+
+    async def close_all_sessions(self, user_id: uuid.UUID) -> int:
+        entry_crud = entry_dal.EntryDAL(self.user_db_session)
+        refresh_tokens = await entry_crud.get_active_refresh_tokens(user_id)
+        for refresh_token in refresh_tokens:
+            await self._close_session(refresh_token)
+        return len(refresh_tokens)
 
     async def get_user_role(self, access_token: str) -> list[str] | str:
         token_data = await self.token_manager.get_data_from_access_token(access_token)
@@ -226,11 +242,10 @@ class AuthService(AuthServiceBase, HashManagerBase):
     async def entry_history(self,
                             access_token: str,
                             unique: bool,
-                            page_size: int,
-                            page_number: int) -> list[DBEntry]:
+                            total_mode: TotalMode = TotalMode.exact) -> list[DBEntry]:
         entry_crud = entry_dal.EntryDAL(self.user_db_session)
         token_data = await self.token_manager.get_data_from_access_token(access_token)
-        entry_history = await entry_crud.get_by_user_id_list(token_data.sub, unique)
+        entry_history = await entry_crud.get_by_user_id_list(token_data.sub, unique, total_mode=total_mode)
         return entry_history
 
     async def get_user_data(self, access_token: str) -> DBUser:
@@ -273,16 +288,27 @@ class AuthService(AuthServiceBase, HashManagerBase):
         # записать сессию в БД
         session = await entry_crud.create(user.id, user_agent, None)
         log.info('Генерация нового токена')
-        access_token, refresh_token = await self._generate_tokens(user, session)
+        access_token, refresh_token = await self._generate_tokens(user, session, self.user_db_session)
         # записать токен в БД
         await entry_crud.update(session.id, refresh_token=refresh_token)
         return access_token, refresh_token
 
-    async def deactivate_user(self, acces_token: str) -> None:
-        user_crud = user_dal.UserDAL(self.user_db_session)
+    async def deactivate_user(self, acces_token: str) -> str:
         token_data = await self.token_manager.get_data_from_access_token(acces_token)
-        await self.logout_all(acces_token)
-        await user_crud.delete(token_data.sub)
+        job_id = await self.logout_all(acces_token)
+        # связанные строки удаляет фоновая очистка пачками (src.services.user_purge), а не каскад
+        # в одной транзакции; запись очистки создается тем же запросом, что деактивирует пользователя
+        await user_purge_dal.UserPurgeDAL(self.user_db_session).deactivate(token_data.sub)
+        return job_id
+
+
+@job(name="close_user_sessions")
+async def close_user_sessions(user_id: uuid.UUID) -> int:
+    """Задача очереди: повтор безопасен, уже закрытые сессии не активны и не выбираются"""
+    token_db = await get_token_db()
+    async with db_helper.async_session() as session:
+        auth_service = AuthService(token_db, TokenManager(token_db), session)
+        return await auth_service.close_all_sessions(user_id)
 
 
 @lru_cache
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+import logging.config
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.vacansy_facet import VacansyFacetDAL
+from src.core.config import settings
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+FACETS = ("place_of_work", "required_specialt", "required_experience")
+
+
+@dataclass(frozen=True)
+class FacetSnapshot:
+    """Неизменяемый снимок счетчиков: facet -> ((value, count), ...) по убыванию count"""
+    facets: Mapping[str, tuple[tuple[str, int], ...]] = field(
+        default_factory=lambda: MappingProxyType({facet: () for facet in FACETS}))
+    loaded_at: float = 0.0
+
+    def is_stale(self, ttl: float) -> bool:
+        return time.monotonic() - self.loaded_at > ttl
+
+
+class FacetStore:
+    """Снимок фасетов в памяти процесса, обновляется из Postgres не чаще раза в ttl"""
+
+    def __init__(self, ttl: float, top_values: int) -> None:
+        self.ttl = ttl
+        self.top_values = top_values
+        self.snapshot = FacetSnapshot()
+        self._lock = asyncio.Lock()
+
+    async def get(self, session: AsyncSession) -> FacetSnapshot:
+        if not self.snapshot.is_stale(self.ttl):
+            return self.snapshot
+        async with self._lock:
+            # пока ждали блокировку, снимок мог обновить другой запрос
+            if self.snapshot.is_stale(self.ttl):
+                await self._reload(session)
+        return self.snapshot
+
+    async def _reload(self, session: AsyncSession) -> None:
+        rows = await VacansyFacetDAL(session).get_top(self.top_values)
+        if rows is None:
+            # при ошибке БД отдаем старый снимок, чтобы поиск продолжал работать
+            log.error("Не удалось обновить снимок фасетов, используется предыдущий")
+            return
+        facets: dict[str, list[tuple[str, int]]] = {facet: [] for facet in FACETS}
+        for facet, value, count in rows:
+            facets.setdefault(facet, []).append((value, count))
+        self.snapshot = FacetSnapshot(
+            facets=MappingProxyType({facet: tuple(values) for facet, values in facets.items()}),
+            loaded_at=time.monotonic())
+        log.debug(f"Снимок фасетов обновлен: {len(rows)} значений")
+
+
+facet_store = FacetStore(ttl=settings.facet.snapshot_ttl,
+                         top_values=settings.facet.top_values)
@@ -0,0 +1,91 @@
+import time
+import uuid
+from abc import ABC, abstractmethod
+from functools import lru_cache
+import logging.config
+
+from fastapi import status, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.hr_stats import HrStatsDAL
+from src.core.config import settings
+from src.database.redis import redis_helper
+from src.database.session import db_helper
+from src.jobs.queue import periodic
+from src.schemas.hr import HrDashboardResponse
+from src.utils.periodic import acquire_lock, release_lock
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+class HrStatsServiceBase(ABC):
+
+    @abstractmethod
+    async def get_dashboard(self, hr_id: uuid.UUID, user_id: uuid.UUID) -> HrDashboardResponse:
+        """Агрегаты по вакансиям HR для его панели"""
+
+    @abstractmethod
+    async def reconcile(self) -> int:
+        """Сверить агрегаты всех HR с вакансиями и комментариями, вернуть число исправленных"""
+
+
+class HrStatsService(HrStatsServiceBase):
+    def __init__(self, db_session: AsyncSession):
+        log.info("Инициализация hr stats service")
+        self.db_session = db_session
+
+    async def get_dashboard(self, hr_id: uuid.UUID, user_id: uuid.UUID) -> HrDashboardResponse:
+        async with self.db_session as session:
+            stats = await HrStatsDAL(session).get(hr_id, user_id)
+        if stats is None:
+            log.error(f"{status.HTTP_404_NOT_FOUND}: HR {hr_id} пользователя {user_id} не найден")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="HR не найден"
+            )
+        return HrDashboardResponse.model_validate(stats)
+
+    async def reconcile(self) -> int:
+        started = time.perf_counter()
+        fixed_total = 0
+        async with self.db_session as session:
+            stats_crud = HrStatsDAL(session)
+            after = None
+            while True:
+                # каждая пачка - своя короткая транзакция, блокировки строк hr_stats не копятся
+                after, fixed = await stats_crud.reconcile_batch(after, settings.hr_stats.reconcile_batch_size)
+                fixed_total += fixed
+                if after is None:
+                    break
+        log_msg = f"Сверка hr_stats: исправлено {fixed_total} строк за {time.perf_counter() - started:.2f} c"
+        if fixed_total:
+            # триггеры держат счетчики точными, расхождение - повод разобраться
+            log.warning(log_msg)
+        else:
+            log.info(log_msg)
+        return fixed_total
+
+
+@periodic(settings.hr_stats.reconcile_interval, enabled=settings.hr_stats.reconcile_enabled, name="hr_stats",
+          timeout=settings.hr_stats.reconcile_interval)
+async def run_hr_stats_job() -> None:
+    """Один проход сверки; на всех воркерах выполняется только одним"""
+    redis = redis_helper.redis
+    lock_ttl = int(settings.hr_stats.reconcile_interval)
+    token = await acquire_lock(redis, "hr_stats", lock_ttl)
+    if token is None:
+        return
+    try:
+        async with db_helper.async_session() as session:
+            await HrStatsService(session).reconcile()
+    finally:
+        await release_lock(redis, "hr_stats", token)
+
+
+@lru_cache
+def get_hr_stats_service(db_session: AsyncSession = Depends(db_helper.get_async_session)) -> HrStatsService:
+    log_msg = f'{db_session=}'
+    log.debug(log_msg)
+    return HrStatsService(db_session=db_session)
@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import uuid
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Optional
+import logging.config
+
+from fastapi import status, HTTPException, Depends
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.resume import ResumeDAL
+from src.core.config import settings
+from src.database.session import db_helper
+from src.schemas.image import ImageResponse
+from src.utils.image import DIGEST_RE, ImageError, ImageStore, ImageWorkerPool, image_file_response
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+image_store = ImageStore(settings.image.path)
+image_pool = ImageWorkerPool(settings.image.workers)
+
+
+def image_urls(digest: str) -> dict[str, str]:
+    return {size: f"/images/{digest}/{size}" for size in settings.image.sizes}
+
+
+class ImageServiceBase(ABC):
+
+    @abstractmethod
+    async def upload_resume_image(self, resume_id: uuid.UUID, user_id: uuid.UUID, data: bytes) -> ImageResponse:
+        """Обработать изображение и привязать его к резюме"""
+
+    @abstractmethod
+    async def get_image(self,
+                        digest: str,
+                        size: str,
+                        range_header: Optional[str],
+                        if_none_match: Optional[str]) -> Response:
+        """Ответ с файлом изображения нужного размера"""
+
+
+class ImageService(ImageServiceBase):
+    def __init__(self, db_session: AsyncSession, store: ImageStore, pool: ImageWorkerPool):
+        log.info("Инициализация image service")
+        self.db_session = db_session
+        self.store = store
+        self.pool = pool
+
+    async def upload_resume_image(self, resume_id: uuid.UUID, user_id: uuid.UUID, data: bytes) -> ImageResponse:
+        if len(data) > settings.image.max_upload_size:
+            log.error(f"{status.HTTP_413_REQUEST_ENTITY_TOO_LARGE}: Изображение {len(data)} байт")
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Слишком большой файл"
+            )
+        # hashlib отпускает GIL на больших буферах
+        digest = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+        if not self.store.exists(digest, settings.image.sizes):
+            try:
+                variants = await self.pool.process(data, settings.image.sizes,
+                                                   settings.image.quality, settings.image.max_pixels)
+            except ImageError as error:
+                log.error(f"{status.HTTP_422_UNPROCESSABLE_ENTITY}: Не удалось декодировать изображение {error}")
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Файл не является изображением"
+                )
+            await asyncio.to_thread(self.store.save, digest, variants)
+
+        async with self.db_session as session:
+            updated = await ResumeDAL(session).update(resume_id, user_id, {"image": digest})
+        if updated is None:
+            log.error(f"{status.HTTP_404_NOT_FOUND}: Резюме {resume_id} не найдено")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Резюме не найдено"
+            )
+        return ImageResponse(digest=digest, urls=image_urls(digest))
+
+    async def get_image(self,
+                        digest: str,
+                        size: str,
+                        range_header: Optional[str],
+                        if_none_match: Optional[str]) -> Response:
+        path = self.store.path(digest, size) if DIGEST_RE.match(digest) else None
+        if size not in settings.image.sizes or path is None or not path.exists():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Изображение не найдено"
+            )
+        # содержимое определяется адресом, поэтому ETag строгий и без обращения к файлу
+        etag = f'"{digest}-{size}"'
+        return await image_file_response(path, self.store.relative_path(digest, size), etag,
+                                         range_header, if_none_match, settings.image.accel_redirect_prefix)
+
+
+@lru_cache
+def get_image_service(db_session: AsyncSession = Depends(db_helper.get_async_session)) -> ImageService:
+    log_msg = f'{db_session=}'
+    log.debug(log_msg)
+    return ImageService(db_session=db_session, store=image_store, pool=image_pool)
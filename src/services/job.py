@@ -0,0 +1,64 @@
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from functools import lru_cache
+import logging.config
+
+from fastapi import status, HTTPException, Depends
+from redis.asyncio import Redis
+
+from src.database.redis import redis_helper
+from src.jobs.queue import get_job, get_queue_metrics
+from src.schemas.job import JobMetricsResponse, JobStatusResponse
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+def _timestamp(value: str | None) -> datetime | None:
+    return datetime.fromtimestamp(float(value), tz=timezone.utc) if value is not None else None
+
+
+class JobServiceBase(ABC):
+
+    @abstractmethod
+    async def get_status(self, job_id: str, user_id: uuid.UUID) -> JobStatusResponse:
+        """Состояние задачи, поставленной пользователем"""
+
+    @abstractmethod
+    async def get_metrics(self) -> JobMetricsResponse:
+        """Глубина очередей задач и задержки выполнения"""
+
+
+class JobService(JobServiceBase):
+    def __init__(self, redis: Redis):
+        log.info("Инициализация job service")
+        self.redis = redis
+
+    async def get_status(self, job_id: str, user_id: uuid.UUID) -> JobStatusResponse:
+        fields = await get_job(self.redis, job_id)
+        # чужая задача неотличима от несуществующей
+        if fields is None or fields.get("owner") != str(user_id):
+            log.error(f"{status.HTTP_404_NOT_FOUND}: Задача {job_id} пользователя {user_id} не найдена")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Задача не найдена"
+            )
+        return JobStatusResponse(id=job_id,
+                                 name=fields["name"],
+                                 queue=fields["queue"],
+                                 status=fields["status"],
+                                 attempts=int(fields.get("attempts", 0)),
+                                 created_at=_timestamp(fields["created_at"]),
+                                 started_at=_timestamp(fields.get("started_at")),
+                                 finished_at=_timestamp(fields.get("finished_at")),
+                                 error=fields.get("error"))
+
+    async def get_metrics(self) -> JobMetricsResponse:
+        return JobMetricsResponse.model_validate(await get_queue_metrics(self.redis))
+
+
+@lru_cache
+def get_job_service() -> JobService:
+    return JobService(redis=redis_helper.redis)
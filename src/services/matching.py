@@ -0,0 +1,155 @@
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+import logging.config
+
+from fastapi import status, HTTPException, Depends
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.resume import ResumeDAL
+from src.crud.vacansy import VacansyDAL
+from src.core.config import settings
+from src.database.redis import redis_helper
+from src.database.session import db_helper
+from src.schemas.resume import ResumeMatch
+from src.utils.matching import ResumeMatrix
+from src.utils.streams import StreamConsumer, stream_name
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+# группа и потребитель событий resume: матрицу пишет одна задача под блокировкой
+RESUME_EVENTS_GROUP = "matching"
+
+
+@lru_cache
+def get_resume_matrix(read_only: bool = True) -> ResumeMatrix:
+    """Процессы API и потребители событий только читают матрицу; read_only=False - у задачи синхронизации"""
+    return ResumeMatrix(settings.matching.path,
+                        dim=settings.matching.dim,
+                        nnz=settings.matching.nnz,
+                        read_only=read_only)
+
+
+def resume_text(experience: str, education: str, about: str | None) -> str:
+    return " ".join(filter(None, (experience, education, about)))
+
+
+class MatchingServiceBase(ABC):
+
+    @abstractmethod
+    async def sync_resumes(self) -> int:
+        """Добавить в матрицу резюме, созданные после watermark: построение матрицы с нуля"""
+
+    @abstractmethod
+    async def apply_resume_events(self, redis: Redis) -> int:
+        """Применить к матрице изменения и удаления резюме из потока событий resume"""
+
+    @abstractmethod
+    async def upsert_resume(self, resume_id: uuid.UUID) -> None:
+        """Пересчитать признаки резюме или убрать его, если резюме удалено"""
+
+    @abstractmethod
+    async def match_resumes(self, vacansy_id: uuid.UUID, user_id: uuid.UUID, limit: int) -> list[ResumeMatch]:
+        """Лучшие резюме для вакансии HR пользователя"""
+
+
+class MatchingService(MatchingServiceBase):
+    def __init__(self, db_session: AsyncSession, matrix: ResumeMatrix):
+        log.info("Инициализация matching service")
+        self.db_session = db_session
+        self.matrix = matrix
+
+    def _watermark(self) -> tuple[datetime, uuid.UUID] | None:
+        if self.matrix.watermark is None:
+            return None
+        created_at, resume_id = self.matrix.watermark.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(resume_id)
+
+    async def sync_resumes(self) -> int:
+        synced = 0
+        # матрицу мог дописать другой процесс, пока блокировка была у него
+        self.matrix.reload_if_changed()
+        async with self.db_session as session:
+            resume_crud = ResumeDAL(session)
+            while True:
+                rows = await resume_crud.get_for_matching(self._watermark(), settings.matching.sync_batch_size)
+                if not rows:
+                    break
+                for resume_id, experience, education, about, created_at, is_active in rows:
+                    if is_active:
+                        self.matrix.upsert(resume_id, resume_text(experience, education, about))
+                    else:
+                        self.matrix.remove(resume_id)
+                last = rows[-1]
+                self.matrix.watermark = f"{last.created_at.isoformat()}|{last.id}"
+                self.matrix.flush()
+                synced += len(rows)
+        log.info(f"Синхронизация матрицы резюме: {synced} новых, всего {len(self.matrix)}")
+        return synced
+
+    async def apply_resume_events(self, redis: Redis) -> int:
+        async def handle(message_id: str, fields: dict[str, str]) -> None:
+            await self.upsert_resume(uuid.UUID(fields["aggregate_id"]))
+
+        # имя потребителя постоянное: неподтвержденное прошлым запуском drain заберет сам
+        consumer = StreamConsumer(redis, stream_name("resume"), RESUME_EVENTS_GROUP, RESUME_EVENTS_GROUP, handle,
+                                  batch_size=settings.matching.sync_batch_size,
+                                  start_id="0",
+                                  before_ack=self.matrix.flush)
+        applied = await consumer.drain()
+        log.info(f"События резюме применены к матрице: {applied}, всего {len(self.matrix)}")
+        return applied
+
+    async def upsert_resume(self, resume_id: uuid.UUID) -> None:
+        # на диск матрицу сбрасывает вызывающий - один раз на пачку
+        async with self.db_session as session:
+            rows = await ResumeDAL(session).get_matching_rows([resume_id])
+        if rows is None:
+            raise RuntimeError(f"Не удалось получить резюме {resume_id}")
+        resume = rows.get(resume_id)
+        if resume is None or not resume.is_active:
+            self.matrix.remove(resume_id)
+            return
+        self.matrix.upsert(resume.id, resume_text(resume.experience, resume.education, resume.about))
+
+    async def match_resumes(self, vacansy_id: uuid.UUID, user_id: uuid.UUID, limit: int) -> list[ResumeMatch]:
+        async with self.db_session as session:
+            # чужая вакансия неотличима от несуществующей
+            vacansy_text = await VacansyDAL(session).get_matching_text(vacansy_id, user_id)
+        if vacansy_text is None:
+            log.error(f"{status.HTTP_404_NOT_FOUND}: Вакансия {vacansy_id} не найдена")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Вакансия не найдена"
+            )
+        self.matrix.reload_if_changed()
+        # numpy отпускает GIL, поэтому подсчет не блокирует event loop
+        matches = await asyncio.to_thread(self.matrix.top_k, vacansy_text, limit, settings.matching.chunk_rows)
+        return [ResumeMatch(resume_id=resume_id, score=score) for resume_id, score in matches]
+
+
+@lru_cache
+def get_matching_service(db_session: AsyncSession = Depends(db_helper.get_async_session)) -> MatchingService:
+    log_msg = f'{db_session=}'
+    log.debug(log_msg)
+    return MatchingService(db_session=db_session, matrix=get_resume_matrix())
+
+
+if __name__ == "__main__":
+    # python -m src.services.matching - построить/догнать матрицу резюме
+    async def main() -> None:
+        try:
+            async with db_helper.async_session() as session:
+                matching_service = MatchingService(session, get_resume_matrix(read_only=False))
+                await matching_service.sync_resumes()
+                await matching_service.apply_resume_events(redis_helper.redis)
+        finally:
+            await redis_helper.close()
+
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from functools import lru_cache
+import logging.config
+
+import orjson
+from fastapi import Depends
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.outbox import OutboxDAL
+from src.core.config import settings
+from src.database.redis import redis_helper
+from src.database.session import db_helper
+from src.jobs.queue import periodic
+from src.schemas.outbox import OutboxLagResponse
+from src.utils.streams import stream_lag, stream_name, trim_consumed
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+TOPICS = ("vacansy", "resume", "comment", "role")
+
+
+class OutboxServiceBase(ABC):
+
+    @abstractmethod
+    async def relay(self) -> int:
+        """Опубликовать накопленные события в Redis Streams, вернуть их число"""
+
+    @abstractmethod
+    async def trim(self) -> int:
+        """Обрезать потоки ниже самой отстающей группы потребителей"""
+
+    @abstractmethod
+    async def get_lag(self) -> OutboxLagResponse:
+        """Очередь outbox и отставание групп потребителей по каждому потоку"""
+
+
+class OutboxService(OutboxServiceBase):
+    def __init__(self, db_session: AsyncSession, redis: Redis):
+        log.info("Инициализация outbox service")
+        self.db_session = db_session
+        self.redis = redis
+
+    async def _relay_batch(self, session: AsyncSession) -> int:
+        """Одна пачка: XADD всех событий одним конвейером, затем удаление строк и коммит.
+
+        Падение между XADD и коммитом оставит строки в outbox, и они будут опубликованы
+        повторно: доставка хотя бы один раз, потребители отбрасывают дубли по id события.
+        """
+        async with session.begin():
+            outbox_crud = OutboxDAL(session)
+            events = await outbox_crud.lock_batch(settings.outbox.batch_size)
+            if not events:
+                return 0
+            pipe = self.redis.pipeline(transaction=False)
+            for event in events:
+                pipe.xadd(stream_name(event.topic),
+                          {"id": event.id,
+                           "event": event.event,
+                           "aggregate_id": str(event.aggregate_id),
+                           "payload": orjson.dumps(event.payload),
+                           "created_at": event.created_at.isoformat()})
+            await pipe.execute()
+            await outbox_crud.delete([event.id for event in events])
+        return len(events)
+
+    async def relay(self) -> int:
+        started = time.perf_counter()
+        published = 0
+        async with self.db_session as session:
+            while True:
+                relayed = await self._relay_batch(session)
+                published += relayed
+                # неполная пачка - outbox разобран, остальное дождется следующего прохода
+                if relayed < settings.outbox.batch_size:
+                    break
+        if published:
+            log.info(f"Outbox: опубликовано {published} событий за {time.perf_counter() - started:.2f} c")
+        return published
+
+    async def trim(self) -> int:
+        # MAXLEN при XADD удалял и еще не прочитанные события, а доставка обещана хотя бы один раз
+        trimmed = 0
+        for topic in TOPICS:
+            trimmed += await trim_consumed(self.redis, stream_name(topic), settings.outbox.stream_maxlen)
+        if trimmed:
+            log.info(f"Outbox: из потоков удалено {trimmed} обработанных событий")
+        return trimmed
+
+    async def get_lag(self) -> OutboxLagResponse:
+        async with self.db_session as session:
+            backlog, oldest = await OutboxDAL(session).get_backlog()
+        oldest_age = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest is not None else None
+        streams = [await stream_lag(self.redis, stream_name(topic)) for topic in TOPICS]
+        return OutboxLagResponse(backlog=backlog, oldest_age_seconds=oldest_age, streams=streams)
+
+
+@periodic(settings.outbox.interval, enabled=settings.outbox.relay_enabled, queue="events", name="outbox_relay")
+async def run_outbox_relay_job() -> None:
+    """Один проход ретранслятора; SKIP LOCKED позволяет запускать его на всех воркерах сразу"""
+    async with db_helper.async_session() as session:
+        await OutboxService(session, redis_helper.redis).relay()
+
+
+@periodic(settings.outbox.trim_interval, enabled=settings.outbox.relay_enabled, name="outbox_trim")
+async def run_outbox_trim_job() -> None:
+    async with db_helper.async_session() as session:
+        await OutboxService(session, redis_helper.redis).trim()
+
+
+@lru_cache
+def get_outbox_service(db_session: AsyncSession = Depends(db_helper.get_async_session)) -> OutboxService:
+    log_msg = f'{db_session=}'
+    log.debug(log_msg)
+    return OutboxService(db_session=db_session, redis=redis_helper.redis)
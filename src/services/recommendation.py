@@ -0,0 +1,137 @@
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from functools import lru_cache
+import logging.config
+
+from fastapi import Depends
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.resume import ResumeDAL
+from src.crud.vacansy import VacansyDAL
+from src.core.config import settings
+from src.database.redis import redis_helper
+from src.database.session import db_helper
+from src.jobs.queue import periodic
+from src.schemas.vacansy import VacansyShortResponse
+from src.services.matching import MatchingService, get_resume_matrix
+from src.utils.matching import ResumeMatrix
+from src.utils.periodic import acquire_lock, release_lock
+from src.utils.streams import consumer_group
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+def user_key(user_id: uuid.UUID | str) -> str:
+    return f"recommendation:user:{user_id}"
+
+
+class RecommendationServiceBase(ABC):
+
+    @abstractmethod
+    async def score_vacansy(self, vacansy_id: uuid.UUID) -> int:
+        """Оценить вакансию по матрице резюме и обновить рекомендации; вернуть число пользователей"""
+
+    @abstractmethod
+    async def get_recommended(self, user_id: uuid.UUID, limit: int) -> list[VacansyShortResponse]:
+        """Рекомендованные вакансии пользователя"""
+
+
+class RecommendationService(RecommendationServiceBase):
+    def __init__(self, db_session: AsyncSession, redis: Redis, matrix: ResumeMatrix):
+        log.info("Инициализация recommendation service")
+        self.db_session = db_session
+        self.redis = redis
+        self.matrix = matrix
+
+    async def score_vacansy(self, vacansy_id: uuid.UUID) -> int:
+        async with self.db_session as session:
+            texts = await VacansyDAL(session).get_matching_texts([vacansy_id])
+            if texts is None:
+                raise RuntimeError(f"Не удалось получить вакансию {vacansy_id}")
+            if vacansy_id not in texts:
+                # вакансию удалили или сняли с публикации: из рекомендаций ее уберет get_recommended
+                return 0
+            self.matrix.reload_if_changed()
+            found = await asyncio.to_thread(self.matrix.top_k, texts[vacansy_id],
+                                            settings.recommendation.candidates_per_vacansy,
+                                            settings.matching.chunk_rows)
+            if not found:
+                return 0
+            owners = await ResumeDAL(session).get_owners([resume_id for resume_id, _ in found])
+            if owners is None:
+                raise RuntimeError(f"Не удалось получить владельцев резюме для вакансии {vacansy_id}")
+
+        # у пользователя может быть несколько резюме - берем лучшую оценку (found отсортирован по убыванию)
+        best: dict[uuid.UUID, float] = {}
+        for resume_id, score in found:
+            user_id = owners.get(resume_id)
+            if user_id is not None:
+                best.setdefault(user_id, score)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id, score in best.items():
+                # оценка перезаписывается: после изменения вакансия может подходить хуже
+                pipe.zadd(user_key(user_id), {str(vacansy_id): score})
+                pipe.zremrangebyrank(user_key(user_id), 0, -(settings.recommendation.top_n + 1))
+                pipe.expire(user_key(user_id), settings.recommendation.key_ttl)
+            await pipe.execute()
+        return len(best)
+
+    async def get_recommended(self, user_id: uuid.UUID, limit: int) -> list[VacansyShortResponse]:
+        vacansy_ids = await self.redis.zrange(user_key(user_id), 0, limit - 1, desc=True)
+        if not vacansy_ids:
+            return []
+        ids = [uuid.UUID(vacansy_id) for vacansy_id in vacansy_ids]
+        async with self.db_session as session:
+            rows = await VacansyDAL(session).get_by_ids(ids) or []
+        by_id = {row.id: row for row in rows}
+        missing = [str(vacansy_id) for vacansy_id in ids if vacansy_id not in by_id]
+        if missing:
+            # вакансию удалили или сняли с публикации - чистим лениво
+            await self.redis.zrem(user_key(user_id), *missing)
+        return [VacansyShortResponse.model_validate(by_id[vacansy_id]) for vacansy_id in ids if vacansy_id in by_id]
+
+
+@consumer_group("vacansy", "recommendation", start_id="0", enabled=settings.recommendation.enabled)
+async def handle_vacansy_event(message_id: str, fields: dict[str, str]) -> None:
+    """Новая или измененная вакансия: пересчитать, кому ее рекомендовать.
+
+    Ошибка оставляет событие неподтвержденным - его обработают повторно.
+    """
+    if fields["event"] == "deleted":
+        return
+    async with db_helper.async_session() as session:
+        users = await RecommendationService(session, redis_helper.redis, get_resume_matrix()).score_vacansy(
+            uuid.UUID(fields["aggregate_id"]))
+    log.debug(f"Вакансия {fields['aggregate_id']} рекомендована {users} пользователям")
+
+
+@periodic(settings.recommendation.interval, enabled=settings.recommendation.enabled, name="recommendation")
+async def run_recommendation_job() -> None:
+    """Догнать матрицу резюме, по которой оцениваются вакансии; на всех воркерах выполняется только одним.
+
+    Новые резюме берутся по watermark, изменения и удаления - из потока событий resume.
+    """
+    redis = redis_helper.redis
+    lock_ttl = int(settings.recommendation.interval * 5)
+    token = await acquire_lock(redis, "recommendation", lock_ttl)
+    if token is None:
+        return
+    try:
+        async with db_helper.async_session() as session:
+            matching_service = MatchingService(session, get_resume_matrix(read_only=False))
+            await matching_service.sync_resumes()
+            await matching_service.apply_resume_events(redis)
+    finally:
+        await release_lock(redis, "recommendation", token)
+
+
+@lru_cache
+def get_recommendation_service(db_session: AsyncSession = Depends(db_helper.get_async_session),
+                               redis: Redis = Depends(redis_helper.get_redis)) -> RecommendationService:
+    log_msg = f'{db_session=}'
+    log.debug(log_msg)
+    return RecommendationService(db_session=db_session, redis=redis, matrix=get_resume_matrix())
@@ -0,0 +1,72 @@
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+import logging.config
+
+from fastapi import status, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.resume import EXPORT_COLUMNS, ResumeDAL
+from src.core.config import settings
+from src.database.session import db_helper
+from src.schemas.resume import ResumeResponse
+from src.utils.export import ExportFormat, encode_rows
+from src.utils.filter import ResumeFilter
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+class ResumeServiceBase(ABC):
+
+    @abstractmethod
+    def export(self, resume_filter: ResumeFilter, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        """Потоковая выгрузка активных резюме по фильтру"""
+
+    @abstractmethod
+    async def get_resume(self, resume_id: uuid.UUID) -> ResumeResponse:
+        """Активное резюме"""
+
+    @abstractmethod
+    async def get_version(self, resume_id: uuid.UUID) -> Optional[tuple[int, datetime]]:
+        """Версия резюме для условного GET"""
+
+
+class ResumeService(ResumeServiceBase):
+    def __init__(self, db_session: AsyncSession):
+        log.info("Инициализация resume service")
+        self.db_session = db_session
+
+    async def export(self, resume_filter: ResumeFilter, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        # генератор дочитывается уже после выхода из обработчика, поэтому сессия своя
+        async with db_helper.async_session() as session:
+            rows = ResumeDAL(session).stream_list(resume_filter, settings.export.yield_per)
+            async for chunk in encode_rows(rows, [column.key for column in EXPORT_COLUMNS],
+                                           export_format, settings.export.buffer_size):
+                yield chunk
+
+
+    async def get_resume(self, resume_id: uuid.UUID) -> ResumeResponse:
+        async with self.db_session as session:
+            resume = await ResumeDAL(session).get(resume_id)
+        if resume is None or not resume.is_active:
+            log.error(f"{status.HTTP_404_NOT_FOUND}: Резюме {resume_id} не найдено")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Резюме не найдено"
+            )
+        return ResumeResponse.model_validate(resume)
+
+    async def get_version(self, resume_id: uuid.UUID) -> Optional[tuple[int, datetime]]:
+        async with self.db_session as session:
+            return await ResumeDAL(session).get_version(resume_id)
+
+
+@lru_cache
+def get_resume_service(db_session: AsyncSession = Depends(db_helper.get_async_session)) -> ResumeService:
+    log_msg = f'{db_session=}'
+    log.debug(log_msg)
+    return ResumeService(db_session=db_session)
@@ -1,6 +1,9 @@
+import argparse
+import asyncio
 import uuid
 from abc import ABC, abstractmethod
 from functools import lru_cache
+from datetime import datetime
 from typing import Optional
 import logging.config
 
@@ -10,30 +13,38 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.crud.role import RoleDAL
 from src.crud.user_role import UserRoleDAL
 from src.crud.user import UserDAL
+from src.database.redis import redis_helper
 from src.database.session import db_helper
-from src.schemas.role import ResponseRole
+from src.schemas.pagination import LimitOffsetTotalPage
+from src.schemas.role import (ResponseRole, RequestNewRoleToUser, ResponseBulkRoles, BulkRoleResult,
+                              BulkRoleStatus)
+from src.services.role_catalog import role_catalog
+from src.utils.permissions import Permission, combine, from_names
 from src.core.log_config import LOGGING
 
 logging.config.dictConfig(LOGGING)
 log = logging.getLogger(__name__)
 
+ADMIN_ROLE = "admin"
+
 
 class RoleServiceBase(ABC):
 
     @abstractmethod
-    async def create_role(self, role_name: str) -> Optional[ResponseRole]:
+    async def create_role(self, role_name: str, permissions: Optional[list[str]] = None) -> Optional[ResponseRole]:
         """Создание новой роли"""
 
     @abstractmethod
     async def read_role(self, role_id: uuid.UUID) -> Optional[ResponseRole]:
-        """Чтение роли из БД"""
+        """Чтение роли из каталога ролей"""
 
     @abstractmethod
     async def read_roles(self) -> Optional[list[ResponseRole]]:
         """Получение списка ролей"""
 
     @abstractmethod
-    async def update_role(self, role_id: uuid.UUID, new_name: str) -> Optional[ResponseRole]:
+    async def update_role(self, role_id: uuid.UUID, new_name: str,
+                          permissions: Optional[list[str]] = None) -> Optional[ResponseRole]:
         """Обновление роли"""
 
     @abstractmethod
@@ -41,7 +52,7 @@ class RoleServiceBase(ABC):
         """Удаление роли"""
 
     @abstractmethod
-    async def get_user_access_area(self, user_id: uuid.UUID) -> ResponseRole | list[ResponseRole]:
+    async def get_user_access_area(self, user_id: uuid.UUID) -> LimitOffsetTotalPage[ResponseRole]:
         """Получить область доступа для пользователя по его идентификатору"""
 
     @abstractmethod
@@ -52,85 +63,103 @@ class RoleServiceBase(ABC):
     async def remove_role_from_user(self, user_id: uuid.UUID, role_id: uuid.UUID) -> bool:
         """Удалить роль из ролей пользователей"""
 
+    @abstractmethod
+    async def set_roles_to_users(self, pairs: list[RequestNewRoleToUser]) -> ResponseBulkRoles:
+        """Назначить роли пользователям списком пар"""
+
+    @abstractmethod
+    async def remove_roles_from_users(self, pairs: list[RequestNewRoleToUser]) -> ResponseBulkRoles:
+        """Отозвать роли у пользователей списком пар"""
+
+    @abstractmethod
+    async def get_role_version(self, role_id: uuid.UUID) -> Optional[tuple[int, datetime]]:
+        """Версия роли для условного GET"""
+
+    @abstractmethod
+    async def bootstrap_admin(self, email: str) -> uuid.UUID:
+        """Назначить пользователю роль admin со всеми правами, создав ее при необходимости"""
+
+    @abstractmethod
+    async def get_user_roles_version(self, user_id: uuid.UUID) -> list[tuple[uuid.UUID, int]]:
+        """Пары (id, version) ролей пользователя для условного GET"""
+
 
 class RoleService(RoleServiceBase):
     def __init__(self, db_session: AsyncSession):
         log.info("Инициализация role service")
         self.db_session = db_session
 
-    async def create_role(self, role_name: str) -> ResponseRole | None:
+    async def create_role(self, role_name: str, permissions: Optional[list[str]] = None) -> ResponseRole | None:
         async with self.db_session as session:
             async with session.begin():
-                role_crud = RoleDAL(session)
-                role_exists = await role_crud.get_by_name(role_name)
-                if role_exists:
-                    log.error(
-                        f"{status.HTTP_400_BAD_REQUEST}: Эта роль существует")
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Эта роль существует"
-                    )
                 log.debug("Создание новой role")
-                role = await role_crud.create(name=role_name)
-                return ResponseRole.model_validate(role)
+                # существующее имя пропускает ON CONFLICT по уникальному role.name, отдельной проверки нет
+                role = await RoleDAL(session).create(name=role_name, permissions=from_names(permissions or ()))
+        if role is None:
+            log.error(
+                f"{status.HTTP_400_BAD_REQUEST}: Эта роль существует")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Эта роль существует"
+            )
+        await role_catalog.bump()
+        return ResponseRole.model_validate(role)
 
     async def read_role(self, role_id: uuid.UUID) -> ResponseRole | None:
-        async with self.db_session as session:
-            async with session.begin():
-                log.debug(f"Чтение role: {role_id}")
-                role_crud = RoleDAL(session)
-                role = await role_crud.get(id=role_id)
-                if not role:
-                    log.error(
-                        f"{status.HTTP_404_NOT_FOUND}: Роль не существует {role_id}")
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Роль не существет"
-                    )
-                return ResponseRole(role.id, role.name)
+        log.debug(f"Чтение role: {role_id}")
+        catalog = await role_catalog.get()
+        role = catalog.get(role_id)
+        if not role:
+            log.error(
+                f"{status.HTTP_404_NOT_FOUND}: Роль не существует {role_id}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Роль не существет"
+            )
+        return ResponseRole.model_validate(role)
 
     async def read_roles(self) -> list[ResponseRole] | None:
-        async with self.db_session as session:
-            async with session.begin():
-                log.debug("Чтение всех role")
-                role_crud = RoleDAL(session)
-                roles = await role_crud.get_all()
-                return roles
+        log.debug("Чтение всех role")
+        catalog = await role_catalog.get()
+        return [ResponseRole.model_validate(role) for role in catalog.roles]
 
-    async def update_role(self, role_id: uuid.UUID, new_name: str) -> ResponseRole | None:
+    async def update_role(self, role_id: uuid.UUID, new_name: str,
+                          permissions: Optional[list[str]] = None) -> ResponseRole | None:
+        changed = {"name": new_name}
+        if permissions is not None:
+            # уже выданные access token несут старые права до своего истечения
+            changed["permissions"] = from_names(permissions)
         async with self.db_session as session:
             async with session.begin():
                 log.debug(f"Обнавление role: {role_id}; новое имя: {new_name}")
-                role_crud = RoleDAL(session)
-                role_exists = await role_crud.get(id=role_id)
-                if not role_exists:
-                    log.error(
-                        f"{status.HTTP_404_NOT_FOUND}: Роль {role_id} не существует")
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Роль не существует"
-                    )
-                update_role_id = await role_crud.update(role_id, name=new_name)
-        updated_role = await self.read_role(update_role_id)
-        return updated_role
+                # UPDATE ... RETURNING возвращает роль целиком: ни проверки, ни повторного чтения
+                role = await RoleDAL(session).update(role_id, **changed)
+        if role is None:
+            log.error(
+                f"{status.HTTP_404_NOT_FOUND}: Роль {role_id} не существует")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Роль не существует"
+            )
+        await role_catalog.bump()
+        return ResponseRole.model_validate(role)
 
     async def delete_role(self, role_id: uuid.UUID) -> uuid.UUID | None:
         async with self.db_session as session:
             async with session.begin():
                 log.debug(f"Удаление role: {role_id}")
-                role_crud = RoleDAL(session)
-                role_exists = await role_crud.get(id=role_id)
-                if not role_exists:
-                    log.error(
-                        f"{status.HTTP_404_NOT_FOUND}: Роль {role_id} не найден")
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Роль не найдена"
-                    )
-                deleted_role_id = await role_crud.delete(id=role_id)
-                return deleted_role_id
+                deleted_role_id = await RoleDAL(session).delete(id=role_id)
+        if deleted_role_id is None:
+            log.error(
+                f"{status.HTTP_404_NOT_FOUND}: Роль {role_id} не найден")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Роль не найдена"
+            )
+        await role_catalog.bump()
+        return deleted_role_id
 
-    async def get_user_access_area(self, user_id: uuid.UUID) -> ResponseRole | list[ResponseRole]:
+    async def get_user_access_area(self, user_id: uuid.UUID) -> LimitOffsetTotalPage[ResponseRole]:
         log_msg = f'{user_id=}'
         log.debug(log_msg)
         async with self.db_session as session:
@@ -157,56 +186,93 @@ class RoleService(RoleServiceBase):
             async with session.begin():
                 log.debug(
                     f"Назначение новой роли пользователю {user_id}, role: {role_id}")
-                user_role_crud = UserRoleDAL(session)
-                user_crud = UserDAL(session)
-                role_crud = RoleDAL(session)
-                user_exists = await user_crud.get(id=user_id)
-                if not user_exists:
-                    log_msg = f"{status.HTTP_404_NOT_FOUND}: Пользовательне существует"
-                    log.error(log_msg)
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Пользователь не существует"
-                    )
-                role_exists = await role_crud.get(id=role_id)
-                if not role_exists:
-                    log_msg = f"{status.HTTP_404_NOT_FOUND}: Роль не существует"
-                    log.error(log_msg)
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Роль не сущeствует"
-                    )
-
-                new_user_role = await user_role_crud.create(user_id, role_id)
-
-                return bool(new_user_role)
+                # несуществующие пользователь или роль - нарушение внешнего ключа, UserRoleDAL отвечает 404;
+                # уже назначенная роль не дублируется
+                await UserRoleDAL(session).create(user_id, role_id)
+                return True
 
     async def remove_role_from_user(self, user_id: uuid.UUID, role_id: uuid.UUID) -> bool:
         async with self.db_session as session:
             async with session.begin():
                 log_msg = f"Удаление role {role_id} у пользователя {user_id}"
                 log.debug(log_msg)
+                deleted_id = await UserRoleDAL(session).delete_pair(user_id, role_id)
+                if deleted_id is None:
+                    log.error(f"{status.HTTP_404_NOT_FOUND}: Роль {role_id} не назначена пользователю {user_id}")
+                return deleted_id is not None
 
-                user_crud = UserDAL(session)
-                role_crud = RoleDAL(session)
+    async def set_roles_to_users(self, pairs: list[RequestNewRoleToUser]) -> ResponseBulkRoles:
+        return await self._change_roles(pairs, assign=True)
 
-                user_exists = await user_crud.get(user_id)
-                if not user_exists:
-                    log_msg = f"{status.HTTP_404_NOT_FOUND}: Пользователь {user_id} не обнаружен."
-                    log.error(log_msg)
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Пользователь не обнаружен"
-                    )
-                role_exists = await role_crud.get(role_id)
-                if not role_exists:
-                    lsg_msg = f"{status.HTTP_404_NOT_FOUND}: Роль {role_id} не обнаружен."
+    async def remove_roles_from_users(self, pairs: list[RequestNewRoleToUser]) -> ResponseBulkRoles:
+        return await self._change_roles(pairs, assign=False)
+
+    async def _change_roles(self, pairs: list[RequestNewRoleToUser], assign: bool) -> ResponseBulkRoles:
+        """Проверка всех пользователей и всех ролей двумя запросами, затем один INSERT или DELETE"""
+        unique_pairs = list(dict.fromkeys((pair.user_id, pair.role_id) for pair in pairs))
+        log.debug(f"{'Назначение' if assign else 'Отзыв'} ролей: {len(unique_pairs)} пар")
+        async with self.db_session as session:
+            async with session.begin():
+                user_ids = await UserDAL(session).get_existing_ids(list({user_id for user_id, _ in unique_pairs}))
+                role_ids = await RoleDAL(session).get_existing_ids(list({role_id for _, role_id in unique_pairs}))
+                if user_ids is None or role_ids is None:
                     raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Роль не обнаружена"
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail="Ошибка проверки пользователей и ролей"
                     )
-                await role_crud.delete_by_user_id_and_role_id(user_id, role_id)
-                return True
+                valid = [(user_id, role_id) for user_id, role_id in unique_pairs
+                         if user_id in user_ids and role_id in role_ids]
+                user_role_crud = UserRoleDAL(session)
+                if assign:
+                    changed = await user_role_crud.create_many(valid)
+                else:
+                    changed = await user_role_crud.delete_many(valid)
+
+        done, unchanged = (BulkRoleStatus.assigned, BulkRoleStatus.exists) if assign \
+            else (BulkRoleStatus.revoked, BulkRoleStatus.not_assigned)
+        results = []
+        counts = {}
+        for user_id, role_id in unique_pairs:
+            if user_id not in user_ids:
+                pair_status = BulkRoleStatus.user_not_found
+            elif role_id not in role_ids:
+                pair_status = BulkRoleStatus.role_not_found
+            else:
+                pair_status = done if (user_id, role_id) in changed else unchanged
+            results.append(BulkRoleResult(user_id=user_id, role_id=role_id, status=pair_status))
+            counts[pair_status.value] = counts.get(pair_status.value, 0) + 1
+        return ResponseBulkRoles(results=results, counts=counts)
+
+    async def get_role_version(self, role_id: uuid.UUID) -> Optional[tuple[int, datetime]]:
+        catalog = await role_catalog.get()
+        return catalog.get(role_id)
+
+    async def bootstrap_admin(self, email: str) -> uuid.UUID:
+        all_permissions = combine(Permission)
+        async with self.db_session as session:
+            user = await UserDAL(session).get_by_email(email)
+            if user is None or not user.is_active:
+                log.error(f"{status.HTTP_404_NOT_FOUND}: Пользователь {email} не обнаружен")
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Пользователь не обнаружен"
+                )
+            role_crud = RoleDAL(session)
+            role = await role_crud.get_by_name(ADMIN_ROLE)
+            if role is None:
+                role = await role_crud.create(name=ADMIN_ROLE, permissions=all_permissions)
+            elif role.permissions != all_permissions:
+                # права, добавленные после создания роли, тоже достаются администратору
+                role = await role_crud.update(role.id, permissions=all_permissions)
+            await UserRoleDAL(session).create(user.id, role.id)
+        await role_catalog.bump()
+        return role.id
+
+    async def get_user_roles_version(self, user_id: uuid.UUID) -> list[tuple[uuid.UUID, int]]:
+        async with self.db_session as session:
+            async with session.begin():
+                role_crud = RoleDAL(session)
+                return await role_crud.get_versions_by_user_id(user_id) or []
 
 
 @lru_cache
@@ -214,3 +280,21 @@ def get_role_service(db_session: AsyncSession = Depends(db_helper.get_async_sess
     log_msg = f'{db_session=}'
     log.debug(log_msg)
     return RoleService(db_session=db_session)
+
+
+if __name__ == "__main__":
+    # python -m src.services.role admin@example.com - назначить первого администратора:
+    # через API роли назначает только пользователь с правом role_manage
+    parser = argparse.ArgumentParser(description="Назначить пользователю роль admin со всеми правами")
+    parser.add_argument("email")
+    args = parser.parse_args()
+
+    async def main() -> None:
+        try:
+            async with db_helper.async_session() as session:
+                role_id = await RoleService(session).bootstrap_admin(args.email)
+            log.info(f"Пользователю {args.email} назначена роль {ADMIN_ROLE} ({role_id})")
+        finally:
+            await redis_helper.close()
+
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, Optional
+import logging.config
+
+from fastapi import status, HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.crud.role import RoleDAL
+from src.core.config import settings
+from src.database.redis import redis_helper
+from src.database.session import db_helper
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogRole:
+    id: uuid.UUID
+    name: str
+    permissions: int
+    version: int
+    updated_at: datetime
+
+
+@dataclass(frozen=True)
+class RoleCatalog:
+    """Неизменяемый снимок таблицы role.
+
+    version - значение ключа версии в Redis, прочитанное до загрузки снимка:
+    изменение, зафиксированное после чтения, увеличит ключ и вызовет перезагрузку.
+    """
+    roles: tuple[CatalogRole, ...] = ()
+    by_id: Mapping[uuid.UUID, CatalogRole] = field(default_factory=lambda: MappingProxyType({}))
+    version: Optional[int] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+
+    def get(self, role_id: uuid.UUID) -> Optional[CatalogRole]:
+        return self.by_id.get(role_id)
+
+
+class RoleCatalogStore:
+    """Каталог ролей в памяти процесса.
+
+    Роли меняют только create_role/update_role/delete_role, и после фиксации они
+    увеличивают версию в Redis (bump). Процесс сверяет версию не чаще раза в
+    check_interval и перечитывает таблицу из Postgres только при ее изменении.
+    """
+
+    def __init__(self, redis: Redis, version_key: str, check_interval: float) -> None:
+        self.redis = redis
+        self.version_key = version_key
+        self.check_interval = check_interval
+        self.catalog = RoleCatalog()
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self.catalog.loaded and time.monotonic() - self._checked_at < self.check_interval
+
+    async def get(self) -> RoleCatalog:
+        if self._is_fresh():
+            return self.catalog
+        async with self._lock:
+            # пока ждали блокировку, версию мог сверить другой запрос
+            if not self._is_fresh():
+                await self._refresh()
+        return self.catalog
+
+    async def _refresh(self) -> None:
+        try:
+            version = int(await self.redis.get(self.version_key) or 0)
+        except RedisError as error:
+            log.error(f"Не удалось прочитать версию каталога ролей: {error}")
+            if self.catalog.loaded:
+                # без Redis изменения других процессов не видны: отдаем текущий снимок
+                self._checked_at = time.monotonic()
+                return
+            # -1 не совпадет ни с одной версией: после восстановления Redis снимок перечитается
+            version = -1
+        if version != self.catalog.version:
+            await self._reload(version)
+        self._checked_at = time.monotonic()
+
+    async def _reload(self, version: int) -> None:
+        async with db_helper.async_session() as session:
+            rows = await RoleDAL(session).get_catalog()
+        if rows is None:
+            if self.catalog.loaded:
+                log.error("Не удалось обновить каталог ролей, используется предыдущий")
+                return
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Каталог ролей недоступен")
+        roles = tuple(CatalogRole(*row) for row in rows)
+        self.catalog = RoleCatalog(roles=roles,
+                                   by_id=MappingProxyType({role.id: role for role in roles}),
+                                   version=version)
+        log.info(f"Каталог ролей загружен: {len(roles)} ролей, версия {version}")
+
+    async def bump(self) -> None:
+        """Сообщить всем процессам об изменении ролей; вызывается после фиксации транзакции"""
+        try:
+            await self.redis.incr(self.version_key)
+        except RedisError as error:
+            log.error(f"Не удалось увеличить версию каталога ролей: {error}")
+            # другие процессы изменение не увидят, но свой снимок должен его отражать
+            async with self._lock:
+                await self._reload(-1)
+            return
+        # под блокировкой: сверка, начатая до INCR, не отметит старый снимок свежим после нее
+        async with self._lock:
+            self._checked_at = 0.0
+
+
+role_catalog = RoleCatalogStore(redis=redis_helper.redis,
+                                version_key=settings.role_catalog.version_key,
+                                check_interval=settings.role_catalog.check_interval)
@@ -0,0 +1,154 @@
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+import logging.config
+
+from fastapi import status, HTTPException, Depends
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.saved_search import SavedSearchDAL
+from src.core.config import settings
+from src.database.redis import redis_helper
+from src.database.session import db_helper
+from src.jobs.queue import periodic
+from src.schemas.saved_search import SavedSearchResponse
+from src.schemas.vacansy import VacansyShortResponse
+from src.utils.filter import VacansyFilter
+from src.utils.periodic import acquire_lock, release_lock
+from src.utils.saved_search import Predicate, PredicateIndex, canonical_filters, predicate_key
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+WATERMARK_KEY = "saved_search:watermark"
+
+
+class SavedSearchServiceBase(ABC):
+
+    @abstractmethod
+    async def create(self, user_id: uuid.UUID, name: str, vacansy_filter: VacansyFilter) -> SavedSearchResponse:
+        """Сохранить фильтр вакансий пользователя"""
+
+    @abstractmethod
+    async def get_list(self, user_id: uuid.UUID) -> list[SavedSearchResponse]:
+        """Сохраненные поиски пользователя"""
+
+    @abstractmethod
+    async def delete(self, saved_search_id: uuid.UUID, user_id: uuid.UUID) -> uuid.UUID:
+        """Удалить сохраненный поиск вместе с его совпадениями"""
+
+    @abstractmethod
+    async def get_matches(self, saved_search_id: uuid.UUID, user_id: uuid.UUID,
+                          limit: int) -> list[VacansyShortResponse]:
+        """Новые вакансии, подошедшие под сохраненный поиск, последние первыми"""
+
+    @abstractmethod
+    async def match_new(self) -> int:
+        """Проверить вакансии, созданные после watermark, против всех поисков; вернуть число совпадений"""
+
+
+class SavedSearchService(SavedSearchServiceBase):
+    def __init__(self, db_session: AsyncSession, redis: Redis):
+        log.info("Инициализация saved search service")
+        self.db_session = db_session
+        self.redis = redis
+
+    async def create(self, user_id: uuid.UUID, name: str, vacansy_filter: VacansyFilter) -> SavedSearchResponse:
+        filters = canonical_filters(vacansy_filter)
+        async with self.db_session as session:
+            saved_search_crud = SavedSearchDAL(session)
+            if await saved_search_crud.count_by_user_id(user_id) >= settings.saved_search.max_per_user:
+                log.error(f"{status.HTTP_400_BAD_REQUEST}: У пользователя {user_id} максимум сохраненных поисков")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Можно сохранить не больше {settings.saved_search.max_per_user} поисков"
+                )
+            saved_search = await saved_search_crud.create(user_id, name, filters, predicate_key(filters))
+        return SavedSearchResponse.model_validate(saved_search)
+
+    async def get_list(self, user_id: uuid.UUID) -> list[SavedSearchResponse]:
+        async with self.db_session as session:
+            saved_searches = await SavedSearchDAL(session).get_by_user_id(user_id) or []
+        return [SavedSearchResponse.model_validate(saved_search) for saved_search in saved_searches]
+
+    async def delete(self, saved_search_id: uuid.UUID, user_id: uuid.UUID) -> uuid.UUID:
+        async with self.db_session as session:
+            deleted_id = await SavedSearchDAL(session).delete(saved_search_id, user_id)
+        if deleted_id is None:
+            log.error(f"{status.HTTP_404_NOT_FOUND}: Поиск {saved_search_id} пользователя {user_id} не найден")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Сохраненный поиск не найден"
+            )
+        return deleted_id
+
+    async def get_matches(self, saved_search_id: uuid.UUID, user_id: uuid.UUID,
+                          limit: int) -> list[VacansyShortResponse]:
+        async with self.db_session as session:
+            rows = await SavedSearchDAL(session).get_matches(saved_search_id, user_id, limit) or []
+        return [VacansyShortResponse.model_validate(row) for row in rows]
+
+    async def _watermark(self) -> tuple[datetime, uuid.UUID] | None:
+        watermark = await self.redis.get(WATERMARK_KEY)
+        if watermark is None:
+            return None
+        created, vacansy_id = watermark.split("|")
+        return datetime.fromisoformat(created), uuid.UUID(vacansy_id)
+
+    async def match_new(self) -> int:
+        started = time.perf_counter()
+        checked = recorded = 0
+        async with self.db_session as session:
+            saved_search_crud = SavedSearchDAL(session)
+            # предикаты читаются один раз на проход: поиск, сохраненный во время прохода,
+            # получит вакансии следующего
+            index = PredicateIndex(Predicate.from_filters(key, filters, search_ids)
+                                   for key, filters, search_ids in await saved_search_crud.get_predicates())
+            watermark = await self._watermark()
+            while True:
+                rows = await saved_search_crud.get_delta(watermark, settings.saved_search.batch_size,
+                                                         settings.saved_search.settle_seconds)
+                if not rows:
+                    break
+                search_ids, vacansy_ids = index.match_batch(rows)
+                if search_ids:
+                    recorded += await saved_search_crud.record_matches(search_ids, vacansy_ids)
+                else:
+                    await session.commit()
+                # watermark сдвигается после коммита: при падении пачка проверится снова,
+                # а уже записанные пары пропустит ON CONFLICT
+                last = rows[-1]
+                watermark = (last.created, last.id)
+                await self.redis.set(WATERMARK_KEY, f"{last.created.isoformat()}|{last.id}")
+                checked += len(rows)
+        elapsed = time.perf_counter() - started
+        if checked:
+            log.info(f"Сохраненные поиски: {checked} новых вакансий против {len(index)} предикатов, "
+                     f"{recorded} совпадений за {elapsed:.2f} c ({checked / elapsed:.0f} вакансий/с)")
+        return recorded
+
+
+@periodic(settings.saved_search.interval, enabled=settings.saved_search.enabled, name="saved_search")
+async def run_saved_search_job() -> None:
+    """Один проход сопоставления; на всех воркерах выполняется только одним"""
+    redis = redis_helper.redis
+    lock_ttl = int(settings.saved_search.interval * 5)
+    token = await acquire_lock(redis, "saved_search", lock_ttl)
+    if token is None:
+        return
+    try:
+        async with db_helper.async_session() as session:
+            await SavedSearchService(session, redis).match_new()
+    finally:
+        await release_lock(redis, "saved_search", token)
+
+
+@lru_cache
+def get_saved_search_service(db_session: AsyncSession = Depends(db_helper.get_async_session)) -> SavedSearchService:
+    log_msg = f'{db_session=}'
+    log.debug(log_msg)
+    return SavedSearchService(db_session=db_session, redis=redis_helper.redis)
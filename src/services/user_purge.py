@@ -0,0 +1,100 @@
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+import logging.config
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.user import UserDAL
+from src.crud.user_purge import PURGE_STEPS, UserPurgeDAL
+from src.core.config import settings
+from src.database.redis import redis_helper
+from src.database.session import db_helper
+from src.jobs.queue import periodic
+from src.utils.periodic import acquire_lock, release_lock
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+class UserPurgeServiceBase(ABC):
+
+    @abstractmethod
+    async def run(self, time_budget: float) -> int:
+        """Очищать данные деактивированных пользователей пачками не дольше time_budget секунд"""
+
+
+class UserPurgeService(UserPurgeServiceBase):
+    def __init__(self, db_session: AsyncSession):
+        log.info("Инициализация user purge service")
+        self.db_session = db_session
+
+    async def _purge_user(self,
+                          purge_crud: UserPurgeDAL,
+                          user_id: uuid.UUID,
+                          current_step: str | None,
+                          timings: dict,
+                          deadline: float) -> bool:
+        """Продолжает очистку с сохраненного шага; False - время прохода вышло раньше"""
+        steps = PURGE_STEPS[PURGE_STEPS.index(current_step):] if current_step else PURGE_STEPS
+        for step in steps:
+            while True:
+                if time.monotonic() >= deadline:
+                    return False
+                deleted = await purge_crud.delete_batch(user_id, step, settings.user_purge.batch_size, timings)
+                if deleted < settings.user_purge.batch_size:
+                    break
+                await asyncio.sleep(settings.user_purge.pause)
+            log.info(f"Очистка пользователя {user_id}: {step} - {timings[step]}")
+        return True
+
+    async def run(self, time_budget: float) -> int:
+        deadline = time.monotonic() + time_budget
+        finished = 0
+        async with self.db_session as session:
+            purge_crud = UserPurgeDAL(session)
+            user_crud = UserDAL(session)
+            # очистки активных пользователей: остаются в очереди, в этом проходе пропускаются
+            postponed: list[uuid.UUID] = []
+            while time.monotonic() < deadline:
+                purge = await purge_crud.get_unfinished(postponed)
+                if purge is None:
+                    break
+                user_id, current_step, timings = purge.user_id, purge.step, dict(purge.timings)
+                if current_step is None:
+                    # пустое множество - активного пользователя нет, None - ошибка базы
+                    active = await user_crud.get_existing_ids([user_id])
+                    if active is None:
+                        log.error(f"Очистка пользователя {user_id} отложена: не удалось проверить пользователя")
+                        break
+                    if active:
+                        # не отмена: очистку ставят в очередь вместе с деактивацией, активный
+                        # пользователь здесь - повод повторить позже, а не терять его данные
+                        log.warning(f"Очистка пользователя {user_id} отложена: пользователь активен")
+                        postponed.append(user_id)
+                        continue
+                if not await self._purge_user(purge_crud, user_id, current_step, timings, deadline):
+                    break
+                await purge_crud.set_status(user_id, "done")
+                finished += 1
+                log.info(f"Очистка пользователя {user_id} завершена: {timings}")
+        return finished
+
+
+@periodic(settings.user_purge.interval, enabled=settings.user_purge.enabled, name="user_purge",
+          timeout=settings.user_purge.time_budget * 2)
+async def run_user_purge_job() -> None:
+    """Один проход очистки; на всех воркерах выполняется только одним"""
+    redis = redis_helper.redis
+    # блокировка переживает проход с запасом: time_budget ограничивает его длительность
+    lock_ttl = int(settings.user_purge.time_budget * 2)
+    token = await acquire_lock(redis, "user_purge", lock_ttl)
+    if token is None:
+        return
+    try:
+        async with db_helper.async_session() as session:
+            await UserPurgeService(session).run(settings.user_purge.time_budget)
+    finally:
+        await release_lock(redis, "user_purge", token)
@@ -0,0 +1,138 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+from uuid import UUID
+import logging.config
+
+from fastapi import status, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.comment import CommentDAL
+from src.crud.vacansy import DETAIL_COLUMNS, VacansyDAL
+from src.core.config import settings
+from src.database.session import db_helper
+from src.schemas.comment import CommentResponse
+from src.schemas.pagination import CursorPage
+from src.schemas.vacansy import CommentsProjection, FacetCount, VacansyDetailResponse, VacansySearchPage
+from src.services.facet import facet_store
+from src.utils.export import ExportFormat, encode_rows
+from src.utils.filter import VacansyFilter
+from src.utils.pagination import TotalMode, decode_cursor, encode_cursor
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+class VacansyServiceBase(ABC):
+
+    @abstractmethod
+    async def search(self, vacansy_filter: VacansyFilter) -> VacansySearchPage:
+        """Поиск вакансий вместе со счетчиками фасетов"""
+
+    @abstractmethod
+    def export(self, vacansy_filter: VacansyFilter, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        """Потоковая выгрузка активных вакансий по фильтру"""
+
+    @abstractmethod
+    async def get_vacansy(self,
+                          vacansy_id: UUID,
+                          comments: CommentsProjection,
+                          comments_limit: int) -> VacansyDetailResponse:
+        """Карточка вакансии с выбранной проекцией комментариев"""
+
+    @abstractmethod
+    async def get_version(self, vacansy_id: UUID) -> Optional[tuple[int, datetime]]:
+        """Версия карточки вакансии для условного GET"""
+
+    @abstractmethod
+    async def get_comments(self,
+                           vacansy_id: UUID,
+                           limit: int,
+                           cursor: Optional[str]) -> CursorPage[CommentResponse]:
+        """Страница комментариев вакансии в порядке создания"""
+
+
+class VacansyService(VacansyServiceBase):
+    def __init__(self, db_session: AsyncSession):
+        log.info("Инициализация vacansy service")
+        self.db_session = db_session
+
+    async def search(self, vacansy_filter: VacansyFilter) -> VacansySearchPage:
+        async with self.db_session as session:
+            log.debug(f"Поиск вакансий: {vacansy_filter}")
+            vacansy_crud = VacansyDAL(session)
+            page = await vacansy_crud.get_list_vacansy_dal(vacansy_filter, total_mode=TotalMode.estimated)
+            if page is None:
+                log.error(f"{status.HTTP_500_INTERNAL_SERVER_ERROR}: Не удалось получить список вакансий")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Не удалось получить список вакансий"
+                )
+            snapshot = await facet_store.get(session)
+            page.facets = {facet: [FacetCount(value=value, count=count) for value, count in values]
+                           for facet, values in snapshot.facets.items()}
+            return page
+
+    async def export(self, vacansy_filter: VacansyFilter, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        # генератор дочитывается уже после выхода из обработчика, поэтому сессия своя
+        async with db_helper.async_session() as session:
+            rows = VacansyDAL(session).stream_list(vacansy_filter, settings.export.yield_per)
+            async for chunk in encode_rows(rows, [column.key for column in DETAIL_COLUMNS],
+                                           export_format, settings.export.buffer_size):
+                yield chunk
+
+    async def get_vacansy(self,
+                          vacansy_id: UUID,
+                          comments: CommentsProjection,
+                          comments_limit: int) -> VacansyDetailResponse:
+        async with self.db_session as session:
+            detail = await VacansyDAL(session).get(vacansy_id, comments, comments_limit)
+        if detail is None:
+            log.error(f"{status.HTTP_404_NOT_FOUND}: Вакансия {vacansy_id} не найдена")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Вакансия не найдена"
+            )
+        return VacansyDetailResponse.model_validate({**detail.vacansy, "comments": detail.comments})
+
+    async def get_version(self, vacansy_id: UUID) -> Optional[tuple[int, datetime]]:
+        async with self.db_session as session:
+            return await VacansyDAL(session).get_version(vacansy_id)
+
+    async def get_comments(self,
+                           vacansy_id: UUID,
+                           limit: int,
+                           cursor: Optional[str]) -> CursorPage[CommentResponse]:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            log.error(f"{status.HTTP_400_BAD_REQUEST}: Некорректный курсор {cursor}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Некорректный курсор"
+            )
+        async with self.db_session as session:
+            comment_rows = await CommentDAL(session).get(vacansy_id, limit, after)
+        if comment_rows is None:
+            log.error(f"{status.HTTP_500_INTERNAL_SERVER_ERROR}: Не удалось получить комментарии {vacansy_id}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Не удалось получить комментарии"
+            )
+        next_cursor = None
+        if len(comment_rows) > limit:
+            comment_rows = comment_rows[:limit]
+            last = comment_rows[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return CursorPage[CommentResponse](
+            items=[CommentResponse.model_validate(row) for row in comment_rows],
+            next_cursor=next_cursor)
+
+
+@lru_cache
+def get_vacansy_service(db_session: AsyncSession = Depends(db_helper.get_async_session)) -> VacansyService:
+    log_msg = f'{db_session=}'
+    log.debug(log_msg)
+    return VacansyService(db_session=db_session)
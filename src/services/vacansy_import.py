@@ -0,0 +1,207 @@
+import asyncio
+import csv
+import io
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import AsyncIterator, Iterator, Optional
+import logging.config
+
+from fastapi import status, HTTPException, Depends
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.vacansy_import import VacansyImportDAL
+from src.core.config import settings
+from src.database.session import db_helper
+from src.schemas.vacansy import (VacansyImportProgress, VacansyImportReport, VacansyImportRow,
+                                 VacansyImportRowError)
+from src.utils.bulk_import import batched, read_rows
+from src.utils.export import ExportFormat
+from src.utils.salary import parse_salary
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+class VacansyImportServiceBase(ABC):
+
+    @abstractmethod
+    async def import_file(self,
+                          hr_id: uuid.UUID,
+                          user_id: uuid.UUID,
+                          import_id: Optional[uuid.UUID],
+                          file_format: ExportFormat,
+                          body: AsyncIterator[bytes]) -> VacansyImportReport:
+        """Массовая загрузка вакансий HR пользователя из CSV/NDJSON с продолжением по import_id"""
+
+    @abstractmethod
+    async def get_progress(self, import_id: uuid.UUID, user_id: uuid.UUID) -> VacansyImportProgress:
+        """Прогресс загрузки пользователя"""
+
+
+class VacansyImportService(VacansyImportServiceBase):
+    def __init__(self, db_session: AsyncSession):
+        log.info("Инициализация vacansy import service")
+        self.db_session = db_session
+
+    @staticmethod
+    def _validate(rows: list[tuple[int, Optional[dict]]]) -> tuple[list[tuple], list[VacansyImportRowError]]:
+        records = []
+        errors = []
+        for number, data in rows:
+            if data is None:
+                errors.append(VacansyImportRowError(row=number, errors=["строку не удалось разобрать"]))
+                continue
+            try:
+                row = VacansyImportRow.model_validate(data)
+            except ValidationError as error:
+                errors.append(VacansyImportRowError(
+                    row=number,
+                    errors=[f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors()]))
+                continue
+            salary_min, salary_max, currency = parse_salary(row.proposed_salary)
+            records.append((uuid.uuid4(), row.place_of_work, row.about_the_company, row.required_specialt,
+                            row.proposed_salary, row.working_conditions, row.required_experience,
+                            salary_min, salary_max, currency))
+        return records, errors
+
+    @classmethod
+    def _next_batch(cls, batches: Iterator[list[tuple[int, Optional[dict]]]]
+                    ) -> Optional[tuple[int, list[tuple], list[VacansyImportRowError]]]:
+        """Прочитать и проверить следующую пачку: размер пачки, записи и ошибки строк"""
+        batch = next(batches, None)
+        if batch is None:
+            return None
+        records, errors = cls._validate(batch)
+        return len(batch), records, errors
+
+    async def import_file(self,
+                          hr_id: uuid.UUID,
+                          user_id: uuid.UUID,
+                          import_id: Optional[uuid.UUID],
+                          file_format: ExportFormat,
+                          body: AsyncIterator[bytes]) -> VacansyImportReport:
+        started = time.perf_counter()
+        # вакансии загружаются только в HR владельца токена; проверка - до приема файла
+        async with self.db_session as session:
+            owned_hr_id = await VacansyImportDAL(session).get_owned_hr_id(hr_id, user_id)
+        if owned_hr_id is None:
+            log.error(f"{status.HTTP_404_NOT_FOUND}: HR {hr_id} пользователя {user_id} не найден")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="HR не найден"
+            )
+        # файл принимается целиком до начала вставки и читается с диска, а не из памяти.
+        # SpooledTemporaryFile до Python 3.11 не реализует readable() и не оборачивается в TextIOWrapper
+        with tempfile.TemporaryFile() as spool:
+            size = 0
+            async for chunk in body:
+                size += len(chunk)
+                if size > settings.bulk_import.max_file_size:
+                    log.error(f"{status.HTTP_413_REQUEST_ENTITY_TOO_LARGE}: Файл загрузки больше "
+                              f"{settings.bulk_import.max_file_size} байт")
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Слишком большой файл"
+                    )
+                spool.write(chunk)
+            spool.seek(0)
+            stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+
+            async with self.db_session as session:
+                import_crud = VacansyImportDAL(session)
+                if import_id is None:
+                    progress = await import_crud.create(hr_id)
+                else:
+                    progress = await import_crud.get(import_id, user_id)
+                    if progress is None or progress.hr_id != hr_id:
+                        log.error(f"{status.HTTP_404_NOT_FOUND}: Загрузка {import_id} не найдена")
+                        raise HTTPException(
+                            status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Загрузка не найдена"
+                        )
+                    if progress.status != "in_progress":
+                        # продолжение прерванной или упавшей загрузки
+                        progress = await import_crud.set_status(import_id, "in_progress")
+                import_id = progress.id
+                rows_processed = progress.rows_processed
+                processed_now = 0
+                errors: list[VacansyImportRowError] = []
+                errors_truncated = False
+
+                # при продолжении строки, вставленные прошлыми попытками, пропускаются
+                skip_rows = progress.rows_processed
+                rows = ((number, data) for number, data in read_rows(stream, file_format)
+                        if number > skip_rows)
+                batches = batched(rows, settings.bulk_import.batch_size)
+                conflict = False
+                try:
+                    # разбор и проверка строк - в потоке, чтобы не занимать event loop
+                    while parsed := await asyncio.to_thread(self._next_batch, batches):
+                        batch_size, records, batch_errors = parsed
+                        imported = await import_crud.merge_batch(import_id, hr_id, records, rows_processed,
+                                                                 batch_size, len(batch_errors))
+                        if imported is None:
+                            conflict = True
+                            break
+                        rows_processed += batch_size
+                        processed_now += batch_size
+                        free_slots = settings.bulk_import.max_reported_errors - len(errors)
+                        errors_truncated = errors_truncated or len(batch_errors) > free_slots
+                        errors.extend(batch_errors[:max(free_slots, 0)])
+                except (UnicodeDecodeError, csv.Error) as error:
+                    # файл целиком не в UTF-8 или не CSV - ошибка клиента, а не сервера
+                    log.error(f"{status.HTTP_400_BAD_REQUEST}: Загрузка {import_id} прервана на строке "
+                              f"{rows_processed}: {error!r}")
+                    await import_crud.set_status(import_id, "failed")
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Файл не удалось прочитать: ожидается UTF-8 в выбранном формате"
+                    )
+                except Exception as error:
+                    # загрузка не остается in_progress навсегда; пачки до ошибки учтены
+                    # в rows_processed, и тот же файл можно догрузить с этим import_id
+                    log.error(f"Загрузка {import_id} прервана на строке {rows_processed}: {error!r}")
+                    await import_crud.set_status(import_id, "failed")
+                    raise
+                if conflict:
+                    # статус ведет параллельная загрузка того же файла
+                    log.error(f"{status.HTTP_409_CONFLICT}: Загрузка {import_id} выполняется параллельно")
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Эта загрузка уже выполняется"
+                    )
+
+                progress = await import_crud.set_status(import_id, "done")
+
+        elapsed = time.perf_counter() - started
+        log.info(f"Загрузка {import_id}: {processed_now} строк за {elapsed:.2f} c")
+        return VacansyImportReport(
+            **VacansyImportProgress.model_validate(progress).model_dump(),
+            elapsed=elapsed,
+            rows_per_second=processed_now / elapsed if elapsed > 0 else 0.0,
+            errors=errors,
+            errors_truncated=errors_truncated)
+
+    async def get_progress(self, import_id: uuid.UUID, user_id: uuid.UUID) -> VacansyImportProgress:
+        async with self.db_session as session:
+            progress = await VacansyImportDAL(session).get(import_id, user_id)
+        if progress is None:
+            log.error(f"{status.HTTP_404_NOT_FOUND}: Загрузка {import_id} не найдена")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Загрузка не найдена"
+            )
+        return VacansyImportProgress.model_validate(progress)
+
+
+@lru_cache
+def get_vacansy_import_service(
+        db_session: AsyncSession = Depends(db_helper.get_async_session)) -> VacansyImportService:
+    log_msg = f'{db_session=}'
+    log.debug(log_msg)
+    return VacansyImportService(db_session=db_session)
@@ -0,0 +1,128 @@
+import asyncio
+import time
+import uuid
+from contextlib import AsyncExitStack
+from typing import Awaitable, Optional
+import logging.config
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.entry import EntryDAL
+from src.crud.role import RoleDAL
+from src.crud.user import UserDAL
+from src.core.config import settings
+from src.database.redis import redis_helper
+from src.database.session import db_helper
+from src.schemas.health import WarmupReport
+from src.services.role_catalog import role_catalog
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+# значения, которых нет в базе: запросы выполняются полностью, но ничего не находят
+WARMUP_ID = uuid.UUID(int=0)
+WARMUP_EMAIL = "warmup@invalid"
+WARMUP_USER_AGENT = "warmup"
+
+
+async def run_hot_queries(session: AsyncSession) -> None:
+    """Запросы входа, обновления токенов и /auth/me: на соединении asyncpg готовит их
+    один раз и держит в кэше, SQLAlchemy компилирует один раз на движок"""
+    user_crud, role_crud, entry_crud = UserDAL(session), RoleDAL(session), EntryDAL(session)
+    await user_crud.get_by_email(WARMUP_EMAIL)
+    await user_crud.get(WARMUP_ID)
+    await role_crud.get_by_user_id(WARMUP_ID)
+    await role_crud.get_versions_by_user_id(WARMUP_ID)
+    await entry_crud.get(WARMUP_ID)
+    await entry_crud.get_by_user_agent(WARMUP_USER_AGENT, only_active=True)
+    await entry_crud.get_active_refresh_tokens(WARMUP_ID)
+
+
+class Warmup:
+    """Прогрев процесса после старта.
+
+    Открывает соединения пулов Postgres и Redis, готовит горячие запросы на каждом
+    открытом соединении, загружает каталог ролей и строит схему OpenAPI. Пока прогрев
+    не закончился, ready ложно и /health/ready отвечает 503; если база или Redis
+    недоступны, прогрев повторяется каждые retry_interval секунд.
+    """
+
+    def __init__(self) -> None:
+        self.report: Optional[WarmupReport] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.report is not None
+
+    async def start(self, app: FastAPI) -> None:
+        if not settings.warmup.enabled:
+            self.report = WarmupReport(duration_ms=0, steps={}, attempts=0)
+            return
+        self._task = asyncio.create_task(self._run(app))
+        try:
+            # shield: по таймауту прогрев продолжается в фоне, а не отменяется
+            await asyncio.wait_for(asyncio.shield(self._task), settings.warmup.startup_wait)
+        except asyncio.TimeoutError:
+            log.warning(f"Прогрев не закончился за {settings.warmup.startup_wait} c, "
+                        f"процесс принимает запросы до его окончания")
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self, app: FastAPI) -> None:
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                self.report = await self._warm_up(app, attempts)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                log.error(f"Прогрев, попытка {attempts}: {error!r}; "
+                          f"повтор через {settings.warmup.retry_interval} c")
+                await asyncio.sleep(settings.warmup.retry_interval)
+                continue
+            log.info(f"Прогрев завершен за {self.report.duration_ms:.0f} мс "
+                     f"(попыток {attempts}): {self.report.steps}")
+            return
+
+    async def _warm_up(self, app: FastAPI, attempts: int) -> WarmupReport:
+        started = time.perf_counter()
+        steps: dict[str, float] = {}
+
+        async def step(name: str, work: Awaitable) -> None:
+            step_started = time.perf_counter()
+            await work
+            steps[name] = round((time.perf_counter() - step_started) * 1000, 2)
+
+        await step("postgres", self._warm_postgres())
+        await step("redis", self._warm_redis())
+        await step("role_catalog", role_catalog.get())
+        step_started = time.perf_counter()
+        app.openapi()
+        steps["openapi"] = round((time.perf_counter() - step_started) * 1000, 2)
+        return WarmupReport(duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                            steps=steps, attempts=attempts)
+
+    @staticmethod
+    async def _warm_postgres() -> None:
+        # соединения сверх pool_size при возврате в пул закрываются, открывать их незачем
+        count = min(settings.warmup.db_connections, db_helper.engine.pool.size())
+        async with AsyncExitStack() as stack:
+            connections = [await stack.enter_async_context(db_helper.engine.connect()) for _ in range(count)]
+            sessions = [await stack.enter_async_context(AsyncSession(bind=connection))
+                        for connection in connections]
+            await asyncio.gather(*(run_hot_queries(session) for session in sessions))
+
+    @staticmethod
+    async def _warm_redis() -> None:
+        # одновременные PING берут из пула разные соединения
+        await asyncio.gather(*(redis_helper.redis.ping() for _ in range(settings.warmup.redis_connections)))
+
+
+warmup = Warmup()
@@ -0,0 +1,35 @@
+import csv
+import json
+from itertools import islice
+from typing import IO, Iterable, Iterator, Optional, TypeVar
+
+from src.utils.export import ExportFormat
+
+T = TypeVar("T")
+
+
+def read_rows(stream: IO[str], file_format: ExportFormat) -> Iterator[tuple[int, Optional[dict]]]:
+    """Строки файла загрузки с номерами от 1 (без заголовка CSV).
+
+    Вместо строки, которую не удалось разобрать, отдается None.
+    """
+    if file_format == ExportFormat.csv:
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, row
+        return
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
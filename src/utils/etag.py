@@ -0,0 +1,60 @@
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def weak_etag(*parts: Any) -> str:
+    """Слабый ETag из (id, version, ...): ответ тот же по смыслу, байт в байт не гарантируется"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    # для If-None-Match сравнение слабое: W/ не учитывается
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque(etag) in (_opaque(tag) for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # в HTTP-дате точность до секунды
+    return last_modified.replace(microsecond=0) <= since
+
+
+def check_not_modified(request: Request,
+                       response: Response,
+                       etag: str,
+                       last_modified: Optional[datetime] = None) -> None:
+    """Отвечает 304, если клиент прислал актуальный валидатор, иначе ставит заголовки ответа.
+
+    If-Modified-Since учитывается только без If-None-Match, как требует RFC 9110.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        not_modified = last_modified is not None and _not_modified_since(
+            request.headers.get("if-modified-since"), last_modified)
+    if not_modified:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+import zlib
+from enum import Enum
+from typing import Any, AsyncIterator, Mapping, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any) -> str:
+    # UUID, datetime, Decimal - все, что json не умеет сам
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+async def encode_rows(rows: AsyncIterator[Mapping[str, Any]],
+                      columns: Sequence[str],
+                      export_format: ExportFormat,
+                      buffer_size: int) -> AsyncIterator[bytes]:
+    """Кодирует строки по мере чтения и отдает куски не меньше buffer_size байт.
+
+    Следующая строка запрашивается у курсора только когда предыдущий кусок
+    забрал клиент, поэтому память не зависит от размера выгрузки.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == ExportFormat.csv else None
+    if writer is not None:
+        writer.writerow(columns)
+    async for row in rows:
+        if writer is not None:
+            writer.writerow(["" if row[column] is None else row[column] for column in columns])
+        else:
+            buffer.write(json.dumps({column: row[column] for column in columns},
+                                    ensure_ascii=False, default=_json_default))
+            buffer.write("\n")
+        if buffer.tell() >= buffer_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int) -> AsyncIterator[bytes]:
+    """Сжатие gzip на лету: wbits=31 - формат gzip, а не голый deflate"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    if not accept_encoding:
+        return False
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def export_response(content: AsyncIterator[bytes],
+                    export_format: ExportFormat,
+                    filename: str,
+                    accept_encoding: Optional[str],
+                    gzip_level: int) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"',
+               "Vary": "Accept-Encoding"}
+    if accepts_gzip(accept_encoding):
+        content = gzip_stream(content, gzip_level)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(content, media_type=MEDIA_TYPES[export_format], headers=headers)
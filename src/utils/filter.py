@@ -1,6 +1,12 @@
+from typing import Union
+
 from fastapi_filter.contrib.sqlalchemy import Filter
+from pydantic import model_validator
+from sqlalchemy import Select, func
+from sqlalchemy.orm import Query
 
 from src.database.models import Vacansy, Resume
+from src.database.models.vacansy import salary_lower, salary_upper, salary_range, has_salary
 
 
 class VacansyFilter(Filter):
@@ -8,6 +14,9 @@ class VacansyFilter(Filter):
     place_of_work__in: list[str] | None = None
     required_specialt__in: list[str] | None = None
     required_experience__ilike: str | None = None
+    salary__gte: int | None = None
+    salary__lte: int | None = None
+    currency: str | None = None
     custom_order_by: list[str] | None = None
 
     class Constants(Filter.Constants):
@@ -15,6 +24,34 @@ class VacansyFilter(Filter):
         ordering_field_name = "custom_order_by"
         search_model_fields = ["place_of_work",
                                "required_specialt", "required_experience"]
+        # поля без колонки в модели, обрабатываются в filter() вручную
+        salary_fields = ("salary__gte", "salary__lte")
+
+    @property
+    def filtering_fields(self):
+        fields = dict(super().filtering_fields)
+        for field_name in self.Constants.salary_fields:
+            fields.pop(field_name, None)
+        return fields.items()
+
+    @model_validator(mode="after")
+    def check_salary_bounds(self):
+        # int4range с нижней границей больше верхней - ошибка базы, а не пустая выдача
+        if self.salary__gte is not None and self.salary__lte is not None and self.salary__gte > self.salary__lte:
+            raise ValueError("salary__gte не может быть больше salary__lte")
+        return self
+
+    def filter(self, query: Union[Query, Select]):
+        query = super().filter(query)
+        if self.salary__gte is not None and self.salary__lte is not None:
+            # пересечение диапазонов - GiST индекс ix_vacansy_salary_range
+            query = query.filter(has_salary, salary_range.op("&&")(
+                func.int4range(self.salary__gte, self.salary__lte, "[]")))
+        elif self.salary__gte is not None:
+            query = query.filter(salary_upper >= self.salary__gte)
+        elif self.salary__lte is not None:
+            query = query.filter(salary_lower <= self.salary__lte)
+        return query
 
 
 class ResumeFilter(Filter):
@@ -0,0 +1,156 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from fastapi import status
+from fastapi.responses import FileResponse, Response
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+IMAGE_FORMAT = "WEBP"
+IMAGE_EXTENSION = "webp"
+IMAGE_MEDIA_TYPE = "image/webp"
+# файл по адресу никогда не меняется
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImageError(ValueError):
+    """Файл не удалось декодировать как изображение"""
+
+
+def process_image(data: bytes, sizes: dict[str, int], quality: int, max_pixels: int) -> dict[str, bytes]:
+    """Декодирование и уменьшение под каждый размер; выполняется в процессе пула"""
+    largest = max(sizes.values())
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            if source.width * source.height > max_pixels:
+                raise ImageError(f"Слишком большое изображение: {source.width}x{source.height}")
+            # JPEG декодируется сразу в уменьшенном масштабе, не распаковывая все пиксели
+            source.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(source)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as error:
+        raise ImageError(str(error)) from error
+
+    variants = {}
+    # от большего к меньшему: каждый размер уменьшается из предыдущего, а не из оригинала
+    for name, side in sorted(sizes.items(), key=lambda item: -item[1]):
+        image.thumbnail((side, side), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, IMAGE_FORMAT, quality=quality, method=4)
+        variants[name] = buffer.getvalue()
+    return variants
+
+
+class ImageWorkerPool:
+    """Пул процессов для декодирования; создается при первой загрузке изображения"""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def process(self, data: bytes, sizes: dict[str, int], quality: int, max_pixels: int) -> dict[str, bytes]:
+        if self._executor is None:
+            # spawn: форк процесса с работающим event loop и пулом соединений небезопасен
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, process_image, data, sizes, quality, max_pixels)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+class ImageStore:
+    """Контентно-адресуемое хранилище: путь файла определяется sha256 исходного файла.
+
+    Одинаковые загрузки дают один и тот же набор файлов, поэтому повторная обработка не нужна.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    @staticmethod
+    def relative_path(digest: str, size: str) -> str:
+        return f"{digest[:2]}/{digest[2:4]}/{digest}_{size}.{IMAGE_EXTENSION}"
+
+    def path(self, digest: str, size: str) -> Path:
+        return self.root / self.relative_path(digest, size)
+
+    def exists(self, digest: str, sizes: dict[str, int]) -> bool:
+        return all(self.path(digest, size).exists() for size in sizes)
+
+    def save(self, digest: str, variants: dict[str, bytes]) -> None:
+        for size, content in variants.items():
+            path = self.path(digest, size)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(content)
+            os.replace(tmp, path)
+
+
+def parse_range(range_header: str, file_size: int) -> Optional[tuple[int, int]]:
+    """Один диапазон "bytes=a-b", "bytes=a-" или "bytes=-n" -> (start, end) включительно.
+
+    None - заголовок не поддерживается и отдается весь файл; ValueError - диапазон вне файла.
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return None
+    start, _, end = ranges.strip().partition("-")
+    try:
+        if not start:
+            length = int(end)
+            if length <= 0:
+                raise ValueError(range_header)
+            return max(file_size - length, 0), file_size - 1
+        first = int(start)
+        last = int(end) if end else file_size - 1
+    except ValueError:
+        return None
+    if first >= file_size or last < first:
+        raise ValueError(range_header)
+    return first, min(last, file_size - 1)
+
+
+def _read_range(path: Path, start: int, length: int) -> bytes:
+    with open(path, "rb") as file:
+        return os.pread(file.fileno(), length, start)
+
+
+async def image_file_response(path: Path,
+                              relative_path: str,
+                              etag: str,
+                              range_header: Optional[str],
+                              if_none_match: Optional[str],
+                              accel_redirect_prefix: Optional[str]) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if accel_redirect_prefix:
+        # nginx сам отдаст файл через sendfile, включая Range
+        headers["X-Accel-Redirect"] = f"{accel_redirect_prefix.rstrip('/')}/{relative_path}"
+        return Response(media_type=IMAGE_MEDIA_TYPE, headers=headers)
+
+    file_size = path.stat().st_size
+    if range_header:
+        try:
+            byte_range = parse_range(range_header, file_size)
+        except ValueError:
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                            headers={**headers, "Content-Range": f"bytes */{file_size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            content = await asyncio.to_thread(_read_range, path, start, end - start + 1)
+            return Response(content=content,
+                            status_code=status.HTTP_206_PARTIAL_CONTENT,
+                            media_type=IMAGE_MEDIA_TYPE,
+                            headers={**headers, "Content-Range": f"bytes {start}-{end}/{file_size}"})
+    return FileResponse(path, media_type=IMAGE_MEDIA_TYPE, headers=headers)
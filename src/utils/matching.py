@@ -0,0 +1,240 @@
+import json
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional
+from uuid import UUID
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w{2,}", re.UNICODE)
+
+EMPTY_ROW = -1
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class HashingVectorizer:
+    """Хэшированные признаки фиксированной размерности: слово -> crc32 % dim.
+
+    Строка резюме хранится разреженно: не более nnz самых весомых признаков
+    (индексы int32 + веса log(1 + tf), нормированные по L2).
+    crc32 вместо hash(): результат должен совпадать во всех процессах.
+    """
+
+    def __init__(self, dim: int, nnz: int) -> None:
+        self.dim = dim
+        self.nnz = nnz
+
+    def features(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        tokens = tokenize(text)
+        if not tokens:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens),
+                             dtype=np.uint32, count=len(tokens)) % self.dim
+        indices, counts = np.unique(hashes.astype(np.int32), return_counts=True)
+        weights = np.log1p(counts).astype(np.float32)
+        return indices, weights
+
+    def transform(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        """Строка фиксированной ширины nnz; пустые позиции: индекс 0, вес 0"""
+        indices, weights = self.features(text)
+        if len(indices) > self.nnz:
+            top = np.argpartition(weights, -self.nnz)[-self.nnz:]
+            indices, weights = indices[top], weights[top]
+        norm = np.linalg.norm(weights)
+        if norm > 0:
+            weights = weights / norm
+        row_indices = np.zeros(self.nnz, dtype=np.int32)
+        row_values = np.zeros(self.nnz, dtype=np.float16)
+        row_indices[:len(indices)] = indices
+        row_values[:len(weights)] = weights
+        return row_indices, row_values
+
+
+class ResumeMatrix:
+    """Разреженная матрица признаков резюме в memory-mapped файлах.
+
+    indices (capacity x nnz, int32) и values (capacity x nnz, float16) - признаки,
+    ids (capacity x 16, uint8) - UUID резюме, df (dim, float32) - документная частота
+    для IDF запроса. Изменения строк пишутся на месте, без пересборки матрицы.
+    Писатель должен быть один (фоновая синхронизация), читатели открывают матрицу
+    с read_only=True и перечитывают meta.json при его изменении.
+    """
+
+    META = "meta.json"
+
+    def __init__(self,
+                 path: Path,
+                 dim: int,
+                 nnz: int,
+                 initial_capacity: int = 1024,
+                 read_only: bool = False) -> None:
+        self.path = Path(path)
+        self.read_only = read_only
+        self.vectorizer = HashingVectorizer(dim, nnz)
+        self.dim = dim
+        self.nnz = nnz
+        self.size = 0
+        self.capacity = initial_capacity
+        self.watermark: Optional[str] = None
+        self._meta_mtime: Optional[float] = None
+        self._row_by_id: dict[UUID, int] = {}
+        self._free_rows: list[int] = []
+        if (self.path / self.META).exists():
+            self._load()
+        elif not read_only:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._open(create=True)
+            self.flush()
+        # читатель без файлов - пустая матрица, пока писатель их не создаст (reload_if_changed)
+
+    # --- хранение ---
+
+    def _memmap(self, name: str, dtype, shape: tuple, create: bool) -> np.memmap:
+        file = self.path / name
+        if self.read_only:
+            return np.memmap(file, dtype=dtype, mode="r", shape=shape)
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if create or not file.exists():
+            with open(file, "wb") as f:
+                f.truncate(nbytes)
+        elif file.stat().st_size < nbytes:
+            # рост матрицы: строки лежат подряд, достаточно удлинить файл
+            os.truncate(file, nbytes)
+        return np.memmap(file, dtype=dtype, mode="r+", shape=shape)
+
+    def _open(self, create: bool = False) -> None:
+        self.indices = self._memmap("indices.i4", np.int32, (self.capacity, self.nnz), create)
+        self.values = self._memmap("values.f2", np.float16, (self.capacity, self.nnz), create)
+        self.ids = self._memmap("ids.u1", np.uint8, (self.capacity, 16), create)
+        self.active = self._memmap("active.u1", np.uint8, (self.capacity,), create)
+        self.df = self._memmap("df.f4", np.float32, (self.dim,), create)
+
+    def _load(self) -> None:
+        meta_file = self.path / self.META
+        meta = json.loads(meta_file.read_text())
+        if meta["dim"] != self.dim or meta["nnz"] != self.nnz:
+            raise ValueError(f"Матрица {self.path} создана с dim={meta['dim']}, nnz={meta['nnz']}")
+        self.size = meta["size"]
+        self.capacity = meta["capacity"]
+        self.watermark = meta.get("watermark")
+        self._meta_mtime = meta_file.stat().st_mtime
+        self._open()
+        active = self.active[:self.size].astype(bool)
+        self._row_by_id = {UUID(bytes=self.ids[row].tobytes()): int(row) for row in np.flatnonzero(active)}
+        self._free_rows = [int(row) for row in np.flatnonzero(~active)]
+
+    def reload_if_changed(self) -> None:
+        meta_file = self.path / self.META
+        if meta_file.exists() and meta_file.stat().st_mtime != self._meta_mtime:
+            self._load()
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError(f"Матрица {self.path} открыта только для чтения")
+
+    def flush(self) -> None:
+        self._check_writable()
+        for array in (self.indices, self.values, self.ids, self.active, self.df):
+            array.flush()
+        meta = {"size": self.size, "capacity": self.capacity, "dim": self.dim,
+                "nnz": self.nnz, "watermark": self.watermark}
+        tmp = self.path / (self.META + ".tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.path / self.META)
+        self._meta_mtime = (self.path / self.META).stat().st_mtime
+
+    def _grow(self) -> None:
+        self.flush()
+        self.capacity *= 2
+        self._open()
+
+    # --- изменения ---
+
+    def __len__(self) -> int:
+        return len(self._row_by_id)
+
+    def _forget_row(self, row: int) -> None:
+        mask = self.values[row] > 0
+        np.subtract.at(self.df, self.indices[row][mask], 1)
+        self.values[row] = 0
+        self.active[row] = 0
+
+    def upsert(self, resume_id: UUID, text: str) -> None:
+        self._check_writable()
+        row = self._row_by_id.get(resume_id)
+        if row is not None:
+            self._forget_row(row)
+        elif self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            row = self.size
+            self.size += 1
+        row_indices, row_values = self.vectorizer.transform(text)
+        self.indices[row] = row_indices
+        self.values[row] = row_values
+        self.ids[row] = np.frombuffer(resume_id.bytes, dtype=np.uint8)
+        self.active[row] = 1
+        np.add.at(self.df, row_indices[row_values > 0], 1)
+        self._row_by_id[resume_id] = row
+
+    def upsert_many(self, items: Iterable[tuple[UUID, str]]) -> int:
+        count = 0
+        for resume_id, text in items:
+            self.upsert(resume_id, text)
+            count += 1
+        return count
+
+    def remove(self, resume_id: UUID) -> bool:
+        self._check_writable()
+        row = self._row_by_id.pop(resume_id, None)
+        if row is None:
+            return False
+        self._forget_row(row)
+        self._free_rows.append(row)
+        return True
+
+    # --- поиск ---
+
+    def query_vector(self, text: str) -> np.ndarray:
+        """Плотный вектор запроса с весами tf-idf"""
+        indices, weights = self.vectorizer.features(text)
+        n_docs = max(len(self._row_by_id), 1)
+        idf = np.log((n_docs + 1) / (self.df[indices] + 1)) + 1
+        query = np.zeros(self.dim, dtype=np.float32)
+        query[indices] = weights * idf
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query /= norm
+        return query
+
+    def top_k(self, text: str, k: int, chunk_rows: int = 65536) -> list[tuple[UUID, float]]:
+        """Оценка всех резюме одним векторным проходом (по блокам строк) и выбор k лучших"""
+        if not self._row_by_id or k <= 0:
+            return []
+        query = self.query_vector(text)
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, self.size, chunk_rows):
+            stop = min(start + chunk_rows, self.size)
+            # gather: вес признака в запросе для каждого ненулевого элемента строки
+            scores = (query[self.indices[start:stop]] * self.values[start:stop]).sum(axis=1, dtype=np.float32)
+            scores[self.active[start:stop] == 0] = -np.inf
+            if stop - start > k:
+                top = np.argpartition(scores, -k)[-k:]
+            else:
+                top = np.arange(stop - start)
+            best_rows = np.concatenate((best_rows, top + start))
+            best_scores = np.concatenate((best_scores, scores[top]))
+            if len(best_rows) > k:
+                keep = np.argpartition(best_scores, -k)[-k:]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+        order = np.argsort(-best_scores)
+        return [(UUID(bytes=self.ids[row].tobytes()), float(score))
+                for row, score in zip(best_rows[order], best_scores[order]) if score > 0]
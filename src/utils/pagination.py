@@ -0,0 +1,178 @@
+import asyncio
+import base64
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+from uuid import UUID
+import logging.config
+
+from fastapi_pagination.api import create_page
+from fastapi_pagination.bases import AbstractParams
+from fastapi_pagination.ext.sqlalchemy import count_query, paginate_query
+from fastapi_pagination.ext.utils import unwrap_scalars
+from fastapi_pagination.utils import verify_params
+from sqlalchemy import Select, text, exc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+class TotalMode(str, Enum):
+    """Способ подсчета total для постраничной выдачи"""
+    exact = "exact"
+    estimated = "estimated"
+    none = "none"
+
+
+class CountCache:
+    """LRU-кэш точных COUNT(*) с фоновым обновлением устаревших значений"""
+
+    def __init__(self, ttl: int, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    def get(self, key: str) -> tuple[Optional[int], bool]:
+        """Возвращает (значение, устарело ли значение)"""
+        item = self._items.get(key)
+        if item is None:
+            return None, True
+        self._items.move_to_end(key)
+        total, created = item
+        return total, time.monotonic() - created > self.ttl
+
+    def put(self, key: str, total: int) -> None:
+        self._items[key] = (total, time.monotonic())
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def refresh_in_background(self, key: str, query: Select) -> None:
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, query))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, query: Select) -> None:
+        # импорт здесь, чтобы не тянуть engine при импорте утилит
+        from src.database.session import db_helper
+
+        try:
+            async with db_helper.async_session() as session:
+                total = await session.scalar(count_query(query))
+                self.put(key, total)
+        except exc.SQLAlchemyError as error:
+            log.exception(f"Ошибка SQLAlchemyError при фоновом обновлении COUNT: {error}")
+
+
+count_cache = CountCache(ttl=settings.pagination.count_cache_ttl,
+                         max_size=settings.pagination.count_cache_size)
+
+
+def _query_key(session: AsyncSession, query: Select) -> Optional[str]:
+    # диалект драйвера сессии: у psycopg2 (postgresql.dialect()) "%" в литералах удваивается,
+    # а exec_driver_sql передает текст asyncpg как есть
+    try:
+        return str(query.compile(dialect=session.bind.dialect,
+                                 compile_kwargs={"literal_binds": True}))
+    except exc.SQLAlchemyError:
+        return None
+
+
+async def _exact_total(session: AsyncSession, query: Select) -> int:
+    key = _query_key(session, count_query(query))
+    if key is None or settings.pagination.count_cache_ttl <= 0:
+        return await session.scalar(count_query(query))
+
+    total, stale = count_cache.get(key)
+    if total is None:
+        total = await session.scalar(count_query(query))
+        count_cache.put(key, total)
+    elif stale:
+        count_cache.refresh_in_background(key, query)
+    return total
+
+
+async def _estimated_total(session: AsyncSession, query: Select) -> Optional[int]:
+    froms = query.get_final_froms()
+    if query.whereclause is None and len(froms) == 1 and hasattr(froms[0], "name"):
+        # без фильтров достаточно статистики планировщика по таблице
+        reltuples = await session.scalar(
+            text("SELECT greatest(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": froms[0].name})
+        if reltuples is not None:
+            return int(reltuples)
+
+    sql = _query_key(session, query.order_by(None))
+    if sql is None:
+        return None
+    # exec_driver_sql: в литералах фильтров могут встречаться ":" и text() принял бы их за параметры
+    conn = await session.connection()
+    res = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = res.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def paginate(session: AsyncSession,
+                   query: Select,
+                   total_mode: TotalMode = TotalMode.exact,
+                   params: Optional[AbstractParams] = None,
+                   **additional_data: Any) -> Any:
+    """Аналог fastapi_pagination.ext.sqlalchemy.paginate с выбором способа подсчета total
+
+    exact - точный COUNT(*), кэшируется и обновляется в фоне;
+    estimated - оценка планировщика (EXPLAIN / pg_class.reltuples),
+        для маленьких выборок считается точно;
+    none - total не считается, наличие следующей страницы проверяется через LIMIT n + 1.
+    """
+    params, raw_params = verify_params(params, "limit-offset")
+
+    total = None
+    has_next = None
+    if total_mode == TotalMode.exact:
+        total = await _exact_total(session, query)
+    elif total_mode == TotalMode.estimated:
+        total = await _estimated_total(session, query)
+        if total is None or total < settings.pagination.exact_threshold:
+            total = await _exact_total(session, query)
+
+    page_query = paginate_query(query, params)
+    if total_mode == TotalMode.none and raw_params.limit is not None:
+        page_query = page_query.limit(raw_params.limit + 1)
+
+    res = await session.execute(page_query)
+    items = unwrap_scalars(res.unique().all())
+
+    if total_mode == TotalMode.none and raw_params.limit is not None:
+        has_next = len(items) > raw_params.limit
+        items = items[:raw_params.limit]
+    elif total is not None and raw_params.limit is not None:
+        has_next = (raw_params.offset or 0) + len(items) < total
+
+    return create_page(items, total=total, params=params, has_next=has_next, **additional_data)
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Курсор - ключ последней строки страницы (created_at, id), непрозрачный для клиента"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Обратное к encode_cursor; ValueError для поврежденного курсора"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as error:
+        raise ValueError(f"Некорректный курсор: {cursor}") from error
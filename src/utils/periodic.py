@@ -0,0 +1,50 @@
+import asyncio
+import uuid
+from typing import Awaitable, Callable, Optional
+import logging.config
+
+from redis.asyncio import Redis
+
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+
+async def run_periodic(name: str, interval: float, job: Callable[[], Awaitable[None]]) -> None:
+    """Запускать job каждые interval секунд, пока задачу не отменят"""
+    log.info(f"Периодическая задача {name}: каждые {interval} с")
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            log.exception(f"Ошибка в периодической задаче {name}: {error}")
+        await asyncio.sleep(interval)
+
+
+# удаляет ключ, только если в нем токен владельца
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+async def acquire_lock(redis: Redis, name: str, ttl: int) -> Optional[str]:
+    """Блокировка на один запуск среди всех воркеров: SET NX с истечением.
+
+    Возвращает токен владельца для release_lock или None, если блокировка занята.
+    """
+    token = uuid.uuid4().hex
+    if await redis.set(f"lock:{name}", token, nx=True, ex=ttl):
+        return token
+    return None
+
+
+async def release_lock(redis: Redis, name: str, token: str) -> None:
+    """Снимает блокировку, если она еще наша: после истечения ttl ее мог взять другой воркер"""
+    if not await redis.eval(RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token):
+        log.warning(f"Блокировка {name} истекла до окончания задачи")
@@ -0,0 +1,38 @@
+from enum import IntFlag
+from functools import reduce
+from operator import or_
+from typing import Iterable, Literal
+
+# версия раскладки битов: увеличивается, когда бит меняет смысл или удаляется.
+# Токены с другой версией не принимаются require_permission, клиент обновляет токен
+PERMISSIONS_VERSION = 1
+
+
+class Permission(IntFlag):
+    """Права роли; у роли хранится их битовая маска, в access token - объединение масок ролей.
+
+    Новые права добавляются только в конец: номера существующих битов не меняются,
+    иначе нужно увеличить PERMISSIONS_VERSION.
+    """
+    vacansy_write = 1 << 0
+    resume_write = 1 << 1
+    comment_moderate = 1 << 2
+    hr_dashboard = 1 << 3
+    role_manage = 1 << 4
+    user_manage = 1 << 5
+    ops_read = 1 << 6
+
+
+PermissionName = Literal[tuple(Permission.__members__)]
+
+
+def combine(masks: Iterable[int]) -> Permission:
+    return Permission(reduce(or_, masks, 0))
+
+
+def to_names(mask: int) -> list[str]:
+    return [permission.name for permission in Permission if mask & permission]
+
+
+def from_names(names: Iterable[str]) -> Permission:
+    return combine(Permission[name] for name in names)
@@ -0,0 +1,26 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    # построение TypeAdapter дорогое, схема сериализации кэшируется на тип
+    return TypeAdapter(response_type)
+
+
+class TypedJSONResponse(Response):
+    """JSON сразу в байты средствами pydantic-core, без промежуточных dict и jsonable_encoder.
+
+    content должен уже состоять из моделей response_type: dump_json сериализует, но не валидирует.
+    """
+    media_type = "application/json"
+
+    def __init__(self,
+                 content: Any,
+                 response_type: Any,
+                 status_code: int = 200,
+                 headers: Optional[Mapping[str, str]] = None) -> None:
+        super().__init__(type_adapter(response_type).dump_json(content), status_code=status_code, headers=headers)
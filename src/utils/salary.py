@@ -0,0 +1,156 @@
+import re
+from typing import NamedTuple, Optional
+
+CURRENCY_ALIASES = {
+    "RUB": ("₽", "руб", "rub", "rur", "р."),
+    "USD": ("$", "usd", "долл"),
+    "EUR": ("€", "eur", "евро"),
+    "KZT": ("₸", "kzt", "тенге"),
+}
+
+MULTIPLIERS = {
+    "k": 1_000,
+    "к": 1_000,
+    "тыс": 1_000,
+    "млн": 1_000_000,
+    "m": 1_000_000,
+}
+
+# "(?![a-z])": "k" и "m" - множители, только если за ними не продолжается слово ("100 kzt")
+_NUMBER = r"(\d[\d\s  .,]*)\s*(?:(млн|тыс|k|к|m)(?![a-z]))?"
+_NUMBER_RE = re.compile(_NUMBER, re.IGNORECASE)
+# диапазон - только два числа, явно связанные тире или "от ... до"; прочие числа строки
+# ("+ бонусы 10%", "график 5/2") к зарплате не относятся
+_DASH_RANGE_RE = re.compile(_NUMBER + r"\s*[-–—]\s*" + _NUMBER, re.IGNORECASE)
+_UNTIL_RANGE_RE = re.compile(_NUMBER + r"[^\d]*?\b(?:до|to)\s*" + _NUMBER, re.IGNORECASE)
+# "от" / "до" непосредственно перед числом
+_FROM_RE = re.compile(r"\b(?:от|from)\s*$", re.IGNORECASE)
+_TO_RE = re.compile(r"\b(?:до|to|up to)\s*$", re.IGNORECASE)
+# "5/2", "2/2" - график работы, а не сумма
+_FRACTION_RE = re.compile(r"\d+\s*/\s*\d+")
+_CURRENCY = "|".join(re.escape(alias) for aliases in CURRENCY_ALIASES.values() for alias in aliases)
+_CURRENCY_AFTER_RE = re.compile(r"\s*(?:" + _CURRENCY + ")")
+_CURRENCY_BEFORE_RE = re.compile(r"(?:" + _CURRENCY + r")\s*$")
+
+SALARY_MAX_VALUE = 2_000_000_000
+
+
+class ParsedSalary(NamedTuple):
+    salary_min: Optional[int]
+    salary_max: Optional[int]
+    currency: Optional[str]
+
+
+def _parse_number(raw: str, suffix: Optional[str]) -> Optional[int]:
+    raw = re.sub(r"[\s  ]", "", raw).rstrip(".,")
+    if not raw:
+        return None
+    # "100.000" и "100,000" - разделители тысяч, "1.5" и "1,5" - дробная часть
+    if re.fullmatch(r"\d{1,3}([.,]\d{3})+", raw):
+        raw = re.sub(r"[.,]", "", raw)
+    else:
+        raw = raw.replace(",", ".")
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    if suffix:
+        value *= MULTIPLIERS[suffix.lower()]
+    value = int(round(value))
+    if value <= 0 or value > SALARY_MAX_VALUE:
+        return None
+    return value
+
+
+def _parse_currency(text: str) -> Optional[str]:
+    for currency, aliases in CURRENCY_ALIASES.items():
+        if any(alias in text for alias in aliases):
+            return currency
+    return None
+
+
+def _parse_range(low_raw: str, low_suffix: Optional[str],
+                 high_raw: str, high_suffix: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+    low = _parse_number(low_raw, low_suffix)
+    high = _parse_number(high_raw, high_suffix)
+    # "3-4k": множитель указан только у второго числа
+    if low_suffix is None and high_suffix is not None and high is not None:
+        scaled = _parse_number(low_raw, high_suffix)
+        if scaled is not None and scaled <= high:
+            low = scaled
+    if low is not None and high is not None and low > high:
+        low, high = high, low
+    return low, high
+
+
+def _salary_match(text: str, number: re.Match) -> tuple[bool, Optional[re.Match], bool]:
+    """Для числа строки: стоит ли перед ним "от", диапазон с этого числа и похоже ли оно на зарплату"""
+    after_from = _FROM_RE.search(text, 0, number.start()) is not None
+    range_match = _DASH_RANGE_RE.match(text, number.start())
+    if range_match is None and after_from:
+        range_match = _UNTIL_RANGE_RE.match(text, number.start())
+    span = range_match or number
+    # зарплата - число с множителем, валютой рядом или после "от" / "до"
+    is_salary = (after_from
+                 or _TO_RE.search(text, 0, number.start()) is not None
+                 or any(suffix for suffix in span.groups()[1::2])
+                 or _CURRENCY_AFTER_RE.match(text, span.end()) is not None
+                 or _CURRENCY_BEFORE_RE.search(text, 0, number.start()) is not None)
+    return after_from, range_match, is_salary
+
+
+def _find_salary(text: str) -> Optional[tuple[re.Match, bool, Optional[re.Match]]]:
+    """Первое число, похожее на зарплату, а если такого нет - первое число строки"""
+    fallback = None
+    pos = 0
+    while (number := _NUMBER_RE.search(text, pos)) is not None:
+        fraction = _FRACTION_RE.match(text, number.start())
+        if fraction is not None:
+            pos = fraction.end()
+            continue
+        after_from, range_match, is_salary = _salary_match(text, number)
+        if is_salary:
+            return number, after_from, range_match
+        if fallback is None:
+            fallback = number, after_from, range_match
+        pos = number.end()
+    return fallback
+
+
+def parse_salary(proposed_salary: Optional[str]) -> ParsedSalary:
+    """Разбор текстовой зарплаты: "от 100 000 руб", "3-4k $", "от 100 до 150 тыс" и т.п.
+
+    Зарплата - первое число с валютой, множителем или "от" / "до" (или диапазон, который
+    с него начинается), а если такого нет - первое число строки. График "5/2" пропускается.
+    Если в строке нет чисел ("по договоренности"), все поля None.
+    """
+    if not proposed_salary:
+        return ParsedSalary(None, None, None)
+    text = proposed_salary.lower()
+    found = _find_salary(text)
+    if found is None:
+        return ParsedSalary(None, None, None)
+    first, after_from, range_match = found
+    currency = _parse_currency(text)
+
+    if range_match is not None:
+        low, high = _parse_range(*range_match.groups())
+        if low is not None or high is not None:
+            return ParsedSalary(low, high, currency)
+
+    value = _parse_number(*first.groups())
+    if value is None:
+        return ParsedSalary(None, None, None)
+    if after_from:
+        return ParsedSalary(value, None, currency)
+    if _TO_RE.search(text, 0, first.start()):
+        return ParsedSalary(None, value, currency)
+    return ParsedSalary(value, value, currency)
+
+
+def salary_columns(proposed_salary: Optional[str]) -> dict:
+    """Значения для колонок salary_min, salary_max и currency модели Vacansy"""
+    parsed = parse_salary(proposed_salary)
+    return {"salary_min": parsed.salary_min,
+            "salary_max": parsed.salary_max,
+            "currency": parsed.currency}
@@ -0,0 +1,140 @@
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+import orjson
+
+from src.utils.filter import VacansyFilter
+
+# поля VacansyFilter, из которых состоит сохраненный поиск; сортировка к совпадению не относится
+SAVED_FILTER_FIELDS = ("place_of_work", "place_of_work__in", "required_specialt__in",
+                       "required_experience__ilike", "salary__gte", "salary__lte", "currency")
+
+
+def canonical_filters(vacansy_filter: VacansyFilter) -> dict[str, Any]:
+    """Фильтр в виде, одинаковом для равных предикатов: без пустых полей, списки отсортированы"""
+    filters = vacansy_filter.model_dump(include=set(SAVED_FILTER_FIELDS), exclude_none=True)
+    return {name: sorted(set(value)) if isinstance(value, list) else value for name, value in filters.items()}
+
+
+def predicate_key(filters: dict[str, Any]) -> str:
+    return hashlib.sha1(orjson.dumps(filters, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def ilike_pattern(pattern: str) -> re.Pattern:
+    """Шаблон ILIKE так, как его строит fastapi-filter: без % значение ищется как подстрока"""
+    if "%" not in pattern:
+        pattern = f"%{pattern}%"
+    regex = "".join(".*" if char == "%" else "." if char == "_" else re.escape(char) for char in pattern)
+    return re.compile(regex, re.IGNORECASE | re.DOTALL)
+
+
+@dataclass(slots=True)
+class Predicate:
+    """Предикат VacansyFilter, вычисляемый в памяти; повторяет SQL из VacansyFilter.filter.
+
+    search_ids - все сохраненные поиски с этим предикатом: одинаковые фильтры
+    разных пользователей проверяются один раз.
+    """
+    key: str
+    places: Optional[frozenset[str]] = None
+    specialts: Optional[frozenset[str]] = None
+    experience: Optional[re.Pattern] = None
+    salary_gte: Optional[int] = None
+    salary_lte: Optional[int] = None
+    currency: Optional[str] = None
+    search_ids: list[UUID] = field(default_factory=list)
+
+    @classmethod
+    def from_filters(cls, key: str, filters: dict[str, Any], search_ids: list[UUID]) -> "Predicate":
+        places = None
+        # place_of_work и place_of_work__in вместе - оба условия, то есть пересечение
+        if "place_of_work" in filters:
+            places = frozenset((filters["place_of_work"],))
+        if "place_of_work__in" in filters:
+            places = frozenset(filters["place_of_work__in"]) & places if places is not None \
+                else frozenset(filters["place_of_work__in"])
+        specialts = filters.get("required_specialt__in")
+        experience = filters.get("required_experience__ilike")
+        return cls(key=key,
+                   places=places,
+                   specialts=frozenset(specialts) if specialts is not None else None,
+                   experience=ilike_pattern(experience) if experience is not None else None,
+                   salary_gte=filters.get("salary__gte"),
+                   salary_lte=filters.get("salary__lte"),
+                   currency=filters.get("currency"),
+                   search_ids=search_ids)
+
+    def matches(self, vacansy: Any) -> bool:
+        if self.places is not None and vacansy.place_of_work not in self.places:
+            return False
+        if self.specialts is not None and vacansy.required_specialt not in self.specialts:
+            return False
+        if self.currency is not None and vacansy.currency != self.currency:
+            return False
+        if self.experience is not None and not self.experience.fullmatch(vacansy.required_experience):
+            return False
+        if self.salary_gte is None and self.salary_lte is None:
+            return True
+        lower = vacansy.salary_min if vacansy.salary_min is not None else vacansy.salary_max
+        upper = vacansy.salary_max if vacansy.salary_max is not None else vacansy.salary_min
+        if lower is None:
+            return False
+        if self.salary_gte is not None and upper < self.salary_gte:
+            return False
+        if self.salary_lte is not None and lower > self.salary_lte:
+            return False
+        return True
+
+
+class PredicateIndex:
+    """Предикаты, разложенные по точным значениям place_of_work и required_specialt.
+
+    Вакансия проверяется только против предикатов своего места работы и (или) своей
+    специальности и предикатов без этих условий, а не против всех сохраненных поисков.
+    """
+
+    def __init__(self, predicates: Iterable[Predicate]) -> None:
+        self.by_place_specialt: dict[tuple[str, str], list[Predicate]] = defaultdict(list)
+        self.by_place: dict[str, list[Predicate]] = defaultdict(list)
+        self.by_specialt: dict[str, list[Predicate]] = defaultdict(list)
+        self.rest: list[Predicate] = []
+        self.size = 0
+        for predicate in predicates:
+            self.size += 1
+            if predicate.places is not None and predicate.specialts is not None:
+                for place in predicate.places:
+                    for specialt in predicate.specialts:
+                        self.by_place_specialt[place, specialt].append(predicate)
+            elif predicate.places is not None:
+                for place in predicate.places:
+                    self.by_place[place].append(predicate)
+            elif predicate.specialts is not None:
+                for specialt in predicate.specialts:
+                    self.by_specialt[specialt].append(predicate)
+            else:
+                self.rest.append(predicate)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def match(self, vacansy: Any) -> list[Predicate]:
+        matched = []
+        for bucket in (self.by_place_specialt.get((vacansy.place_of_work, vacansy.required_specialt), ()),
+                       self.by_place.get(vacansy.place_of_work, ()),
+                       self.by_specialt.get(vacansy.required_specialt, ()),
+                       self.rest):
+            matched.extend(predicate for predicate in bucket if predicate.matches(vacansy))
+        return matched
+
+    def match_batch(self, vacansies: Iterable[Any]) -> tuple[list[UUID], list[UUID]]:
+        """Пары (сохраненный поиск, вакансия) двумя параллельными списками - для unnest в INSERT"""
+        search_ids, vacansy_ids = [], []
+        for vacansy in vacansies:
+            for predicate in self.match(vacansy):
+                search_ids.extend(predicate.search_ids)
+                vacansy_ids.extend([vacansy.id] * len(predicate.search_ids))
+        return search_ids, vacansy_ids
@@ -0,0 +1,208 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+import logging.config
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.core.config import settings
+from src.core.log_config import LOGGING
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger(__name__)
+
+Handler = Callable[[str, dict[str, str]], Awaitable[None]]
+
+
+def stream_name(topic: str) -> str:
+    return f"{settings.outbox.stream_prefix}{topic}"
+
+
+@dataclass(frozen=True, slots=True)
+class ConsumerGroup:
+    topic: str
+    group: str
+    handler: Handler
+    # "$" - только события после создания группы, "0" - и все, что еще хранит поток
+    start_id: str = "$"
+
+
+CONSUMER_GROUPS: list[ConsumerGroup] = []
+
+
+def consumer_group(topic: str,
+                   group: str,
+                   start_id: str = "$",
+                   enabled: bool = True) -> Callable[[Handler], Handler]:
+    """Зарегистрировать обработчик событий topic; группу читают все воркеры задач (worker.py)"""
+
+    def decorator(handler: Handler) -> Handler:
+        if enabled:
+            CONSUMER_GROUPS.append(ConsumerGroup(topic=topic, group=group, handler=handler, start_id=start_id))
+        return handler
+
+    return decorator
+
+
+class StreamConsumer:
+    """Потребитель группы Redis Streams с доставкой хотя бы один раз.
+
+    Сообщение подтверждается (XACK) только после успешного handler; сообщения
+    упавшего потребителя, не подтвержденные дольше claim_idle_ms, забирает
+    XAUTOCLAIM. Одно событие может прийти повторно, handler должен быть
+    идемпотентным: события несут id измененных строк, а не их содержимое.
+    """
+
+    def __init__(self,
+                 redis: Redis,
+                 stream: str,
+                 group: str,
+                 consumer: str,
+                 handler: Handler,
+                 batch_size: int = 100,
+                 block_ms: int = 5000,
+                 claim_idle_ms: int = 60_000,
+                 start_id: str = "$",
+                 before_ack: Optional[Callable[[], None]] = None) -> None:
+        self.redis = redis
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.handler = handler
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.start_id = start_id
+        # сохранить результат пачки до XACK: подтвержденные события повторно не придут
+        self.before_ack = before_ack
+
+    async def ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id=self.start_id, mkstream=True)
+        except ResponseError as error:
+            if "BUSYGROUP" not in str(error):
+                raise
+
+    async def _handle(self, messages: list[tuple[str, Optional[dict[str, str]]]]) -> int:
+        acked = []
+        for message_id, fields in messages:
+            if fields is None:
+                # запись удалена из потока, пока была в pending: обрабатывать нечего
+                acked.append(message_id)
+                continue
+            try:
+                await self.handler(message_id, fields)
+            except Exception as error:
+                # без XACK сообщение остается в pending и будет забрано повторно
+                log.exception(f"Ошибка обработки {self.stream}/{message_id} в группе {self.group}: {error}")
+                continue
+            acked.append(message_id)
+        if acked:
+            if self.before_ack is not None:
+                self.before_ack()
+            await self.redis.xack(self.stream, self.group, *acked)
+        return len(acked)
+
+    async def claim_stale(self) -> int:
+        """Обработать сообщения, зависшие у других потребителей группы"""
+        handled = 0
+        start = "0-0"
+        while True:
+            start, messages, *_ = await self.redis.xautoclaim(
+                self.stream, self.group, self.consumer, self.claim_idle_ms, start_id=start, count=self.batch_size)
+            if messages:
+                handled += await self._handle(messages)
+            # "0-0" - список pending пройден до конца
+            if start == "0-0":
+                return handled
+
+    async def read_once(self) -> int:
+        response = await self.redis.xreadgroup(self.group, self.consumer, {self.stream: ">"},
+                                               count=self.batch_size, block=self.block_ms)
+        handled = 0
+        for _, messages in response or []:
+            handled += await self._handle(messages)
+        return handled
+
+    async def drain(self) -> int:
+        """Обработать все, что есть в потоке, и вернуть управление - для задач с одним читателем.
+
+        Сначала свои неподтвержденные сообщения (прошлый запуск упал до XACK), затем новые
+        без ожидания. Сообщение, на котором handler упал, останется в pending до следующего вызова.
+        """
+        await self.ensure_group()
+        handled = 0
+        start = "0"
+        while True:
+            response = await self.redis.xreadgroup(self.group, self.consumer, {self.stream: start},
+                                                   count=self.batch_size)
+            messages = response[0][1] if response else []
+            if not messages:
+                break
+            handled += await self._handle(messages)
+            start = messages[-1][0]
+        while True:
+            response = await self.redis.xreadgroup(self.group, self.consumer, {self.stream: ">"},
+                                                   count=self.batch_size)
+            messages = response[0][1] if response else []
+            if not messages:
+                return handled
+            handled += await self._handle(messages)
+
+    async def run(self) -> None:
+        """Читать поток, пока задачу не отменят"""
+        await self.ensure_group()
+        while True:
+            try:
+                # новых сообщений нет - время подобрать брошенные
+                if not await self.read_once():
+                    await self.claim_stale()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                log.exception(f"Ошибка чтения {self.stream} в группе {self.group}: {error}")
+                await asyncio.sleep(1)
+
+
+async def stream_lag(redis: Redis, stream: str) -> dict:
+    """Длина потока и по каждой группе: pending (выдано, не подтверждено) и lag (еще не выдано)"""
+    try:
+        info = await redis.xinfo_stream(stream)
+        groups = await redis.xinfo_groups(stream)
+    except ResponseError:
+        # потока нет, пока в него не опубликовано ни одного события
+        return {"stream": stream, "length": 0, "groups": []}
+    return {"stream": stream,
+            "length": info["length"],
+            "groups": [{"name": group["name"], "pending": group["pending"], "lag": group.get("lag")}
+                       for group in groups]}
+
+
+def _stream_id(message_id: str) -> tuple[int, int]:
+    milliseconds, _, sequence = message_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+async def trim_consumed(redis: Redis, stream: str, maxlen: int) -> int:
+    """Удалить из потока события, которые уже не понадобятся ни одной группе; вернуть их число.
+
+    Граница по каждой группе - ее первое неподтвержденное сообщение (его еще может забрать
+    XAUTOCLAIM), а если таких нет - последнее выданное; обрезается все ниже самой отстающей
+    группы (XTRIM MINID). Поток без групп доставлять некому - он ограничивается длиной maxlen.
+    """
+    try:
+        groups = await redis.xinfo_groups(stream)
+    except ResponseError:
+        return 0
+    if not groups:
+        return await redis.xtrim(stream, maxlen=maxlen, approximate=True)
+    bounds = []
+    for group in groups:
+        if group["pending"]:
+            pending = await redis.xpending(stream, group["name"])
+            bounds.append(pending["min"])
+        else:
+            bounds.append(group["last-delivered-id"])
+    # "~": Redis удаляет только целые узлы ниже границы, за нее не заходит
+    return await redis.xtrim(stream, minid=min(bounds, key=_stream_id), approximate=True)
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from fastapi import status, HTTPException, Depends, Cookie
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -10,6 +10,9 @@ from pydantic import ValidationError
 from src.core.config import settings
 from src.schemas import token as token_schema
 from src.database.token import TokenDBBase, get_token_db
+from src.utils.permissions import PERMISSIONS_VERSION, Permission, combine
+
+token_settings = settings.token
 
 
 async def _verify_token(token: str, token_db: TokenDBBase, type: token_schema.TokenType) -> str:
@@ -62,6 +65,37 @@ async def verify_access_token(authorization: HTTPAuthorizationCredentials = Depe
     return token
 
 
+def require_permission(*permissions: Permission) -> Callable[..., Awaitable[token_schema.AccessTokenPayload]]:
+    """Зависимость: access token действителен и его права включают все permissions.
+
+    Права берутся из самого токена, без запросов к БД; кроме проверки отзыва токена
+    в verify_access_token, обращений к Redis нет. Возвращает данные токена.
+    """
+    required = combine(permissions)
+
+    async def check_permission(token: str = Depends(verify_access_token)) -> token_schema.AccessTokenPayload:
+        payload = jwt.decode(token,
+                             settings.token.access_secret_key.get_secret_value(),
+                             algorithms=[settings.token.algorithm],
+                             options={"verify_exp": False})
+        token_data = token_schema.AccessTokenPayload(**payload)
+        if token_data.pv != PERMISSIONS_VERSION:
+            # биты токена выданы по другой раскладке прав: нужен новый токен
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='Token permissions outdated',
+                headers={'WWW-Authenticate': 'Bearer'},
+            )
+        if token_data.perms & required != required:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='Not enough permissions',
+            )
+        return token_data
+
+    return check_permission
+
+
 async def verify_refresh_token(refresh_token: str = Cookie(None, include_in_schema=False),
                                token_db: TokenDBBase = Depends(get_token_db),
                                ) -> str:
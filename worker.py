@@ -0,0 +1,32 @@
+import asyncio
+import logging.config
+
+from src.core.config import settings
+from src.core.log_config import LOGGING
+from src.database.redis import redis_helper
+from src.jobs.worker import Worker
+# импорт модулей регистрирует их задачи в очереди
+import src.services.auth  # noqa: F401
+import src.services.hr_stats  # noqa: F401
+import src.services.outbox  # noqa: F401
+import src.services.recommendation  # noqa: F401
+import src.services.saved_search  # noqa: F401
+import src.services.user_purge  # noqa: F401
+
+logging.config.dictConfig(LOGGING)
+log = logging.getLogger("worker")
+
+
+async def main() -> None:
+    try:
+        await Worker(redis_helper.redis, settings.jobs.queues).run()
+    finally:
+        await redis_helper.close()
+
+
+if __name__ == "__main__":
+    # python worker.py - выполнять фоновые и периодические задачи
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        log.info("Воркер задач остановлен")